@@ -0,0 +1,216 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from kafka_pipeline import (
+    BATCH_SIZE_RECORDS,
+    COMMIT_LATENCY,
+    CONSUMER_GROUP,
+    CONSUMER_MAX_POLL_RECORDS,
+    CONSUMER_POLL_TIMEOUT_MS,
+    ERROR_COUNT,
+    KAFKA_BROKER_URL,
+    KAFKA_CONSUMER_TOPIC,
+    KAFKA_PRODUCER_TOPIC,
+    PRODUCER_LINGER_MS,
+    PRODUCER_MAX_BATCH_BYTES,
+    REQUEST_COUNT,
+    logger,
+    process_message,
+    sampled_deserializer,
+    start_metrics_server,
+)
+from serializers import codec_for_topic
+
+try:
+    from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+    from aiokafka.structs import TopicPartition
+except ImportError:
+    AIOKafkaConsumer = AIOKafkaProducer = None
+    from local_broker import TopicPartition
+
+# asyncio runtime for the Kafka pipeline: one event loop keeps up to
+# ASYNC_MAX_IN_FLIGHT records in flight, produces with awaited delivery and
+# retries with non-blocking backoff. A record that still fails after its
+# retries goes to a dead-letter topic, so its partition keeps committing.
+# aiokafka is only needed against a real cluster; local_broker.LocalAsync*
+# stand in for it offline.
+
+ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '5000'))
+ASYNC_RETRIES = int(os.getenv('ASYNC_RETRIES', '5'))
+ASYNC_RETRY_DELAY_S = float(os.getenv('ASYNC_RETRY_DELAY_S', '0.1'))
+ASYNC_COMMIT_INTERVAL_S = float(os.getenv('ASYNC_COMMIT_INTERVAL_S', '1.0'))
+KAFKA_DEAD_LETTER_TOPIC = os.getenv('KAFKA_DEAD_LETTER_TOPIC', f"{KAFKA_CONSUMER_TOPIC}.dead-letter")
+
+
+def create_async_producer(topic=KAFKA_PRODUCER_TOPIC):
+    if AIOKafkaProducer is None:
+        raise RuntimeError("aiokafka is required for the asyncio runtime")
+    return AIOKafkaProducer(
+        bootstrap_servers=KAFKA_BROKER_URL,
+        value_serializer=codec_for_topic(topic).encode,
+        linger_ms=PRODUCER_LINGER_MS,
+        max_batch_size=PRODUCER_MAX_BATCH_BYTES,
+    )
+
+
+def create_async_consumer():
+    if AIOKafkaConsumer is None:
+        raise RuntimeError("aiokafka is required for the asyncio runtime")
+    return AIOKafkaConsumer(
+        KAFKA_CONSUMER_TOPIC,
+        group_id=CONSUMER_GROUP,
+        bootstrap_servers=KAFKA_BROKER_URL,
+        auto_offset_reset='earliest',
+        enable_auto_commit=False,
+        value_deserializer=sampled_deserializer(codec_for_topic(KAFKA_CONSUMER_TOPIC).decode),
+    )
+
+
+# Async retry with exponential backoff; the event loop keeps serving other
+# records while a retry waits
+async def retry_async(operation, retries=ASYNC_RETRIES, delay=ASYNC_RETRY_DELAY_S, backoff=2):
+    attempt = 0
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            ERROR_COUNT.inc()
+            attempt += 1
+            if attempt >= retries:
+                raise
+            logger.error(f"Retry {attempt}/{retries} failed with error: {e}")
+            await asyncio.sleep(delay)
+            delay *= backoff
+
+
+# Records of one partition complete out of order; only the prefix of finished
+# offsets may be committed
+class OffsetTracker:
+    def __init__(self):
+        self._partitions = {}
+        self._done = set()
+
+    def start(self, tp, offset):
+        self._partitions.setdefault(tp, deque()).append(offset)
+
+    def finish(self, tp, offset):
+        self._done.add((tp, offset))
+
+    def committable(self):
+        offsets = {}
+        for tp, pending in self._partitions.items():
+            while pending and (tp, pending[0]) in self._done:
+                self._done.discard((tp, pending[0]))
+                offsets[tp] = pending.popleft() + 1
+        return offsets
+
+
+# dead_letter_producer defaults to the pipeline's producer; give it its own
+# when the output codec cannot encode dead-letter envelopes
+class AsyncPipeline:
+    def __init__(self, consumer, producer, max_in_flight=ASYNC_MAX_IN_FLIGHT, dead_letter_producer=None,
+                 dead_letter_topic=KAFKA_DEAD_LETTER_TOPIC, retries=ASYNC_RETRIES, retry_delay=ASYNC_RETRY_DELAY_S):
+        self.consumer = consumer
+        self.producer = producer
+        self.dead_letter_producer = dead_letter_producer or producer
+        self.dead_letter_topic = dead_letter_topic
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.offsets = OffsetTracker()
+        self.error = None
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        await self.consumer.start()
+        await self.producer.start()
+        if self.dead_letter_producer is not self.producer:
+            await self.dead_letter_producer.start()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+        loop = asyncio.get_running_loop()
+        next_commit = loop.time() + ASYNC_COMMIT_INTERVAL_S
+        try:
+            while not self._stopping.is_set():
+                records = await self.consumer.getmany(timeout_ms=CONSUMER_POLL_TIMEOUT_MS,
+                                                      max_records=CONSUMER_MAX_POLL_RECORDS)
+                for tp, partition_records in records.items():
+                    REQUEST_COUNT.inc(len(partition_records))
+                    BATCH_SIZE_RECORDS.observe(len(partition_records))
+                    for record in partition_records:
+                        await in_flight.acquire()
+                        self.offsets.start(tp, record.offset)
+                        task = asyncio.create_task(self._handle(tp, record, in_flight))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                if loop.time() >= next_commit:
+                    await self._commit()
+                    next_commit = loop.time() + ASYNC_COMMIT_INTERVAL_S
+            if tasks:
+                await asyncio.gather(*tasks)
+            await self._commit()
+        finally:
+            await self.producer.stop()
+            if self.dead_letter_producer is not self.producer:
+                await self.dead_letter_producer.stop()
+            await self.consumer.stop()
+        if self.error is not None:
+            raise self.error
+
+    async def _handle(self, tp, record, in_flight):
+        try:
+            processed_data = process_message(record.value)
+            if processed_data:
+                await retry_async(lambda: self.producer.send_and_wait(KAFKA_PRODUCER_TOPIC, processed_data),
+                                  retries=self.retries, delay=self.retry_delay)
+            self.offsets.finish(tp, record.offset)
+        except Exception as e:
+            ERROR_COUNT.inc()
+            logger.error(f"Failed to handle record {tp}@{record.offset}, dead-lettering it: {e}")
+            await self._dead_letter(tp, record, e)
+        finally:
+            in_flight.release()
+
+    async def _dead_letter(self, tp, record, error):
+        envelope = {"topic": tp.topic, "partition": tp.partition, "offset": record.offset,
+                    "error": repr(error), "value": record.value}
+        try:
+            await retry_async(lambda: self.dead_letter_producer.send_and_wait(self.dead_letter_topic, envelope),
+                              retries=self.retries, delay=self.retry_delay)
+        except Exception as e:
+            # Neither delivered nor dead-lettered: stop instead of holding back
+            # every later commit on this partition; a restart redelivers it
+            logger.error(f"Failed to dead-letter record {tp}@{record.offset}, stopping: {e}")
+            if self.error is None:
+                self.error = e
+            self.stop()
+            return
+        self.offsets.finish(tp, record.offset)
+
+    async def _commit(self):
+        offsets = self.offsets.committable()
+        if offsets:
+            start = time.perf_counter()
+            await self.consumer.commit({TopicPartition(tp.topic, tp.partition): offset
+                                        for tp, offset in offsets.items()})
+            COMMIT_LATENCY.observe(time.perf_counter() - start)
+
+
+async def main():
+    pipeline = AsyncPipeline(create_async_consumer(), create_async_producer(),
+                             dead_letter_producer=create_async_producer(KAFKA_DEAD_LETTER_TOPIC))
+    await pipeline.run()
+
+
+if __name__ == "__main__":
+    logger.info("Starting asyncio Kafka data pipeline")
+    start_metrics_server()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Shutting down asyncio Kafka pipeline")
@@ -1,11 +1,17 @@
-import json
 import logging
 import os
-from kafka import KafkaProducer, KafkaConsumer
-from kafka.errors import KafkaError
-from concurrent.futures import ThreadPoolExecutor
+from kafka import ConsumerRebalanceListener, KafkaProducer, KafkaConsumer
+from kafka.errors import KafkaError, ProducerFencedError
+from kafka.structs import OffsetAndMetadata, TopicPartition
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+import itertools
+import multiprocessing
+import queue
+import socket
+import threading
 import time
-from prometheus_client import start_http_server, Counter, Summary
+from prometheus_client import REGISTRY, start_http_server, Counter, Gauge, Histogram, Summary
+from serializers import codec_for_topic
 
 # Logger setup
 logging.basicConfig(level=logging.INFO)
@@ -17,51 +23,276 @@ KAFKA_CONSUMER_TOPIC = os.getenv('KAFKA_CONSUMER_TOPIC', 'input_topic')
 KAFKA_PRODUCER_TOPIC = os.getenv('KAFKA_PRODUCER_TOPIC', 'output_topic')
 CONSUMER_GROUP = os.getenv('CONSUMER_GROUP', 'data-pipeline-group')
 
+# Batched produce configuration
+PRODUCE_MODE = os.getenv('PRODUCE_MODE', 'batched')
+PRODUCER_LINGER_MS = int(os.getenv('PRODUCER_LINGER_MS', '5'))
+PRODUCER_MAX_BATCH_BYTES = int(os.getenv('PRODUCER_MAX_BATCH_BYTES', '65536'))
+PRODUCER_MAX_IN_FLIGHT = int(os.getenv('PRODUCER_MAX_IN_FLIGHT', '1000'))
+
+# Consumer engine configuration
+CONSUMER_POLLERS = int(os.getenv('CONSUMER_POLLERS', '2'))
+CONSUMER_WORKERS = int(os.getenv('CONSUMER_WORKERS', str(os.cpu_count() or 4)))
+CONSUMER_POLL_TIMEOUT_MS = int(os.getenv('CONSUMER_POLL_TIMEOUT_MS', '100'))
+CONSUMER_MAX_POLL_RECORDS = int(os.getenv('CONSUMER_MAX_POLL_RECORDS', '500'))
+
+# Batch consumer configuration
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', '100'))
+BATCH_TIMEOUT_MS = int(os.getenv('BATCH_TIMEOUT_MS', '1000'))
+BATCH_DELIVERY_TIMEOUT_S = float(os.getenv('BATCH_DELIVERY_TIMEOUT_S', '30'))
+
+# Delivery semantics ('at_least_once' or 'exactly_once')
+DELIVERY_MODE = os.getenv('DELIVERY_MODE', 'at_least_once')
+TRANSACTIONAL_ID = os.getenv('TRANSACTIONAL_ID', f"{CONSUMER_GROUP}-{socket.gethostname()}")
+TRANSACTION_MAX_RECORDS = int(os.getenv('TRANSACTION_MAX_RECORDS', '1000'))
+TRANSACTION_MAX_MS = int(os.getenv('TRANSACTION_MAX_MS', '500'))
+
+# Staged pipeline configuration
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '10000'))
+PIPELINE_RESUME_RATIO = float(os.getenv('PIPELINE_RESUME_RATIO', '0.5'))
+# The produce stage flushes and hands offsets back after this many records or
+# this long, even while its queue never runs empty
+PIPELINE_COMMIT_RECORDS = int(os.getenv('PIPELINE_COMMIT_RECORDS', '5000'))
+PIPELINE_COMMIT_INTERVAL_MS = int(os.getenv('PIPELINE_COMMIT_INTERVAL_MS', '1000'))
+# Consumer engine run by the pipeline: 'partitioned' or 'staged'
+CONSUMER_ENGINE = os.getenv('CONSUMER_ENGINE', 'partitioned')
+
+# Processing stage configuration ('thread' or 'process')
+PROCESSING_MODE = os.getenv('PROCESSING_MODE', 'thread')
+PROCESS_WORKERS = int(os.getenv('PROCESS_WORKERS', str(os.cpu_count() or 4)))
+PROCESS_BATCH_SIZE = int(os.getenv('PROCESS_BATCH_SIZE', '256'))
+
+# Metrics configuration
+METRICS_PORT = int(os.getenv('METRICS_PORT', '8000'))
+DESERIALIZE_SAMPLE_RATE = int(os.getenv('DESERIALIZE_SAMPLE_RATE', '64'))
+CONSUMER_LAG_INTERVAL_S = float(os.getenv('CONSUMER_LAG_INTERVAL_S', '10'))
+
 # Prometheus metrics
 REQUEST_COUNT = Counter('requests_total', 'Total number of requests')
 REQUEST_LATENCY = Summary('request_latency_seconds', 'Latency of requests in seconds')
 ERROR_COUNT = Counter('errors_total', 'Total number of errors')
+QUEUE_DEPTH = Gauge('pipeline_queue_depth', 'Records waiting between pipeline stages', ['queue'])
+PAUSED_PARTITIONS = Gauge('pipeline_paused_partitions', 'Partitions paused by backpressure')
+STAGE_LATENCY = Histogram('pipeline_stage_latency_seconds', 'Time spent in a pipeline stage per batch', ['stage'],
+                          buckets=(.0001, .0005, .001, .005, .01, .05, .1, .5, 1, 5))
+BATCH_SIZE_RECORDS = Histogram('pipeline_batch_size_records', 'Records per processed batch',
+                               buckets=(1, 10, 50, 100, 250, 500, 1000, 5000, 10000))
+CONSUMER_LAG = Gauge('pipeline_consumer_lag', 'Records between the committed position and the log end',
+                     ['topic', 'partition'])
+
+# Label children are bound once so the hot path only pays for observe()
+DESERIALIZE_LATENCY = STAGE_LATENCY.labels('deserialize')
+PROCESS_LATENCY = STAGE_LATENCY.labels('process')
+PRODUCE_LATENCY = STAGE_LATENCY.labels('produce')
+COMMIT_LATENCY = STAGE_LATENCY.labels('commit')
+
+# Start the Prometheus HTTP server; called when the pipeline is launched
+def start_metrics_server(port=METRICS_PORT):
+    start_http_server(port)
+    logger.info(f"Prometheus metrics server started on port {port}")
+
+# Deserializer that times one record in every DESERIALIZE_SAMPLE_RATE, which
+# keeps the per-record overhead well below a full histogram observation
+def sampled_deserializer(decode, sample_rate=DESERIALIZE_SAMPLE_RATE):
+    counter = itertools.count()
+
+    def deserialize(data):
+        if next(counter) % sample_rate:
+            return decode(data)
+        start = time.perf_counter()
+        value = decode(data)
+        DESERIALIZE_LATENCY.observe(time.perf_counter() - start)
+        return value
+    return deserialize
 
-# Initialize Prometheus HTTP server
-start_http_server(8000)
+# Per-consumer lag gauge, refreshed at most every CONSUMER_LAG_INTERVAL_S.
+# Series of partitions this consumer no longer owns are removed, so a revoked
+# partition does not keep reporting its last lag. Pollers share the gauge, so
+# each update looks its series up again instead of holding on to one
+class LagMonitor:
+    def __init__(self, interval=CONSUMER_LAG_INTERVAL_S):
+        self.interval = interval
+        self._partitions = set()
+        self._next_update = 0.0
+
+    def update(self, consumer):
+        now = time.monotonic()
+        if now < self._next_update:
+            return
+        self._next_update = now + self.interval
+        partitions = consumer.assignment()
+        self.remove(self._partitions - partitions)
+        if not partitions:
+            return
+        end_offsets = consumer.end_offsets(list(partitions))
+        for tp in partitions:
+            CONSUMER_LAG.labels(tp.topic, str(tp.partition)).set(max(0, end_offsets[tp] - consumer.position(tp)))
+        self._partitions = set(partitions)
+
+    def remove(self, partitions):
+        for tp in partitions:
+            if tp in self._partitions:
+                self._partitions.discard(tp)
+                try:
+                    CONSUMER_LAG.remove(tp.topic, str(tp.partition))
+                except KeyError:
+                    pass
 
 # Kafka Producer configuration
-def create_kafka_producer():
+def create_kafka_producer(batched=False):
+    options = {}
+    if batched:
+        options = {
+            'linger_ms': PRODUCER_LINGER_MS,
+            'batch_size': PRODUCER_MAX_BATCH_BYTES,
+            'max_in_flight_requests_per_connection': 5,
+        }
     return KafkaProducer(
         bootstrap_servers=KAFKA_BROKER_URL,
-        value_serializer=lambda v: json.dumps(v).encode('utf-8')
+        value_serializer=codec_for_topic(KAFKA_PRODUCER_TOPIC).encode,
+        **options
     )
 
+# Idempotent, transactional producer for exactly-once mode
+def create_transactional_producer():
+    return KafkaProducer(
+        bootstrap_servers=KAFKA_BROKER_URL,
+        value_serializer=codec_for_topic(KAFKA_PRODUCER_TOPIC).encode,
+        transactional_id=TRANSACTIONAL_ID,
+        enable_idempotence=True,
+        linger_ms=PRODUCER_LINGER_MS,
+        batch_size=PRODUCER_MAX_BATCH_BYTES,
+    )
+
+# Batching producer: sends are asynchronous and only the in-flight window
+# boundary (or shutdown) blocks on a flush. in_flight counts sends that are
+# not yet acknowledged; failures are logged here and counted by whoever
+# handles them, so a failed delivery is counted once
+class BatchedProducer:
+    def __init__(self, producer, max_in_flight=PRODUCER_MAX_IN_FLIGHT):
+        self.producer = producer
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _acknowledged(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _on_delivery(self, metadata):
+        self._acknowledged()
+        logger.debug(f"Delivered message to {metadata.topic}[{metadata.partition}]@{metadata.offset}")
+
+    def _on_error(self, exc):
+        self._acknowledged()
+        logger.error(f"Failed to deliver message: {exc}")
+
+    def send(self, topic, message):
+        # Counted before sending, as the future may complete before send() returns
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self.producer.send(topic, value=message)
+        except Exception:
+            self._acknowledged()
+            raise
+        future.add_callback(self._on_delivery)
+        future.add_errback(self._on_error)
+        if self.in_flight >= self.max_in_flight:
+            self.flush()
+        return future
+
+    def flush(self):
+        self.producer.flush()
+
+    def close(self):
+        logger.info("Flushing pending messages before shutdown")
+        self.flush()
+        self.producer.close()
+
 # Kafka Consumer configuration
-def create_kafka_consumer():
-    return KafkaConsumer(
-        KAFKA_CONSUMER_TOPIC,
+def create_kafka_consumer(enable_auto_commit=True, isolation_level='read_uncommitted', listener=None):
+    consumer = KafkaConsumer(
         group_id=CONSUMER_GROUP,
         bootstrap_servers=KAFKA_BROKER_URL,
         auto_offset_reset='earliest',
-        enable_auto_commit=True,
-        value_deserializer=lambda x: json.loads(x.decode('utf-8'))
+        enable_auto_commit=enable_auto_commit,
+        isolation_level=isolation_level,
+        max_poll_records=CONSUMER_MAX_POLL_RECORDS,
+        value_deserializer=sampled_deserializer(codec_for_topic(KAFKA_CONSUMER_TOPIC).decode)
     )
+    consumer.subscribe([KAFKA_CONSUMER_TOPIC], listener=listener)
+    return consumer
+
+# Message processing logic
+def transform_message(message):
+    logger.info(f"Processing message: {message}")
+    result = {
+        "key": message["key"],
+        "value": message["value"] * 2 
+    }
+    return result
 
 # Process message
 @REQUEST_LATENCY.time()
 def process_message(message):
     try:
-        # Message processing logic
-        logger.info(f"Processing message: {message}")
-        result = {
-            "key": message["key"],
-            "value": message["value"] * 2 
-        }
-        return result
+        return transform_message(message)
     except Exception as e:
         ERROR_COUNT.inc()
         logger.error(f"Error processing message: {e}")
         return None
 
+# Process a micro-batch inside a worker process. Metrics updated in a worker
+# never reach the parent's /metrics, so the per-record latencies and the
+# error count travel back with the results
+def process_micro_batch(messages):
+    results, latencies, errors = [], [], 0
+    for message in messages:
+        start = time.perf_counter()
+        try:
+            results.append(transform_message(message))
+        except Exception as e:
+            errors += 1
+            logger.error(f"Error processing message: {e}")
+            results.append(None)
+        latencies.append(time.perf_counter() - start)
+    return results, latencies, errors
+
+# Process-pool execution stage for CPU-bound processing. Records are shipped
+# to the workers as pickled micro-batches, so the IPC cost (one pickle and one
+# pipe write per direction) is paid per batch rather than per record. Workers
+# come from a forkserver, so they are not forked from a process that already
+# runs poller, worker and metrics threads.
+class ProcessPoolStage:
+    def __init__(self, workers=PROCESS_WORKERS, batch_size=PROCESS_BATCH_SIZE, start_method="forkserver"):
+        self.batch_size = batch_size
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context(start_method))
+
+    # Results come back in submission order, whichever micro-batch finishes
+    # first, so they line up with the input records and keep partition order.
+    # Workers only report their errors; they are counted here, once
+    def map(self, messages):
+        chunks = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        results = []
+        for batch_results, latencies, errors in self.executor.map(process_micro_batch, chunks):
+            results.extend(batch_results)
+            for latency in latencies:
+                REQUEST_LATENCY.observe(latency)
+            if errors:
+                ERROR_COUNT.inc(errors)
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
 # Produce message to output Kafka topic
 def produce_message(producer, topic, message):
     try:
+        if isinstance(producer, BatchedProducer):
+            # Nobody waits on the delivery, so its failure is counted when it happens
+            producer.send(topic, message).add_errback(lambda e: ERROR_COUNT.inc())
+            return
         producer.send(topic, value=message)
         producer.flush()
         logger.info(f"Produced message: {message}")
@@ -71,21 +302,437 @@ def produce_message(producer, topic, message):
 
 # Kafka message consuming
 def consume_and_process(consumer, producer):
-    for message in consumer:
-        REQUEST_COUNT.inc()
-        data = message.value
-        processed_data = process_message(data)
-        if processed_data:
-            produce_message(producer, KAFKA_PRODUCER_TOPIC, processed_data)
+    StagedPipeline(consumer, producer).run()
+
+# Offset to commit after the last processed record of a partition
+def commit_offset(offset):
+    # kafka-python >= 2.1 added leader_epoch to OffsetAndMetadata
+    if 'leader_epoch' in OffsetAndMetadata._fields:
+        return OffsetAndMetadata(offset, '', -1)
+    return OffsetAndMetadata(offset, '')
+
+# Staged pipeline: consume -> process -> produce, connected by bounded queues.
+# When the queues fill up (for example because the producer stalls) the
+# consume stage pauses its partitions instead of buffering more records, and
+# resumes them once the queues have drained below PIPELINE_RESUME_RATIO.
+# Offsets travel back to the consume stage, which owns the consumer and
+# commits them once every send of their batch has been delivered. A stage
+# that fails stops the pipeline: it keeps draining its input so nothing
+# upstream blocks, the sentinel is still passed on, and run() re-raises the
+# error without committing the failed batch.
+_STOP = object()
+
+class StagedPipeline:
+    def __init__(self, consumer, producer, queue_size=PIPELINE_QUEUE_SIZE, process_stage=None,
+                 max_poll_records=CONSUMER_MAX_POLL_RECORDS, commit_records=PIPELINE_COMMIT_RECORDS,
+                 commit_interval_ms=PIPELINE_COMMIT_INTERVAL_MS):
+        self.consumer = consumer
+        self.producer = producer
+        self.process_stage = process_stage
+        self.commit_records = commit_records
+        self.commit_interval = commit_interval_ms / 1000.0
+        # The queues need room for a full poll above the pause threshold,
+        # otherwise the pipeline pauses on an empty queue
+        if queue_size <= max_poll_records:
+            raise ValueError(f"PIPELINE_QUEUE_SIZE ({queue_size}) must be larger than "
+                             f"max_poll_records ({max_poll_records})")
+        self.max_poll_records = max_poll_records
+        self.process_queue = queue.Queue(maxsize=queue_size)
+        self.produce_queue = queue.Queue(maxsize=queue_size)
+        self.completed = queue.Queue()
+        self.pause_depth = max(1, queue_size - self.max_poll_records)
+        self.resume_depth = int(queue_size * PIPELINE_RESUME_RATIO)
+        self._paused = False
+        self._stopping = threading.Event()
+        self.error = None
+        self.lag_monitor = LagMonitor()
+        QUEUE_DEPTH.labels('process').set_function(self.process_queue.qsize)
+        QUEUE_DEPTH.labels('produce').set_function(self.produce_queue.qsize)
+
+    def run(self):
+        workers = [
+            threading.Thread(target=self._process_stage, name="pipeline-process", daemon=True),
+            threading.Thread(target=self._produce_stage, name="pipeline-produce", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            self._consume_stage()
+        finally:
+            self.process_queue.put(_STOP)
+            for worker in workers:
+                worker.join()
+            self._commit_completed()
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        self._stopping.set()
+
+    def _fail(self, stage, error):
+        ERROR_COUNT.inc()
+        logger.exception(f"Pipeline {stage} stage failed, stopping: {error}")
+        if self.error is None:
+            self.error = error
+        self._stopping.set()
+
+    @staticmethod
+    def _drain(stage_queue):
+        while stage_queue.get() is not _STOP:
+            pass
+
+    def _consume_stage(self):
+        while not self._stopping.is_set():
+            self._commit_completed()
+            self._apply_backpressure()
+            self.lag_monitor.update(self.consumer)
+            records = self.consumer.poll(timeout_ms=CONSUMER_POLL_TIMEOUT_MS, max_records=self.max_poll_records)
+            for partition_records in records.values():
+                REQUEST_COUNT.inc(len(partition_records))
+                for record in partition_records:
+                    self.process_queue.put(record)
+
+    def _apply_backpressure(self):
+        if self._paused and self.consumer.paused() != self.consumer.assignment():
+            # A rebalance hands partitions back unpaused; pause them again if still needed
+            self._paused = False
+            PAUSED_PARTITIONS.set(0)
+        depth = max(self.process_queue.qsize(), self.produce_queue.qsize())
+        if not self._paused and depth >= self.pause_depth:
+            partitions = self.consumer.assignment()
+            self.consumer.pause(*partitions)
+            self._paused = True
+            PAUSED_PARTITIONS.set(len(partitions))
+            logger.debug(f"Queue depth {depth} reached, pausing {len(partitions)} partitions")
+        elif self._paused and depth <= self.resume_depth:
+            self.consumer.resume(*self.consumer.paused())
+            self._paused = False
+            PAUSED_PARTITIONS.set(0)
+            logger.debug(f"Queue depth down to {depth}, resuming partitions")
+
+    def _process_stage(self):
+        stopping = False
+        try:
+            while not stopping:
+                batch = [self.process_queue.get()]
+                while len(batch) < PROCESS_BATCH_SIZE:
+                    try:
+                        batch.append(self.process_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is _STOP:
+                    batch.pop()
+                    stopping = True
+                if not batch:
+                    break
+                BATCH_SIZE_RECORDS.observe(len(batch))
+                start = time.perf_counter()
+                values = [record.value for record in batch]
+                if self.process_stage:
+                    results = self.process_stage.map(values)
+                else:
+                    results = [process_message(value) for value in values]
+                PROCESS_LATENCY.observe(time.perf_counter() - start)
+                for record, processed_data in zip(batch, results):
+                    self.produce_queue.put((record, processed_data))
+        except Exception as e:
+            self._fail("process", e)
+        finally:
+            self.produce_queue.put(_STOP)
+        if not stopping:
+            self._drain(self.process_queue)
+
+    def _produce_stage(self):
+        offsets, futures, batched = {}, [], 0
+        item = None
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    item = self.produce_queue.get_nowait()
+                except queue.Empty:
+                    # Queue drained: a natural batch boundary to flush and hand back offsets
+                    self._flush_offsets(offsets, futures, start)
+                    offsets, futures, batched = {}, [], 0
+                    item = self.produce_queue.get()
+                    start = time.perf_counter()
+                if item is _STOP:
+                    self._flush_offsets(offsets, futures, start)
+                    return
+                record, processed_data = item
+                if processed_data:
+                    futures.append(self._send(processed_data))
+                offsets[TopicPartition(record.topic, record.partition)] = record.offset + 1
+                batched += 1
+                # A producer that falls behind keeps the queue from ever draining
+                if batched >= self.commit_records or time.perf_counter() - start >= self.commit_interval:
+                    self._flush_offsets(offsets, futures, start)
+                    offsets, futures, batched = {}, [], 0
+                    start = time.perf_counter()
+        except Exception as e:
+            # Offsets of the undelivered batch are not handed back, so it is redelivered
+            self._fail("produce", e)
+            if item is not _STOP:
+                self._drain(self.produce_queue)
+
+    def _send(self, processed_data):
+        if isinstance(self.producer, BatchedProducer):
+            return self.producer.send(KAFKA_PRODUCER_TOPIC, processed_data)
+        return self.producer.send(KAFKA_PRODUCER_TOPIC, value=processed_data)
+
+    def _flush_offsets(self, offsets, futures, start):
+        if not offsets:
+            return
+        self.producer.flush()
+        # A failed delivery raises here, before the batch offsets reach the consume stage
+        for future in futures:
+            future.get(timeout=BATCH_DELIVERY_TIMEOUT_S)
+        PRODUCE_LATENCY.observe(time.perf_counter() - start)
+        self.completed.put(offsets)
+
+    def _commit_completed(self):
+        offsets = {}
+        while True:
+            try:
+                offsets.update(self.completed.get_nowait())
+            except queue.Empty:
+                break
+        if offsets:
+            start = time.perf_counter()
+            self.consumer.commit({tp: commit_offset(offset) for tp, offset in offsets.items()})
+            COMMIT_LATENCY.observe(time.perf_counter() - start)
+
+# Rebalance hook of one poller: before partitions move to another member,
+# the batches still running for them are awaited and committed, so the new
+# owner starts after them and per-partition ordering holds across the handover
+class InFlightRebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, engine, in_flight, lag_monitor=None):
+        self.engine = engine
+        self.in_flight = in_flight
+        self.lag_monitor = lag_monitor
+        self.consumer = None
+
+    def on_partitions_revoked(self, revoked):
+        if self.lag_monitor is not None:
+            self.lag_monitor.remove(revoked)
+        futures = [self.in_flight[tp][0] for tp in revoked if tp in self.in_flight]
+        if futures:
+            logger.info(f"Waiting for {len(futures)} in-flight batches before giving up partitions")
+            wait(futures)
+            self.engine._commit_finished(self.consumer, self.in_flight)
+
+    def on_partitions_assigned(self, assigned):
+        pass
+
+    def on_partitions_lost(self, lost):
+        # The group has moved on without us, so nothing can be committed; the
+        # new owner redelivers from the last committed offset
+        if self.lag_monitor is not None:
+            self.lag_monitor.remove(lost)
+        futures = [self.in_flight[tp][0] for tp in lost if tp in self.in_flight]
+        wait(futures)
+        for tp in lost:
+            self.in_flight.pop(tp, None)
+
+# Partition-aware consumer engine: every poller thread owns its own consumer
+# (and therefore its own share of the partitions) and hands per-partition
+# batches to a shared worker pool. A partition is paused while its batch is
+# processed, which keeps per-partition ordering, and its offset is committed
+# by the owning poller only once the batch has finished. consumer_factory
+# takes the poller's rebalance listener.
+class PartitionedConsumerEngine:
+    def __init__(self, consumer_factory, producer, pollers=CONSUMER_POLLERS, workers=CONSUMER_WORKERS,
+                 poll_timeout_ms=CONSUMER_POLL_TIMEOUT_MS, process_stage=None):
+        self.consumer_factory = consumer_factory
+        self.producer = producer
+        self.process_stage = process_stage
+        self.pollers = pollers
+        self.poll_timeout_ms = poll_timeout_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline-worker")
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def process_records(self, records):
+        REQUEST_COUNT.inc(len(records))
+        BATCH_SIZE_RECORDS.observe(len(records))
+        start = time.perf_counter()
+        if self.process_stage:
+            results = self.process_stage.map([record.value for record in records])
+        else:
+            results = [process_message(record.value) for record in records]
+        processed = time.perf_counter()
+        PROCESS_LATENCY.observe(processed - start)
+        # Wait for every delivery: a failed send raises here, so the batch is
+        # rewound instead of having its offset committed
+        futures = [self.producer.send(KAFKA_PRODUCER_TOPIC, processed_data)
+                   for processed_data in results if processed_data]
+        self.producer.flush()
+        for future in futures:
+            future.get(timeout=BATCH_DELIVERY_TIMEOUT_S)
+        PRODUCE_LATENCY.observe(time.perf_counter() - processed)
+        return records[-1].offset
+
+    def start(self):
+        for i in range(self.pollers):
+            thread = threading.Thread(target=self._poll_loop, name=f"pipeline-poller-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        self.executor.shutdown(wait=True)
+
+    def run(self):
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                time.sleep(1)
+        finally:
+            self.stop()
+
+    def _poll_loop(self):
+        in_flight = {}
+        lag_monitor = LagMonitor()
+        listener = InFlightRebalanceListener(self, in_flight, lag_monitor)
+        consumer = listener.consumer = self.consumer_factory(listener)
+        try:
+            while not self._stopping.is_set():
+                self._commit_finished(consumer, in_flight)
+                lag_monitor.update(consumer)
+                records = consumer.poll(timeout_ms=self.poll_timeout_ms)
+                for tp, batch in records.items():
+                    consumer.pause(tp)
+                    in_flight[tp] = (self.executor.submit(self.process_records, batch), batch[0].offset)
+            wait([future for future, _ in in_flight.values()])
+            self._commit_finished(consumer, in_flight)
+        except Exception as e:
+            ERROR_COUNT.inc()
+            logger.error(f"Poller stopped with error: {e}")
+        finally:
+            consumer.close()
+
+    def _commit_finished(self, consumer, in_flight):
+        finished = [tp for tp, (future, _) in in_flight.items() if future.done()]
+        if not finished:
+            return
+        # Partitions revoked by a rebalance are neither rewound nor resumed
+        assigned = consumer.assignment()
+        offsets = {}
+        for tp in finished:
+            future, first_offset = in_flight.pop(tp)
+            if future.exception() is not None:
+                # Leave the offset uncommitted and rewind so the batch is redelivered
+                ERROR_COUNT.inc()
+                logger.error(f"Processing failed for {tp}: {future.exception()}")
+                if tp in assigned:
+                    consumer.seek(tp, first_offset)
+                continue
+            offsets[tp] = commit_offset(future.result() + 1)
+        if offsets:
+            start = time.perf_counter()
+            consumer.commit(offsets)
+            COMMIT_LATENCY.observe(time.perf_counter() - start)
+        consumer.resume(*[tp for tp in finished if tp in assigned])
+
+# Staged consumer: one consumer feeding the consume -> process -> produce stages
+def staged_consumer():
+    if PRODUCE_MODE == 'batched':
+        producer = BatchedProducer(create_kafka_producer(batched=True))
+    else:
+        producer = create_kafka_producer()
+    process_stage = ProcessPoolStage() if PROCESSING_MODE == 'process' else None
+    pipeline = StagedPipeline(create_kafka_consumer(enable_auto_commit=False), producer,
+                              process_stage=process_stage)
+    try:
+        pipeline.run()
+    finally:
+        if process_stage:
+            process_stage.close()
+        if isinstance(producer, BatchedProducer):
+            producer.close()
 
 # Multi-threaded consumer
 def multi_thread_consumer():
-    producer = create_kafka_producer()
-    consumer = create_kafka_consumer()
+    if PRODUCE_MODE == 'batched':
+        producer = BatchedProducer(create_kafka_producer(batched=True))
+    else:
+        producer = create_kafka_producer()
+    process_stage = ProcessPoolStage() if PROCESSING_MODE == 'process' else None
+    engine = PartitionedConsumerEngine(
+        lambda listener: create_kafka_consumer(enable_auto_commit=False, listener=listener), producer,
+        process_stage=process_stage)
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        for _ in range(4):
-            executor.submit(consume_and_process, consumer, producer)
+    try:
+        engine.run()
+    finally:
+        if process_stage:
+            process_stage.close()
+        if isinstance(producer, BatchedProducer):
+            producer.close()
+
+# Exactly-once consumer: the results of a batch and the consumer offsets
+# that produced them are committed in one transaction. Transactions span up
+# to TRANSACTION_MAX_RECORDS records or TRANSACTION_MAX_MS, so the commit
+# round trips are amortised over many records.
+def transactional_consumer(consumer, producer, max_records=TRANSACTION_MAX_RECORDS,
+                           max_ms=TRANSACTION_MAX_MS, stop_event=None):
+    require_manual_commit(consumer)
+    producer.init_transactions()
+    group_metadata = consumer.group_metadata() if hasattr(consumer, 'group_metadata') else CONSUMER_GROUP
+    buffer = []
+    deadline = None
+    while not (stop_event and stop_event.is_set()):
+        timeout_ms = CONSUMER_POLL_TIMEOUT_MS
+        if deadline is not None:
+            timeout_ms = max(0, int((deadline - time.monotonic()) * 1000))
+        records = consumer.poll(timeout_ms=timeout_ms, max_records=max_records - len(buffer))
+        for partition_records in records.values():
+            buffer.extend(partition_records)
+        if buffer and deadline is None:
+            deadline = time.monotonic() + max_ms / 1000.0
+        if len(buffer) >= max_records or (buffer and time.monotonic() >= deadline):
+            process_transaction(buffer, producer, consumer, group_metadata)
+            buffer = []
+            deadline = None
+    if buffer:
+        process_transaction(buffer, producer, consumer, group_metadata)
+
+def process_transaction(records, producer, consumer, group_metadata):
+    REQUEST_COUNT.inc(len(records))
+    BATCH_SIZE_RECORDS.observe(len(records))
+    first_offsets, next_offsets = {}, {}
+    for record in records:
+        tp = TopicPartition(record.topic, record.partition)
+        first_offsets.setdefault(tp, record.offset)
+        next_offsets[tp] = record.offset + 1
+
+    producer.begin_transaction()
+    try:
+        start = time.perf_counter()
+        results = [process_message(record.value) for record in records]
+        processed = time.perf_counter()
+        PROCESS_LATENCY.observe(processed - start)
+        for result in results:
+            if result:
+                producer.send(KAFKA_PRODUCER_TOPIC, value=result)
+        producer.send_offsets_to_transaction(
+            {tp: commit_offset(offset) for tp, offset in next_offsets.items()}, group_metadata)
+        producer.commit_transaction()
+        COMMIT_LATENCY.observe(time.perf_counter() - processed)
+        return True
+    except ProducerFencedError:
+        # Another instance owns this transactional id; nothing can be salvaged here
+        logger.error("Producer fenced by a newer instance, stopping")
+        raise
+    except KafkaError as e:
+        ERROR_COUNT.inc()
+        logger.error(f"Transaction failed, aborting and rewinding {len(records)} records: {e}")
+        producer.abort_transaction()
+        for tp, offset in first_offsets.items():
+            consumer.seek(tp, offset)
+        return False
 
 # Graceful shutdown
 def shutdown_handler(signum, frame):
@@ -94,49 +741,93 @@ def shutdown_handler(signum, frame):
 
 if __name__ == "__main__":
     logger.info("Starting Kafka data pipeline")
+    start_metrics_server()
     try:
-        multi_thread_consumer()
+        if DELIVERY_MODE == 'exactly_once':
+            transactional_consumer(
+                create_kafka_consumer(enable_auto_commit=False, isolation_level='read_committed'),
+                create_transactional_producer())
+        elif CONSUMER_ENGINE == 'staged':
+            staged_consumer()
+        else:
+            multi_thread_consumer()
     except KeyboardInterrupt:
         shutdown_handler(None, None)
 
-# Retry Mechanism
-def retry_produce(producer, message, retries=5, delay=1):
-    attempt = 0
-    while attempt < retries:
-        try:
-            producer.send(KAFKA_PRODUCER_TOPIC, value=message)
-            producer.flush()
-            logger.info(f"Produced message after {attempt} retries: {message}")
-            break
-        except KafkaError as e:
-            ERROR_COUNT.inc()
-            attempt += 1
-            logger.error(f"Retry {attempt}/{retries} failed with error: {e}")
-            time.sleep(delay)
+# Consumers whose offsets are committed by the pipeline must not also
+# auto-commit, or positions of undelivered batches get committed behind its back
+def require_manual_commit(consumer):
+    config = getattr(consumer, 'config', {})
+    if config.get('enable_auto_commit', False):
+        raise ValueError("The consumer must be created with enable_auto_commit=False")
 
-# Batch Consumer
-def batch_consumer(consumer, batch_size=100):
+# Batch Consumer: a batch is closed when it reaches batch_size records or
+# when batch_timeout_ms has passed since its first record arrived
+def batch_consumer(consumer, producer=None, batch_size=BATCH_SIZE, batch_timeout_ms=BATCH_TIMEOUT_MS,
+                   stop_event=None):
+    require_manual_commit(consumer)
+    producer = producer or create_kafka_producer(batched=True)
     buffer = []
-    for message in consumer:
-        buffer.append(message.value)
-        if len(buffer) >= batch_size:
-            process_batch(buffer)
+    deadline = None
+    while not (stop_event and stop_event.is_set()):
+        timeout_ms = CONSUMER_POLL_TIMEOUT_MS
+        if deadline is not None:
+            timeout_ms = max(0, int((deadline - time.monotonic()) * 1000))
+        records = consumer.poll(timeout_ms=timeout_ms, max_records=batch_size - len(buffer))
+        for partition_records in records.values():
+            buffer.extend(partition_records)
+        if buffer and deadline is None:
+            deadline = time.monotonic() + batch_timeout_ms / 1000.0
+        if len(buffer) >= batch_size or (buffer and time.monotonic() >= deadline):
+            process_batch(buffer, producer, consumer)
             buffer = []
+            deadline = None
+    if buffer:
+        process_batch(buffer, producer, consumer)
+
+# Process a batch in one pass, send every result asynchronously and commit
+# the batch offsets in a single commit once all deliveries have succeeded
+def process_batch(records, producer, consumer=None):
+    REQUEST_COUNT.inc(len(records))
+    BATCH_SIZE_RECORDS.observe(len(records))
+    start = time.perf_counter()
+    results = [process_message(record.value) for record in records]
+    processed = time.perf_counter()
+    PROCESS_LATENCY.observe(processed - start)
+    futures = [producer.send(KAFKA_PRODUCER_TOPIC, value=result) for result in results if result]
+    producer.flush()
+
+    first_offsets, next_offsets = {}, {}
+    for record in records:
+        tp = TopicPartition(record.topic, record.partition)
+        first_offsets.setdefault(tp, record.offset)
+        next_offsets[tp] = record.offset + 1
+
+    try:
+        for future in futures:
+            future.get(timeout=BATCH_DELIVERY_TIMEOUT_S)
+    except Exception as e:
+        ERROR_COUNT.inc()
+        logger.error(f"Batch delivery failed, rewinding {len(records)} records: {e}")
+        if consumer:
+            for tp, offset in first_offsets.items():
+                consumer.seek(tp, offset)
+        return False
+    delivered = time.perf_counter()
+    PRODUCE_LATENCY.observe(delivered - processed)
 
-def process_batch(batch):
-    producer = create_kafka_producer()
-    results = [process_message(msg) for msg in batch]
-    for result in results:
-        if result:
-            retry_produce(producer, result)
+    if consumer:
+        consumer.commit({tp: commit_offset(offset) for tp, offset in next_offsets.items()})
+        COMMIT_LATENCY.observe(time.perf_counter() - delivered)
+    logger.info(f"Produced batch of {len(futures)} messages")
+    return True
 
 # Monitoring System Metrics
 def monitor_metrics():
-    logger.info("Prometheus metrics server started on port 8000")
     while True:
         logger.info("Current metrics state:")
-        logger.info(f"Request count: {REQUEST_COUNT._value.get()}")
-        logger.info(f"Error count: {ERROR_COUNT._value.get()}")
+        logger.info(f"Request count: {REGISTRY.get_sample_value('requests_total')}")
+        logger.info(f"Error count: {REGISTRY.get_sample_value('errors_total')}")
         time.sleep(60)
 
 if __name__ == "__main__":
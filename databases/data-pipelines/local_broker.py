@@ -0,0 +1,367 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+# In-process stand-in for a Kafka broker. It mirrors the small slice of the
+# kafka-python producer/consumer API that kafka_pipeline uses, so the pipeline
+# can be benchmarked and exercised without a running cluster. The Async*
+# classes mirror the aiokafka API used by async_pipeline.
+
+TopicPartition = namedtuple('TopicPartition', ['topic', 'partition'])
+RecordMetadata = namedtuple('RecordMetadata', ['topic', 'partition', 'offset'])
+ConsumerRecord = namedtuple('ConsumerRecord', ['topic', 'partition', 'offset', 'key', 'value'])
+
+
+class LocalFuture:
+    def __init__(self):
+        self._done = threading.Event()
+        self._callbacks = []
+        self._errbacks = []
+        self._lock = threading.Lock()
+        self.value = None
+        self.exception = None
+
+    def add_callback(self, fn, *args, **kwargs):
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append((fn, args, kwargs))
+                return self
+        if self.exception is None:
+            fn(*args, self.value, **kwargs)
+        return self
+
+    def add_errback(self, fn, *args, **kwargs):
+        with self._lock:
+            if not self._done.is_set():
+                self._errbacks.append((fn, args, kwargs))
+                return self
+        if self.exception is not None:
+            fn(*args, self.exception, **kwargs)
+        return self
+
+    def success(self, value):
+        with self._lock:
+            self.value = value
+            self._done.set()
+        for fn, args, kwargs in self._callbacks:
+            fn(*args, value, **kwargs)
+
+    def failure(self, exception):
+        with self._lock:
+            self.exception = exception
+            self._done.set()
+        for fn, args, kwargs in self._errbacks:
+            fn(*args, exception, **kwargs)
+
+    def get(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for delivery")
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class LocalBroker:
+    def __init__(self, partitions=4, round_trip_ms=1.0):
+        self.partitions = partitions
+        self.round_trip = round_trip_ms / 1000.0
+        self._logs = defaultdict(lambda: [[] for _ in range(self.partitions)])
+        self._committed = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def simulate_round_trip(self):
+        if self.round_trip:
+            time.sleep(self.round_trip)
+
+    def append(self, topic, partition, key, value):
+        with self._lock:
+            log = self._logs[topic][partition]
+            log.append((key, value))
+            return len(log) - 1
+
+    def fetch(self, topic, partition, offset, max_records):
+        with self._lock:
+            return list(enumerate(self._logs[topic][partition][offset:offset + max_records], start=offset))
+
+    def end_offset(self, topic, partition):
+        with self._lock:
+            return len(self._logs[topic][partition])
+
+    def records(self, topic):
+        with self._lock:
+            return [value for log in self._logs[topic] for _, value in log]
+
+    def commit(self, group_id, offsets):
+        with self._lock:
+            self._committed[group_id].update(offsets)
+
+    def committed(self, group_id, tp):
+        with self._lock:
+            return self._committed[group_id].get(tp)
+
+
+class LocalProducer:
+    def __init__(self, broker, value_serializer=None, key_serializer=None,
+                 batch_size=16384, transactional_id=None, **_kafka_options):
+        self.broker = broker
+        self.value_serializer = value_serializer
+        self.key_serializer = key_serializer
+        self.batch_size = batch_size
+        self.transactional_id = transactional_id
+        self._transaction = None
+        self._transaction_offsets = None
+        self._pending = []
+        self._pending_bytes = 0
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def _partition_for(self, key):
+        if key is not None:
+            return hash(key) % self.broker.partitions
+        return next(self._round_robin) % self.broker.partitions
+
+    def send(self, topic, value=None, key=None, partition=None):
+        if self.value_serializer and value is not None:
+            value = self.value_serializer(value)
+        if self.key_serializer and key is not None:
+            key = self.key_serializer(key)
+        if partition is None:
+            partition = self._partition_for(key)
+        future = LocalFuture()
+        with self._lock:
+            self._pending.append((topic, partition, key, value, future))
+            self._pending_bytes += len(value) if value else 0
+            full = self._pending_bytes >= self.batch_size
+        if full:
+            self._send_pending()
+        return future
+
+    def _send_pending(self):
+        with self._lock:
+            batch, self._pending, self._pending_bytes = self._pending, [], 0
+        if not batch:
+            return
+        # One simulated broker round trip per request, however many records it carries
+        self.broker.simulate_round_trip()
+        if self._transaction is not None:
+            # Transactional records only become visible once the transaction commits
+            self._transaction.extend(batch)
+            return
+        self._append(batch)
+
+    def _append(self, batch):
+        for topic, partition, key, value, future in batch:
+            offset = self.broker.append(topic, partition, key, value)
+            future.success(RecordMetadata(topic, partition, offset))
+
+    def flush(self, timeout=None):
+        self._send_pending()
+
+    def init_transactions(self):
+        if self.transactional_id is None:
+            raise RuntimeError("Cannot use transactional methods without a transactional_id")
+        self.broker.simulate_round_trip()
+
+    def begin_transaction(self):
+        self._transaction = []
+        self._transaction_offsets = {}
+
+    def send_offsets_to_transaction(self, offsets, group_metadata):
+        self.broker.simulate_round_trip()
+        self._transaction_offsets[group_metadata] = offsets
+
+    def commit_transaction(self):
+        self._send_pending()
+        self.broker.simulate_round_trip()
+        batch, self._transaction = self._transaction, None
+        self._append(batch)
+        for group_id, offsets in self._transaction_offsets.items():
+            self.broker.commit(group_id, {tp: getattr(meta, 'offset', meta) for tp, meta in offsets.items()})
+        self._transaction_offsets = None
+
+    def abort_transaction(self):
+        with self._lock:
+            batch, self._pending, self._pending_bytes = self._pending, [], 0
+        batch += self._transaction or []
+        self._transaction = None
+        self._transaction_offsets = None
+        self.broker.simulate_round_trip()
+        for *_, future in batch:
+            future.failure(RuntimeError("Transaction aborted"))
+
+    def close(self, timeout=None):
+        self.flush()
+
+
+class LocalConsumer:
+    def __init__(self, broker, *topics, group_id=None, value_deserializer=None,
+                 consumer_timeout_ms=float('inf'), max_poll_records=500, enable_auto_commit=True,
+                 **_kafka_options):
+        self.broker = broker
+        # Same default as kafka-python; positions are not committed in the background here
+        self.config = {'enable_auto_commit': enable_auto_commit}
+        self.group_id = group_id
+        self.value_deserializer = value_deserializer
+        self.consumer_timeout_ms = consumer_timeout_ms
+        self.max_poll_records = max_poll_records
+        self._assignment = [TopicPartition(topic, p) for topic in topics for p in range(broker.partitions)]
+        self._positions = {}
+        self._paused = set()
+        for tp in self._assignment:
+            self._positions[tp] = broker.committed(group_id, tp) or 0
+
+    def assignment(self):
+        return set(self._assignment)
+
+    def assign(self, partitions):
+        self._assignment = list(partitions)
+        for tp in self._assignment:
+            self._positions.setdefault(tp, self.broker.committed(self.group_id, tp) or 0)
+
+    def position(self, tp):
+        return self._positions[tp]
+
+    def seek(self, tp, offset):
+        self._positions[tp] = offset
+
+    def end_offsets(self, partitions):
+        return {tp: self.broker.end_offset(tp.topic, tp.partition) for tp in partitions}
+
+    def pause(self, *partitions):
+        self._paused.update(partitions)
+
+    def resume(self, *partitions):
+        self._paused.difference_update(partitions)
+
+    def paused(self):
+        return set(self._paused)
+
+    def poll(self, timeout_ms=0, max_records=None):
+        max_records = max_records or self.max_poll_records
+        records = {}
+        for tp in self._assignment:
+            if tp in self._paused or max_records <= 0:
+                continue
+            fetched = self.broker.fetch(tp.topic, tp.partition, self._positions[tp], max_records)
+            if not fetched:
+                continue
+            batch = []
+            for offset, (key, value) in fetched:
+                if self.value_deserializer and value is not None:
+                    value = self.value_deserializer(value)
+                batch.append(ConsumerRecord(tp.topic, tp.partition, offset, key, value))
+            self._positions[tp] = batch[-1].offset + 1
+            max_records -= len(batch)
+            records[tp] = batch
+        if not records and timeout_ms:
+            time.sleep(min(timeout_ms, 10) / 1000.0)
+        return records
+
+    def __iter__(self):
+        idle_since = time.monotonic()
+        while True:
+            records = self.poll(timeout_ms=10)
+            if records:
+                idle_since = time.monotonic()
+                for batch in records.values():
+                    yield from batch
+            elif (time.monotonic() - idle_since) * 1000 >= self.consumer_timeout_ms:
+                return
+
+    def commit(self, offsets=None):
+        if offsets is None:
+            offsets = dict(self._positions)
+        self.broker.commit(self.group_id, {
+            tp: getattr(meta, 'offset', meta) for tp, meta in offsets.items()
+        })
+
+    def close(self):
+        pass
+
+
+class LocalAsyncProducer:
+    def __init__(self, broker, value_serializer=None, linger_ms=5, max_batch_size=16384, **_kafka_options):
+        self.broker = broker
+        self.value_serializer = value_serializer
+        self.linger = linger_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._pending_bytes = 0
+        self._sender = None
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        await self.flush()
+
+    async def send(self, topic, value=None, key=None, partition=None):
+        if self.value_serializer and value is not None:
+            value = self.value_serializer(value)
+        if partition is None:
+            partition = hash(key) % self.broker.partitions if key is not None else len(self._pending) % self.broker.partitions
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((topic, partition, key, value, future))
+        self._pending_bytes += len(value) if value else 0
+        if self._pending_bytes >= self.max_batch_size:
+            await self._send_pending()
+        elif self._sender is None:
+            self._sender = asyncio.create_task(self._linger_then_send())
+        return future
+
+    async def send_and_wait(self, topic, value=None, key=None, partition=None):
+        future = await self.send(topic, value=value, key=key, partition=partition)
+        return await future
+
+    async def _linger_then_send(self):
+        await asyncio.sleep(self.linger)
+        self._sender = None
+        await self._send_pending()
+
+    async def _send_pending(self):
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        if not batch:
+            return
+        if self.broker.round_trip:
+            await asyncio.sleep(self.broker.round_trip)
+        for topic, partition, key, value, future in batch:
+            offset = self.broker.append(topic, partition, key, value)
+            if not future.done():
+                future.set_result(RecordMetadata(topic, partition, offset))
+
+    async def flush(self):
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+        await self._send_pending()
+
+
+class LocalAsyncConsumer:
+    def __init__(self, broker, *topics, **options):
+        self._consumer = LocalConsumer(broker, *topics, **options)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self._consumer.close()
+
+    def assignment(self):
+        return self._consumer.assignment()
+
+    def pause(self, *partitions):
+        self._consumer.pause(*partitions)
+
+    def resume(self, *partitions):
+        self._consumer.resume(*partitions)
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        records = self._consumer.poll(max_records=max_records)
+        if not records and timeout_ms:
+            await asyncio.sleep(min(timeout_ms, 10) / 1000.0)
+        return records
+
+    async def commit(self, offsets=None):
+        self._consumer.commit(offsets)
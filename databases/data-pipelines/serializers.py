@@ -0,0 +1,135 @@
+import json
+import os
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Serializer registry for the Kafka pipeline. Codecs are looked up by name and
+# selected per topic through KAFKA_TOPIC_CODECS, e.g.
+# "input_topic=orjson,output_topic=schema:record". Every decode accepts bytes
+# or a memoryview; codecs that can read a buffer directly never copy it.
+
+DEFAULT_CODEC = os.getenv('KAFKA_DEFAULT_CODEC', 'json')
+KAFKA_TOPIC_CODECS = os.getenv('KAFKA_TOPIC_CODECS', '')
+
+
+class JsonCodec:
+    name = 'json'
+
+    def encode(self, value):
+        return json.dumps(value).encode('utf-8')
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = 'orjson'
+
+    def encode(self, value):
+        return orjson.dumps(value)
+
+    def decode(self, data):
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    name = 'msgpack'
+
+    def encode(self, value):
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+# Compact binary codec for records with a fixed schema. Fixed-width fields are
+# packed with one precompiled struct; str/bytes fields store their lengths in
+# that struct and their data afterwards, in schema order.
+class SchemaCodec:
+    FIELD_FORMATS = {'int': 'q', 'float': 'd', 'bool': '?', 'str': 'I', 'bytes': 'I'}
+
+    def __init__(self, name, fields):
+        for field_name, field_type in fields:
+            if field_type not in self.FIELD_FORMATS:
+                raise ValueError(f"Unsupported type {field_type} for field {field_name}")
+        self.name = f"schema:{name}"
+        self.fields = list(fields)
+        self.header = struct.Struct('<' + ''.join(self.FIELD_FORMATS[t] for _, t in self.fields))
+        self.variable = [i for i, (_, t) in enumerate(self.fields) if t in ('str', 'bytes')]
+
+    def encode(self, value):
+        header_values = []
+        payloads = []
+        for field_name, field_type in self.fields:
+            field_value = value[field_name]
+            if field_type == 'str':
+                field_value = field_value.encode('utf-8')
+            if field_type in ('str', 'bytes'):
+                payloads.append(field_value)
+                field_value = len(field_value)
+            header_values.append(field_value)
+        return self.header.pack(*header_values) + b''.join(payloads)
+
+    def decode(self, data):
+        view = memoryview(data)
+        header_values = list(self.header.unpack_from(view))
+        position = self.header.size
+        for i in self.variable:
+            length = header_values[i]
+            chunk = view[position:position + length]
+            header_values[i] = str(chunk, 'utf-8') if self.fields[i][1] == 'str' else chunk.tobytes()
+            position += length
+        return {field_name: header_values[i] for i, (field_name, _) in enumerate(self.fields)}
+
+
+_CODECS = {'json': JsonCodec()}
+if orjson is not None:
+    _CODECS['orjson'] = OrjsonCodec()
+if msgpack is not None:
+    _CODECS['msgpack'] = MsgpackCodec()
+
+
+def register_codec(codec):
+    _CODECS[codec.name] = codec
+    return codec
+
+
+# Schema of the records handled by process_message
+register_codec(SchemaCodec('record', [('key', 'int'), ('value', 'int')]))
+
+
+def available_codecs():
+    return sorted(_CODECS)
+
+
+def get_codec(name):
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown codec '{name}', available: {', '.join(available_codecs())}")
+
+
+def _parse_topic_codecs(spec):
+    mapping = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        topic, _, codec_name = entry.partition('=')
+        mapping[topic.strip()] = codec_name.strip()
+    return mapping
+
+
+TOPIC_CODECS = _parse_topic_codecs(KAFKA_TOPIC_CODECS)
+
+
+def codec_for_topic(topic):
+    return get_codec(TOPIC_CODECS.get(topic, DEFAULT_CODEC))
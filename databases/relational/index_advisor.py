@@ -0,0 +1,343 @@
+import os
+import random
+import re
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+# Index and query-plan advisor: loads schema.sql into SQLite, fills it with
+# synthetic data, replays a workload file and proposes secondary indexes whose
+# before/after latency is measured on the same data.
+
+RELATIONAL_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.getenv("ADVISOR_SCHEMA", os.path.join(RELATIONAL_DIR, "schema.sql"))
+WORKLOAD_FILE = os.getenv("ADVISOR_WORKLOAD", os.path.join(RELATIONAL_DIR, "workload.sql"))
+DATABASE = os.getenv("ADVISOR_DATABASE", ":memory:")
+OUTPUT_FILE = os.getenv("ADVISOR_OUTPUT")
+
+# Data volume: ADVISOR_SCALE=1 is 10k users, 50k orders and 150k order items
+SCALE = float(os.getenv("ADVISOR_SCALE", "1"))
+SEED = int(os.getenv("ADVISOR_SEED", "42"))
+
+# Measurement configuration
+REPEAT = int(os.getenv("ADVISOR_REPEAT", "5"))
+MIN_GAIN = float(os.getenv("ADVISOR_MIN_GAIN", "0.2"))
+# "schema" measures against the indexes declared in schema.sql, "bare" drops
+# them first so only PRIMARY KEY/UNIQUE indexes remain
+BASELINE = os.getenv("ADVISOR_BASELINE", "schema")
+
+# PostgreSQL-only statements that have no SQLite counterpart
+SKIPPED_STATEMENTS = ("CREATE OR REPLACE FUNCTION", "CREATE FUNCTION", "CREATE TRIGGER",
+                      "CREATE SEQUENCE", "CREATE EVENT TRIGGER")
+
+ORDER_STATUSES = ("pending", "shipped", "delivered", "canceled")
+PAYMENT_METHODS = ("credit_card", "paypal", "bank_transfer")
+
+SQL_KEYWORDS = {"WHERE", "JOIN", "ON", "ORDER", "GROUP", "LIMIT", "INNER", "LEFT", "RIGHT",
+                "OUTER", "CROSS", "HAVING", "UNION", "USING"}
+
+
+def split_statements(sql):
+    """Split a SQL script on semicolons, keeping $$-quoted bodies intact."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    statements, current, quoted = [], [], False
+    for part in re.split(r"(\$\$|;)", sql):
+        if part == "$$":
+            quoted = not quoted
+            current.append(part)
+        elif part == ";" and not quoted:
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(part)
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def to_sqlite(statement):
+    """Translate one PostgreSQL DDL statement to SQLite, or None to skip it."""
+    normalized = " ".join(statement.split()).upper()
+    if normalized.startswith(SKIPPED_STATEMENTS):
+        return None
+    statement = re.sub(r"\bSERIAL\s+PRIMARY\s+KEY\b", "INTEGER PRIMARY KEY", statement, flags=re.I)
+    return re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b", "", statement, flags=re.I)
+
+
+def load_schema(conn, schema_file=SCHEMA_FILE, baseline=BASELINE):
+    with open(schema_file) as f:
+        statements = split_statements(f.read())
+    for statement in statements:
+        translated = to_sqlite(statement)
+        if translated is None:
+            continue
+        if baseline == "bare" and re.match(r"CREATE\s+INDEX", translated, re.I):
+            continue
+        conn.execute(translated)
+    conn.commit()
+
+
+def _timestamp(rng, start=datetime(2023, 1, 1), days=730):
+    return (start + timedelta(seconds=rng.randrange(days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generate_data(conn, scale=SCALE, seed=SEED):
+    """Fill every table with reproducible synthetic rows proportional to scale."""
+    rng = random.Random(seed)
+    users = max(int(10000 * scale), 10)
+    products = max(int(2000 * scale), 10)
+    suppliers = max(int(200 * scale), 5)
+    orders = users * 5
+    roles, categories = 10, 50
+
+    conn.executemany(
+        "INSERT INTO users (user_id, username, email, password_hash, first_name, last_name, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, f"user{i}", f"user{i}@example.com", f"hash{i}", f"First{i}", f"Last{i}", _timestamp(rng))
+         for i in range(1, users + 1)))
+    conn.executemany("INSERT INTO roles (role_id, role_name) VALUES (?, ?)",
+                     ((i, f"role{i}") for i in range(1, roles + 1)))
+    conn.executemany(
+        "INSERT INTO user_roles (user_id, role_id) VALUES (?, ?)",
+        ((u, r) for u in range(1, users + 1) for r in rng.sample(range(1, roles + 1), 2)))
+    conn.executemany(
+        "INSERT INTO products (product_id, product_name, price, stock_quantity) VALUES (?, ?, ?, ?)",
+        ((i, f"product{i}", round(rng.uniform(1, 500), 2), rng.randrange(1000))
+         for i in range(1, products + 1)))
+    conn.executemany("INSERT INTO categories (category_id, category_name) VALUES (?, ?)",
+                     ((i, f"category{i}") for i in range(1, categories + 1)))
+    conn.executemany(
+        "INSERT INTO product_categories (product_id, category_id) VALUES (?, ?)",
+        ((p, c) for p in range(1, products + 1) for c in rng.sample(range(1, categories + 1), 2)))
+    conn.executemany(
+        "INSERT INTO orders (order_id, user_id, order_date, status, total, shipping_address) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((i, rng.randint(1, users), _timestamp(rng), rng.choice(ORDER_STATUSES),
+          round(rng.uniform(5, 2000), 2), f"{i} Main Street") for i in range(1, orders + 1)))
+    conn.executemany(
+        "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (?, ?, ?, ?)",
+        ((o, p, rng.randint(1, 5), round(rng.uniform(1, 500), 2))
+         for o in range(1, orders + 1) for p in rng.sample(range(1, products + 1), 3)))
+    conn.executemany(
+        "INSERT INTO payments (payment_id, order_id, payment_date, amount, payment_method) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((i, i, _timestamp(rng), round(rng.uniform(5, 2000), 2), rng.choice(PAYMENT_METHODS))
+         for i in range(1, orders + 1)))
+    conn.executemany("INSERT INTO suppliers (supplier_id, supplier_name) VALUES (?, ?)",
+                     ((i, f"supplier{i}") for i in range(1, suppliers + 1)))
+    conn.executemany(
+        "INSERT INTO supplier_products (supplier_id, product_id, supply_price) VALUES (?, ?, ?)",
+        ((s, p, round(rng.uniform(1, 400), 2))
+         for p in range(1, products + 1) for s in rng.sample(range(1, suppliers + 1), 3)))
+    conn.executemany(
+        "INSERT INTO audit_logs (user_id, action, action_time) VALUES (?, ?, ?)",
+        ((rng.randint(1, users), rng.choice(("INSERT on users", "UPDATE on users")), _timestamp(rng))
+         for _ in range(users * 2)))
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def load_workload(workload_file=WORKLOAD_FILE):
+    with open(workload_file) as f:
+        return split_statements(f.read())
+
+
+def explain(conn, query):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+def measure(conn, query, repeat=REPEAT):
+    """Median wall-clock latency of a query in milliseconds, after one warm-up run."""
+    conn.execute(query).fetchall()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def table_columns(conn):
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return {table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")] for table in tables}
+
+
+def indexed_prefixes(conn, table):
+    """Column lists of every index on a table, including the rowid primary key."""
+    prefixes = []
+    pk = [row for row in conn.execute(f"PRAGMA table_info({table})") if row[5]]
+    if len(pk) == 1 and pk[0][2].upper() == "INTEGER":
+        prefixes.append((pk[0][1],))
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info({index[1]})")]
+        prefixes.append(tuple(columns))
+    return prefixes
+
+
+def is_covered(conn, table, columns):
+    return any(existing[:len(columns)] == tuple(columns) for existing in indexed_prefixes(conn, table))
+
+
+def candidate_indexes(query, columns):
+    """
+    Derive index candidates from a query: the columns each table is filtered or
+    joined on, optionally followed by its ORDER BY column.
+    """
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", query, re.I):
+        if table in columns:
+            aliases[table] = table
+            if alias and alias.upper() not in SQL_KEYWORDS:
+                aliases[alias] = table
+
+    def resolve(qualifier, column):
+        if qualifier:
+            table = aliases.get(qualifier)
+            return table if table and column in columns[table] else None
+        owners = {t for t in aliases.values() if column in columns[t]}
+        return owners.pop() if len(owners) == 1 else None
+
+    body = re.split(r"\bFROM\b", query, maxsplit=1, flags=re.I)[-1]
+    body, order_by = (re.split(r"\bORDER\s+BY\b", body, maxsplit=1, flags=re.I) + [""])[:2]
+    order_by = re.split(r"\bLIMIT\b", order_by, flags=re.I)[0]
+    predicates = re.findall(r"(?:(\w+)\.)?(\w+)\s*(?:=|<=|>=|<>|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b)", body, re.I)
+    predicates += re.findall(r"=\s*(\w+)\.(\w+)", body)
+
+    filtered = {}
+    for qualifier, column in predicates:
+        table = resolve(qualifier, column)
+        if table and column not in filtered.setdefault(table, []):
+            filtered[table].append(column)
+
+    ordered = {}
+    for qualifier, column in re.findall(r"(?:(\w+)\.)?(\w+)(?:\s+(?:ASC|DESC))?", order_by):
+        table = resolve(qualifier, column)
+        if table:
+            ordered.setdefault(table, column)
+
+    candidates = []
+    for table, cols in filtered.items():
+        for column in cols:
+            candidates.append((table, (column,)))
+            if table in ordered and ordered[table] != column:
+                candidates.append((table, (column, ordered[table])))
+    return candidates
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def index_ddl(table, columns):
+    return f"CREATE INDEX {index_name(table, columns)} ON {table}({', '.join(columns)})"
+
+
+def evaluate_candidate(conn, table, columns, queries):
+    """Create a candidate index, re-measure the queries it targets and drop it again."""
+    before = {query: measure(conn, query) for query in queries}
+    conn.execute(index_ddl(table, columns))
+    try:
+        after = {query: measure(conn, query) for query in queries}
+        plans = {query: explain(conn, query) for query in queries}
+    finally:
+        conn.execute(f"DROP INDEX {index_name(table, columns)}")
+    return before, after, plans
+
+
+def advise(conn, workload):
+    """
+    Replay the workload, then test every uncovered candidate index in isolation.
+    Candidates that speed up their queries by at least MIN_GAIN are proposed;
+    a candidate that is a prefix of a better proposal on the same table is dropped.
+    """
+    columns = table_columns(conn)
+    targets = {}
+    for query in workload:
+        for table, cols in candidate_indexes(query, columns):
+            if not is_covered(conn, table, cols):
+                targets.setdefault((table, cols), []).append(query)
+
+    accepted = []
+    for (table, cols), queries in targets.items():
+        before, after, plans = evaluate_candidate(conn, table, cols, queries)
+        total_before, total_after = sum(before.values()), sum(after.values())
+        gain = 1 - total_after / total_before if total_before else 0.0
+        if gain >= MIN_GAIN:
+            accepted.append({"table": table, "columns": cols, "queries": queries, "gain": gain,
+                             "before_ms": total_before, "after_ms": total_after, "plans": plans})
+
+    accepted.sort(key=lambda proposal: proposal["gain"], reverse=True)
+    proposals = []
+    for proposal in accepted:
+        superseded = any(p["table"] == proposal["table"]
+                         and p["columns"][:len(proposal["columns"])] == proposal["columns"]
+                         and set(proposal["queries"]) <= set(p["queries"]) for p in proposals)
+        redundant = any(p["table"] == proposal["table"]
+                        and proposal["columns"][:len(p["columns"])] == p["columns"] for p in proposals)
+        if not superseded and not redundant:
+            proposals.append(proposal)
+    return proposals
+
+
+def replay(conn, workload):
+    return [(query, measure(conn, query), explain(conn, query)) for query in workload]
+
+
+def summarize(query):
+    return " ".join(query.split())[:90]
+
+
+def print_replay(title, results):
+    print(title)
+    for query, latency, plan in results:
+        print(f"  {latency:>9.3f} ms  {summarize(query)}")
+        for step in plan:
+            print(f"               {step}")
+
+
+def run_advisor():
+    conn = sqlite3.connect(DATABASE)
+    start = time.time()
+    load_schema(conn)
+    generate_data(conn)
+    print(f"Loaded {SCHEMA_FILE} with scale {SCALE} in {time.time() - start:.1f}s (baseline: {BASELINE})")
+
+    workload = load_workload()
+    before = replay(conn, workload)
+    print_replay("Workload before:", before)
+
+    proposals = advise(conn, workload)
+    if not proposals:
+        print("No index proposals: every workload query is already served by an index.")
+        return []
+
+    print("Proposed indexes:")
+    for proposal in proposals:
+        print(f"  {index_ddl(proposal['table'], proposal['columns'])};")
+        print(f"      {proposal['before_ms']:.3f} ms -> {proposal['after_ms']:.3f} ms "
+              f"({proposal['gain']:.0%} faster) over {len(proposal['queries'])} queries")
+
+    for proposal in proposals:
+        conn.execute(index_ddl(proposal["table"], proposal["columns"]))
+    conn.execute("ANALYZE")
+    after = replay(conn, workload)
+    print_replay("Workload after:", after)
+    total_before = sum(latency for _, latency, _ in before)
+    total_after = sum(latency for _, latency, _ in after)
+    print(f"Total workload latency: {total_before:.3f} ms -> {total_after:.3f} ms")
+
+    if OUTPUT_FILE:
+        with open(OUTPUT_FILE, "w") as f:
+            for proposal in proposals:
+                f.write(f"{index_ddl(proposal['table'], proposal['columns'])};\n")
+        print(f"Wrote {len(proposals)} index statements to {OUTPUT_FILE}")
+    conn.close()
+    return proposals
+
+
+if __name__ == "__main__":
+    run_advisor()
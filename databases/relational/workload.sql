@@ -0,0 +1,61 @@
+-- Representative read workload replayed by index_advisor.py.
+-- One statement per query; literal ids fall inside the synthetic data range.
+
+-- Order history page
+SELECT o.order_id, o.order_date, o.status, o.total
+FROM orders o
+WHERE o.user_id = 42
+ORDER BY o.order_date DESC;
+
+-- Order detail with line items
+SELECT oi.product_id, p.product_name, oi.quantity, oi.unit_price
+FROM order_items oi
+JOIN products p ON p.product_id = oi.product_id
+WHERE oi.order_id = 1234;
+
+-- Who bought this product
+SELECT o.user_id, o.order_date
+FROM order_items oi
+JOIN orders o ON o.order_id = oi.order_id
+WHERE oi.product_id = 77;
+
+-- Payments for an order
+SELECT payment_id, amount, payment_method
+FROM payments
+WHERE order_id = 1234;
+
+-- Users holding a role
+SELECT u.user_id, u.username
+FROM user_roles ur
+JOIN users u ON u.user_id = ur.user_id
+WHERE ur.role_id = 3;
+
+-- Products in a category
+SELECT p.product_id, p.product_name, p.price
+FROM product_categories pc
+JOIN products p ON p.product_id = pc.product_id
+WHERE pc.category_id = 12;
+
+-- Suppliers of a product
+SELECT s.supplier_name, sp.supply_price
+FROM supplier_products sp
+JOIN suppliers s ON s.supplier_id = sp.supplier_id
+WHERE sp.product_id = 77;
+
+-- Pending orders queue
+SELECT order_id, user_id, total
+FROM orders
+WHERE status = 'pending'
+ORDER BY order_date
+LIMIT 100;
+
+-- Audit trail for a user
+SELECT action, action_time
+FROM audit_logs
+WHERE user_id = 42
+ORDER BY action_time DESC;
+
+-- Login lookup
+SELECT user_id, password_hash
+FROM users
+WHERE email = 'user42@example.com';
@@ -18,6 +18,16 @@ if [ ! -f "$CONFIG_FILE" ]; then
   exit 1
 fi
 
+# Pre-merge the configuration into a binary snapshot next to the YAML so
+# loaders started with use_snapshot (the database migrations) skip YAML parsing
+echo "Writing configuration snapshot..."
+python3 - "$ROOT_DIR" "$ENV" <<'EOF_PY'
+import os, sys
+sys.path.insert(0, os.path.join(sys.argv[1], "utils", "helpers"))
+from config_loader import ConfigLoader
+print(ConfigLoader(os.path.join(sys.argv[1], "configs"), sys.argv[2]).write_snapshot("config"))
+EOF_PY
+
 # Build Service A
 echo "Building Service A..."
 cd "$ROOT_DIR/services/service-a"
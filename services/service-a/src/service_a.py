@@ -1,51 +1,114 @@
+import asyncio
 import logging
 import os
+import sys
 import yaml
-import requests
-import json
+import threading
 import time
-from functools import lru_cache
 from requests.exceptions import RequestException
 
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
+sys.path.insert(0, os.path.join(REPO_ROOT, "utils", "helpers"))
+from http_client import get_client  # noqa: E402
+from service_a_cache import CACHE_STALE_SECONDS, CACHE_TTL_SECONDS, shared_cache  # noqa: E402
+
 # Initialize logger
 logger = logging.getLogger("service_a")
 logging.basicConfig(level=logging.INFO)
 
+# Seconds a parsed config is trusted before its file is checked for changes again
+CONFIG_TTL_SECONDS = float(os.getenv("CONFIG_TTL_SECONDS", "5"))
+
+# Upstream calls share one keep-alive connection pool; a stalled upstream
+# fails with a timeout instead of hanging the worker
+HEALTH_CHECK_URL = os.getenv("HEALTH_CHECK_URL", "http://localhost:8080/health")
+HEALTH_CHECK_TIMEOUT_S = float(os.getenv("HEALTH_CHECK_TIMEOUT_S", "2"))
+
+# Upper bound on concurrent requests when fetching several endpoints or pages;
+# keep it at or below the client's pool_maxsize so every request reuses a connection
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+
+# Directory of the local response cache, unless `api.cache_dir` or the
+# processor's cache_dir argument names another one
+CACHE_DIR = os.getenv("SERVICE_A_CACHE_DIR", "cache")
+
 # Retry decorator for API calls
 def retry(tries, delay=3, backoff=2):
     def retry_decorator(func):
         def wrapper(*args, **kwargs):
             attempt = 0
+            _delay = delay
             while attempt < tries:
                 try:
                     return func(*args, **kwargs)
                 except RequestException as e:
                     attempt += 1
                     logger.error(f"Error during API call: {e}. Retrying {attempt}/{tries}...")
-                    time.sleep(delay)
-                    delay *= backoff
+                    time.sleep(_delay)
+                    _delay *= backoff
             logger.error("Max retries exceeded.")
             return None
         return wrapper
     return retry_decorator
 
-# Caching the config loader to avoid reading the file multiple times
-@lru_cache(maxsize=1)
+# Parsed configs are cached per file version and shared by every ConfigLoader,
+# so processors built from the same file hold the same dict (treat it as read-only)
 class ConfigLoader:
-    def __init__(self, config_file):
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, config_file, ttl=CONFIG_TTL_SECONDS):
         self.config_file = config_file
+        self.ttl = ttl
         self.config = None
 
+    @classmethod
+    def invalidate(cls, config_file=None):
+        with cls._lock:
+            if config_file is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(os.path.abspath(config_file), None)
+
     def load_config(self):
-        logger.info(f"Loading configuration from {self.config_file}")
+        path = os.path.abspath(self.config_file)
+        now = time.monotonic()
+        entry = self._cache.get(path)
+        if entry is not None and now - entry["checked_at"] < self.ttl:
+            self.config = entry["config"]
+            return self.config
+
         try:
-            with open(self.config_file, 'r') as file:
-                self.config = yaml.safe_load(file)
-            logger.info(f"Configuration loaded: {self.config}")
+            stat = os.stat(path)
         except FileNotFoundError:
             logger.error(f"Config file {self.config_file} not found")
-        except yaml.YAMLError as e:
-            logger.error(f"Error parsing YAML: {e}")
+            return self._last_known(entry)
+
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None and entry["version"] == version:
+                entry["checked_at"] = now
+                self.config = entry["config"]
+                return self.config
+
+            logger.info(f"Loading configuration from {self.config_file}")
+            try:
+                with open(path, 'r') as file:
+                    config = yaml.safe_load(file)
+            except yaml.YAMLError as e:
+                logger.error(f"Error parsing YAML: {e}")
+                return self._last_known(entry)
+            logger.info(f"Configuration loaded: {config}")
+            self._cache[path] = {"version": version, "config": config, "checked_at": now}
+        self.config = config
+        return self.config
+
+    def _last_known(self, entry):
+        # Keep serving the last good version while the file is missing or broken
+        if entry is not None:
+            logger.warning(f"Using last known configuration for {self.config_file}")
+            self.config = entry["config"]
         return self.config
 
 class DataValidator:
@@ -61,40 +124,102 @@ class DataValidator:
         logger.info("Data validation complete")
         return True
 
+# Keyed cache: an in-process LRU in front of per-entry files under cache_dir,
+# shared by every CacheManager for the same directory. Entries are fresh for
+# ttl and kept stale_ttl longer, together with the ETag/Last-Modified they
+# were fetched with, so they can be served while being revalidated
 class CacheManager:
-    def __init__(self, cache_file="cache/data_cache.json"):
-        self.cache_file = cache_file
+    def __init__(self, cache_dir="cache", ttl=CACHE_TTL_SECONDS, stale_ttl=CACHE_STALE_SECONDS):
+        self.cache = shared_cache(cache_dir)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
 
-    def load_cache(self):
-        if os.path.exists(self.cache_file):
-            with open(self.cache_file, 'r') as file:
-                try:
-                    logger.info("Loading data from cache")
-                    return json.load(file)
-                except json.JSONDecodeError:
-                    logger.error("Cache file is corrupted")
-                    return None
-        else:
-            logger.info("No cache file found, starting fresh")
+    def load_entry(self, key="data"):
+        entry = self.cache.get(key)
+        if not isinstance(entry, dict) or "stored_at" not in entry:
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def load_cache(self, key="data"):
+        entry = self.load_entry(key)
+        if entry is None or not self.is_fresh(entry):
+            logger.info("No cached data found, starting fresh")
             return None
+        logger.info("Loading data from cache")
+        return entry["data"]
 
-    def save_cache(self, data):
+    def save_cache(self, data, key="data", validators=None):
         logger.info("Saving data to cache")
-        with open(self.cache_file, 'w') as file:
-            json.dump(data, file)
+        entry = {"data": data, "stored_at": time.time(), "etag": None, "last_modified": None}
+        self._store(key, entry, validators)
         logger.info("Data saved to cache successfully")
 
+    def touch(self, key, entry, validators=None):
+        # Upstream answered 304: the cached data is current again
+        self._store(key, dict(entry, stored_at=time.time()), validators)
+
+    def _store(self, key, entry, validators):
+        for name in ("etag", "last_modified"):
+            if validators and validators.get(name):
+                entry[name] = validators[name]
+        self.cache.set(key, entry, ttl=self.ttl + self.stale_ttl)
+
+    def stats(self):
+        return self.cache.stats_snapshot()
+
+# Combine payloads from several sources: lists are concatenated, sections
+# merged and scalars from later payloads win
+def merge_payload(merged, data):
+    for key, value in data.items():
+        current = merged.get(key)
+        if isinstance(current, list) and isinstance(value, list):
+            current.extend(value)
+        elif isinstance(current, dict) and isinstance(value, dict):
+            merge_payload(current, value)
+        elif isinstance(value, list):
+            merged[key] = list(value)
+        elif isinstance(value, dict):
+            merged[key] = merge_payload({}, value)
+        else:
+            merged[key] = value
+    return merged
+
 class ServiceAProcessor:
-    def __init__(self, config):
-        self.api_endpoint = config['api']['endpoint']
-        self.api_key = config['api']['key']
-        self.cache_manager = CacheManager()
+    # Cache keys with a background refresh in flight, shared across processors
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
+
+    def __init__(self, config, cache_dir=None):
+        api = config['api']
+        self.api_key = api['key']
+        # `endpoints` lists several sources; `pages` fetches each endpoint page by page
+        self.api_endpoints = api.get('endpoints') or [api['endpoint']]
+        self.api_endpoint = api.get('endpoint', self.api_endpoints[0])
+        self.pages = api.get('pages', 1)
+        self.page_param = api.get('page_param', 'page')
+        self.fetch_concurrency = api.get('concurrency', FETCH_CONCURRENCY)
+        self.cache_key = "|".join(self.api_endpoints) + (f"#pages={self.pages}" if self.pages > 1 else "")
+        self.cache_manager = CacheManager(cache_dir or api.get('cache_dir', CACHE_DIR),
+                                          ttl=api.get('cache_ttl', CACHE_TTL_SECONDS),
+                                          stale_ttl=api.get('cache_stale_ttl', CACHE_STALE_SECONDS))
+
+    def sources(self):
+        if self.pages <= 1:
+            return [(endpoint, None) for endpoint in self.api_endpoints]
+        return [(endpoint, {self.page_param: page})
+                for endpoint in self.api_endpoints for page in range(1, self.pages + 1)]
 
-    @retry(tries=3)
     def fetch_data(self):
-        logger.info(f"Fetching data from {self.api_endpoint}")
+        return self.fetch_source(self.api_endpoint)
+
+    @retry(tries=3)
+    def fetch_source(self, url, params=None):
+        logger.info(f"Fetching data from {url}" + (f" with {params}" if params else ""))
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        response = requests.get(self.api_endpoint, headers=headers)
+        response = get_client("service_a").get(url, headers=headers, params=params)
         if response.status_code == 200:
             logger.info("Data fetched successfully")
             return response.json()
@@ -102,39 +227,131 @@ class ServiceAProcessor:
             logger.error(f"Failed to fetch data: {response.status_code}")
             return None
 
+    @retry(tries=3)
+    def fetch_conditional(self, entry=None):
+        # Revalidate against the ETag/Last-Modified stored with a cached entry;
+        # returns (status, data, validators) and data is None on a 304
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        logger.info(f"Fetching data from {self.api_endpoint}" + (" (conditional)" if len(headers) > 1 else ""))
+        response = get_client("service_a").get(self.api_endpoint, headers=headers)
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        if response.status_code == 304:
+            logger.info("Data not modified since it was cached")
+            return response.status_code, None, validators
+        if response.status_code == 200:
+            logger.info("Data fetched successfully")
+            return response.status_code, response.json(), validators
+        logger.error(f"Failed to fetch data: {response.status_code}")
+        return response.status_code, None, {}
+
+    async def fetch_all_async(self):
+        # Requests run on the pooled client in worker threads; the semaphore
+        # bounds how many are in flight, so a run costs about the slowest
+        # source instead of the sum of all of them. Results are merged in
+        # sources() order, so pages keep their order and later pages win. A
+        # source that fails is skipped and the others are still merged
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+
+        async def fetch(url, params):
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_source, url, params)
+
+        sources = self.sources()
+        results = await asyncio.gather(*(fetch(url, params) for url, params in sources), return_exceptions=True)
+        merged, fetched = {}, 0
+        for (url, params), data in zip(sources, results):
+            if isinstance(data, Exception):
+                logger.error(f"Fetching {url}" + (f" with {params}" if params else "") + f" failed: {data}")
+            elif isinstance(data, dict):
+                merge_payload(merged, data)
+                fetched += 1
+        logger.info(f"Fetched {fetched}/{len(sources)} sources")
+        return merged if fetched else None
+
+    def fetch_all(self):
+        return asyncio.run(self.fetch_all_async())
+
+    def fetch_latest(self, entry=None):
+        # Several sources are merged from full responses, so only a single
+        # endpoint is revalidated with a conditional request
+        if len(self.sources()) > 1:
+            data = self.fetch_all()
+            return (200 if data else None), data, {}
+        return self.fetch_conditional(entry) or (None, None, {})
+
+    def refresh(self, entry=None):
+        status, data, validators = self.fetch_latest(entry)
+        if status == 304 and entry is not None:
+            self.cache_manager.touch(self.cache_key, entry, validators)
+            return entry["data"]
+        if data:
+            return self.handle_data(data, validators=validators)
+        logger.error("Refresh failed, keeping cached data")
+
+    def refresh_in_background(self, entry):
+        # One refresh per cache key at a time; the thread is not a daemon so a
+        # one-shot run still stores the refreshed data before exiting
+        with self._refreshing_lock:
+            if self.cache_key in self._refreshing:
+                return None
+            self._refreshing.add(self.cache_key)
+
+        def run():
+            try:
+                self.refresh(entry)
+            except Exception as e:
+                logger.error(f"Background refresh failed: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(self.cache_key)
+
+        thread = threading.Thread(target=run, name="service-a-refresh")
+        thread.start()
+        return thread
+
     def process_data(self, data):
         logger.info("Processing data...")
         processed_data = {key: value for key, value in data.items() if value is not None}
         logger.info(f"Processed data: {processed_data}")
         return processed_data
 
-    def handle_data(self, data):
+    def handle_data(self, data, cached=False, validators=None):
         if not DataValidator.validate_data(data):
             logger.error("Invalid data, aborting processing")
             return
 
         logger.info("Data validation passed, proceeding with caching and processing")
-        self.cache_manager.save_cache(data)
+        if not cached:
+            self.cache_manager.save_cache(data, self.cache_key, validators)
         processed_data = self.process_data(data)
         logger.info(f"Final processed data: {processed_data}")
         return processed_data
 
     def execute(self):
-        cached_data = self.cache_manager.load_cache()
-        if cached_data:
-            logger.info("Using cached data")
-            return self.handle_data(cached_data)
+        entry = self.cache_manager.load_entry(self.cache_key)
+        if entry is not None:
+            if self.cache_manager.is_fresh(entry):
+                logger.info("Using cached data")
+            else:
+                logger.info("Using stale cached data while it is refreshed in the background")
+                self.refresh_in_background(entry)
+            return self.handle_data(entry["data"], cached=True)
 
-        raw_data = self.fetch_data()
+        _, raw_data, validators = self.fetch_latest()
         if raw_data:
-            return self.handle_data(raw_data)
+            return self.handle_data(raw_data, validators=validators)
         else:
             logger.error("No data fetched or found in cache")
 
 def health_check():
     logger.info("Performing health check...")
     try:
-        response = requests.get("http://localhost:8080/health")
+        response = get_client("service_a").get(HEALTH_CHECK_URL, timeout=HEALTH_CHECK_TIMEOUT_S)
         if response.status_code == 200:
             logger.info("Service is healthy")
             return True
@@ -0,0 +1,529 @@
+import hashlib
+import json
+import logging
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger("service_a")
+
+# Cache limits; entries older than the TTL are treated as missing in every tier
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+# How long past its TTL an entry may still be served while it is refreshed
+CACHE_STALE_SECONDS = float(os.getenv("CACHE_STALE_SECONDS", "3600"))
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "1024"))
+CACHE_MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Disk tier: "log" is the append-only mmap store, "files" keeps one JSON file
+# per entry. The log has a single writer: a process that finds the directory's
+# log locked by another one (workers or pods sharing a volume) opens it
+# read-only, follows the writer's appends and keeps its own sets in memory
+CACHE_STORAGE = os.getenv("CACHE_STORAGE", "log")
+# Compact the log once dead records make up this share of it, and it is at least the minimum size
+CACHE_COMPACT_RATIO = float(os.getenv("CACHE_COMPACT_RATIO", "0.5"))
+CACHE_COMPACT_MIN_BYTES = int(os.getenv("CACHE_COMPACT_MIN_BYTES", str(16 * 1024 * 1024)))
+# How often an append also counts expired records as dead; expired keys that
+# are never read again would otherwise keep the log from ever compacting
+CACHE_EXPIRY_SCAN_INTERVAL_S = float(os.getenv("CACHE_EXPIRY_SCAN_INTERVAL_S", "60"))
+
+
+class CacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def incr(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value, expires_at, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+    def expired(self, now=None):
+        return (now if now is not None else time.time()) >= self.expires_at
+
+
+# In-process tier: LRU bounded by entry count and by the serialized size of
+# the values it holds. Values are shared, not copied; treat them as read-only
+class MemoryCache:
+    def __init__(self, stats, max_entries=CACHE_MEMORY_MAX_ENTRIES, max_bytes=CACHE_MEMORY_MAX_BYTES):
+        self.stats = stats
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expired():
+                self._remove(key)
+                self.stats.incr("expirations")
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if entry.size > self.max_bytes:
+            # Never let one oversized value flush the whole tier
+            self.delete(key)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.incr("evictions")
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Disk tier: one JSON file per key, written to a temporary file and renamed
+# into place so readers never see a partial entry
+class DiskCache:
+    def __init__(self, stats, cache_dir):
+        self.stats = stats
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                raw = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error(f"Cache entry for {key} is corrupted")
+            self.delete(key)
+            return None
+        entry = CacheEntry(record["value"], record["expires_at"], len(raw))
+        if entry.expired():
+            self.delete(key)
+            self.stats.incr("expirations")
+            return None
+        return entry
+
+    def set(self, key, value, expires_at):
+        payload = json.dumps({"key": key, "expires_at": expires_at, "value": value}).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(payload)
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self):
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "rb") as file:
+                    expires_at = json.loads(file.read())["expires_at"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if now >= expires_at:
+                os.unlink(path)
+                removed += 1
+        self.stats.incr("expirations", removed)
+        return removed
+
+
+# Record layout of the log: header, key, marshalled value. A record with the
+# tombstone flag and no value deletes the key
+RECORD_HEADER = struct.Struct("<4sBdIII")
+RECORD_MAGIC = b"SAC1"
+FLAG_TOMBSTONE = 1
+
+
+# Exclusive, non-blocking lock for the log's single writer; it is taken on a
+# separate file because compaction replaces the log file itself. Raises
+# BlockingIOError while another process holds it
+def _lock_writer(path):
+    lock_file = open(path, "a+b")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise
+    return lock_file
+
+
+def _copy_range(source, out, start, length, chunk_size=1024 * 1024):
+    source.seek(start)
+    while length > 0:
+        chunk = source.read(min(chunk_size, length))
+        out.write(chunk)
+        length -= len(chunk)
+
+
+# Disk tier as an append-only log read through mmap. An in-memory index maps
+# each key to the offset of its latest value, so one entry is read without
+# touching the rest of the file. Superseded records are dropped by background
+# compaction, which rewrites the live records into a new log. A read-only
+# store never writes: it tails the records the writer appends, reopens the log
+# after the writer compacts it, and its sets and deletes stay local
+class LogStore:
+    def __init__(self, stats, cache_dir, compact_ratio=CACHE_COMPACT_RATIO,
+                 compact_min_bytes=CACHE_COMPACT_MIN_BYTES, expiry_scan_interval=CACHE_EXPIRY_SCAN_INTERVAL_S,
+                 read_only=False):
+        self.stats = stats
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "cache.log")
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.expiry_scan_interval = expiry_scan_interval
+        self.read_only = read_only
+        self._next_expiry_scan = time.monotonic() + expiry_scan_interval
+        self.dead_bytes = 0
+        self.size = 0
+        self._index = {}
+        self._lock = threading.RLock()
+        self._mmap = None
+        self._compacting = False
+        self._compaction_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        if read_only:
+            self._writer_lock = None
+            self._file = os.fdopen(os.open(self.path, os.O_RDONLY | os.O_CREAT, 0o644), "rb")
+        else:
+            self._writer_lock = _lock_writer(f"{self.path}.lock")
+            self._file = open(self.path, "a+b")
+        self._load_index()
+
+    def _load_index(self):
+        # Rebuild the index from record headers only; a torn record at the tail
+        # (crash during an append) is cut off
+        size = os.fstat(self._file.fileno()).st_size
+        offset = self._scan(0, size)
+        if offset < size and not self.read_only:
+            logger.warning(f"Truncating {size - offset} bytes of incomplete records from {self.path}")
+            self._file.truncate(offset)
+        self.size = offset
+
+    def _scan(self, offset, size):
+        # Apply the complete records between offset and size of the open log;
+        # returns where they end
+        fd = self._file.fileno()
+        while offset + RECORD_HEADER.size <= size:
+            magic, flags, expires_at, key_len, value_len, crc = RECORD_HEADER.unpack(
+                os.pread(fd, RECORD_HEADER.size, offset))
+            end = offset + RECORD_HEADER.size + key_len + value_len
+            if magic != RECORD_MAGIC or end > size:
+                break
+            key = os.pread(fd, key_len, offset + RECORD_HEADER.size)
+            if zlib.crc32(key) != crc:
+                break
+            self._apply(key.decode("utf-8"), flags, expires_at, offset, key_len, value_len)
+            offset = end
+        return offset
+
+    def _follow(self):
+        # Read-only: pick up the writer's appends, or start over on the log
+        # that compaction put in place
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != os.fstat(self._file.fileno()).st_ino:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+            self._file = open(self.path, "rb")
+            self._index, self.dead_bytes, self.size = {}, 0, 0
+            stat = os.fstat(self._file.fileno())
+        if stat.st_size > self.size:
+            # A record the writer is still appending is picked up on a later call
+            self.size = self._scan(self.size, stat.st_size)
+
+    def _apply(self, key, flags, expires_at, offset, key_len, value_len):
+        record_len = RECORD_HEADER.size + key_len + value_len
+        previous = self._index.pop(key, None)
+        if previous is not None:
+            self.dead_bytes += previous[3]
+        if flags & FLAG_TOMBSTONE:
+            self.dead_bytes += record_len
+        else:
+            self._index[key] = (offset + RECORD_HEADER.size + key_len, value_len, expires_at, record_len)
+
+    def _append(self, key, flags, expires_at, value=b""):
+        if self.read_only:
+            with self._lock:
+                self._index.pop(key, None)
+            return len(value)
+        key_bytes = key.encode("utf-8")
+        header = RECORD_HEADER.pack(RECORD_MAGIC, flags, expires_at, len(key_bytes), len(value), zlib.crc32(key_bytes))
+        with self._lock:
+            offset = self.size
+            self._file.write(header)
+            self._file.write(key_bytes)
+            self._file.write(value)
+            self._file.flush()
+            self.size += len(header) + len(key_bytes) + len(value)
+            self._apply(key, flags, expires_at, offset, len(key_bytes), len(value))
+        self._maybe_compact()
+        return len(value)
+
+    def _mapped(self, end):
+        # Remap lazily once appends have grown the file past the mapped region
+        if self._mmap is None or end > len(self._mmap):
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def get(self, key):
+        with self._lock:
+            if self.read_only:
+                self._follow()
+            location = self._index.get(key)
+            if location is None:
+                return None
+            offset, length, expires_at, _ = location
+            if time.time() >= expires_at:
+                self.delete(key)
+                self.stats.incr("expirations")
+                return None
+            # Copy the entry's own bytes under the lock, so compaction can close
+            # the mapping, and unmarshal them after releasing it
+            with memoryview(self._mapped(offset + length)) as mapped:
+                data = bytes(mapped[offset:offset + length])
+        try:
+            value = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            logger.error(f"Cache entry for {key} is corrupted")
+            with self._lock:
+                # Unless a newer value was written meanwhile
+                if self._index.get(key) == location:
+                    self.delete(key)
+            return None
+        return CacheEntry(value, expires_at, length)
+
+    def set(self, key, value, expires_at):
+        return self._append(key, 0, expires_at, marshal.dumps(value))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._index:
+                self._append(key, FLAG_TOMBSTONE, 0.0)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [key for key, location in self._index.items() if now >= location[2]]
+            for key in expired:
+                self.delete(key)
+        self.stats.incr("expirations", len(expired))
+        return len(expired)
+
+    def _expired_bytes(self):
+        now = time.time()
+        return sum(location[3] for location in self._index.values() if now >= location[2])
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting or self.size < self.compact_min_bytes:
+                return
+            dead = self.dead_bytes
+            if dead < self.size * self.compact_ratio and time.monotonic() >= self._next_expiry_scan:
+                self._next_expiry_scan = time.monotonic() + self.expiry_scan_interval
+                dead += self._expired_bytes()
+            if dead < self.size * self.compact_ratio:
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name="cache-log-compaction", daemon=True).start()
+
+    def compact(self):
+        with self._compaction_lock:
+            try:
+                self._compact()
+            finally:
+                self._compacting = False
+        # Appends made while compacting may already call for another pass
+        self._maybe_compact()
+
+    def _compact(self):
+        # Copy live records without holding the lock, then, under the lock,
+        # copy whatever was appended meanwhile and swap the files
+        with self._lock:
+            snapshot = dict(self._index)
+            snapshot_end = self.size
+        now = time.time()
+        tmp_path = f"{self.path}.compact"
+        new_index = {}
+        expired = 0
+        with open(tmp_path, "wb") as out, open(self.path, "rb") as source:
+            offset = 0
+            for key, (value_offset, value_len, expires_at, record_len) in snapshot.items():
+                if now >= expires_at:
+                    expired += 1
+                    continue
+                record_start = value_offset + value_len - record_len
+                _copy_range(source, out, record_start, record_len)
+                new_index[key] = (offset + (value_offset - record_start), value_len, expires_at, record_len)
+                offset += record_len
+            with self._lock:
+                source.seek(snapshot_end)
+                tail = source.read(self.size - snapshot_end)
+                out.write(tail)
+                out.flush()
+                os.replace(tmp_path, self.path)
+                if self._mmap is not None:
+                    self._mmap.close()
+                    self._mmap = None
+                self._file.close()
+                self._file = open(self.path, "a+b")
+                # Records appended during the copy are replayed on top of the copied index
+                self._index, self.dead_bytes, self.size = new_index, 0, offset
+                self._replay(tail, offset)
+        self.stats.incr("expirations", expired)
+        logger.info(f"Compacted {self.path} to {self.size} bytes")
+
+    def _replay(self, data, base_offset):
+        position = 0
+        while position < len(data):
+            magic, flags, expires_at, key_len, value_len, _ = RECORD_HEADER.unpack_from(data, position)
+            start = position + RECORD_HEADER.size
+            key = bytes(data[start:start + key_len]).decode("utf-8")
+            self._apply(key, flags, expires_at, base_offset + position, key_len, value_len)
+            position = start + key_len + value_len
+        self.size = base_offset + len(data)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+            if self._writer_lock is not None:
+                self._writer_lock.close()
+
+
+class TieredCache:
+    def __init__(self, cache_dir, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MEMORY_MAX_ENTRIES,
+                 max_bytes=CACHE_MEMORY_MAX_BYTES, storage=CACHE_STORAGE):
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self.memory = MemoryCache(self.stats, max_entries, max_bytes)
+        if storage == "log":
+            try:
+                self.disk = LogStore(self.stats, cache_dir)
+            except BlockingIOError:
+                logger.info(f"Cache log in {cache_dir} is written by another process, reading it read-only")
+                self.disk = LogStore(self.stats, cache_dir, read_only=True)
+        elif storage == "files":
+            self.disk = DiskCache(self.stats, cache_dir)
+        else:
+            raise ValueError(f"Unknown cache storage: {storage}")
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.stats.incr("memory_hits")
+            return entry.value
+        entry = self.disk.get(key)
+        if entry is not None:
+            self.stats.incr("disk_hits")
+            self.memory.set(key, entry)
+            return entry.value
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        size = self.disk.set(key, value, expires_at)
+        self.memory.set(key, CacheEntry(value, expires_at, size))
+
+    def delete(self, key):
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def stats_snapshot(self):
+        stats = self.stats.snapshot()
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_bytes"] = self.memory.bytes
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# One tiered cache per directory, so every CacheManager in the process shares
+# the same memory tier
+def shared_cache(cache_dir, **limits):
+    key = os.path.abspath(cache_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TieredCache(cache_dir, **limits)
+        return cache
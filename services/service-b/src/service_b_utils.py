@@ -1,10 +1,15 @@
 import json
 import logging
+import os
+import sys
 import time
 from datetime import datetime, timedelta
 from functools import wraps, lru_cache
 import random
-import requests
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
+sys.path.insert(0, os.path.join(REPO_ROOT, "utils", "helpers"))
+from http_client import get_client  # noqa: E402
 
 # Setup a logger
 logging.basicConfig(level=logging.INFO)
@@ -94,7 +99,7 @@ def cached_computation(x, y):
 @exception_handler
 def call_external_api(url):
     logger.info(f"Making external API call to {url}")
-    response = requests.get(url)
+    response = get_client("service_b").get(url)
     if response.status_code != 200:
         raise ValueError(f"API call failed with status code {response.status_code}")
     return response.json()
@@ -168,7 +173,7 @@ def exponential_backoff(func):
 @log_execution_time
 def api_call_with_backoff(url):
     logger.info(f"Calling API with exponential backoff: {url}")
-    response = requests.get(url)
+    response = get_client("service_b").get(url)
     if response.status_code != 200:
         raise ValueError(f"API call failed with status code {response.status_code}")
     return response.json()
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+# Runs the pipeline against the in-process broker stand-in, no cluster needed
+PIPELINE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'data-pipelines')
+sys.path.insert(0, os.path.abspath(PIPELINE_DIR))
+
+from async_pipeline import AsyncPipeline  # noqa: E402
+from local_broker import LocalAsyncConsumer, LocalAsyncProducer, LocalBroker, TopicPartition  # noqa: E402
+
+
+class TestAsyncPipelineIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = LocalBroker(partitions=2, round_trip_ms=0.5)
+        self.input_topic = 'input_topic'
+        self.output_topic = 'output_topic'
+
+    def publish(self, count):
+        async def _publish():
+            producer = LocalAsyncProducer(self.broker, value_serializer=lambda v: json.dumps(v).encode('utf-8'))
+            for i in range(count):
+                await producer.send(self.input_topic, {"key": i, "value": i})
+            await producer.stop()
+        asyncio.run(_publish())
+
+    def run_pipeline(self, expected, producer_class=LocalAsyncProducer):
+        async def _run():
+            consumer = LocalAsyncConsumer(self.broker, self.input_topic, group_id='test-group',
+                                          value_deserializer=json.loads)
+            producer = producer_class(self.broker, value_serializer=lambda v: json.dumps(v).encode('utf-8'))
+            pipeline = AsyncPipeline(consumer, producer, max_in_flight=100, retry_delay=0.001)
+            task = asyncio.create_task(pipeline.run())
+            while len(self.broker.records(self.output_topic)) < expected:
+                await asyncio.sleep(0.01)
+            pipeline.stop()
+            await asyncio.wait_for(task, timeout=5)
+        asyncio.run(_run())
+
+    def test_processes_every_record(self):
+        self.publish(500)
+        self.run_pipeline(500)
+
+        results = [json.loads(value) for value in self.broker.records(self.output_topic)]
+        self.assertEqual(len(results), 500)
+        self.assertEqual(sorted(r["value"] for r in results), [i * 2 for i in range(500)])
+
+    def test_commits_offsets_after_delivery(self):
+        self.publish(100)
+        self.run_pipeline(100)
+
+        committed = sum(self.broker.committed('test-group', TopicPartition(self.input_topic, p)) or 0
+                        for p in range(self.broker.partitions))
+        self.assertEqual(committed, 100)
+
+    def test_dead_letters_records_that_keep_failing(self):
+        class FailingProducer(LocalAsyncProducer):
+            async def send_and_wait(self, topic, value=None, key=None, partition=None):
+                if topic == 'output_topic' and value["key"] == 3:
+                    raise RuntimeError("delivery failed")
+                return await super().send_and_wait(topic, value=value, key=key, partition=partition)
+
+        self.publish(200)
+        self.run_pipeline(199, producer_class=FailingProducer)
+
+        dead_letters = [json.loads(value) for value in self.broker.records('input_topic.dead-letter')]
+        self.assertEqual([d["value"] for d in dead_letters], [{"key": 3, "value": 3}])
+        committed = sum(self.broker.committed('test-group', TopicPartition(self.input_topic, p)) or 0
+                        for p in range(self.broker.partitions))
+        self.assertEqual(committed, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Benchmark for utils/helpers/config_loader.py: cold loads parse every layer,
+# warm loads are served from the process-wide cache after a stat per file, and
+# snapshot loads replace YAML parsing with a marshal read plus a content hash.
+# Run directly: python tests/performance/config_loader_benchmark.py
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'utils', 'helpers'))
+
+import config_loader  # noqa: E402
+import yaml  # noqa: E402
+from config_loader import ConfigLoader, Field, clear_config_cache, compile_schema  # noqa: E402
+
+CONFIG_DIR = os.getenv('BENCH_CONFIG_DIR', os.path.join(REPO_ROOT, 'configs'))
+CONFIG_ENV = os.getenv('BENCH_CONFIG_ENV', 'prod')
+ITERATIONS = int(os.getenv('BENCH_ITERATIONS', '200'))
+
+SCHEMA = {
+    "app": {"name": str, "version": str, "log_level": Field(str, choices=["debug", "info", "warning", "error"])},
+    "server": {"host": str, "port": Field(int, min=1, max=65535)},
+    "database": {
+        "host": str,
+        "port": Field(int, min=1, max=65535),
+        "name": str,
+        "pool": {"size": Field(int, min=1, default=5), "timeout": Field(float, min=0, default=30)},
+    },
+    "logging": {"level": str, "format": Field(str, choices=["json", "text"], default="json")},
+}
+
+
+def bench_load(cold, config_dir=CONFIG_DIR, use_snapshot=False):
+    timings = []
+    for _ in range(ITERATIONS):
+        if cold:
+            clear_config_cache()
+        loader = ConfigLoader(config_dir, CONFIG_ENV, use_snapshot=use_snapshot)
+        start = time.perf_counter()
+        loader.load_config('config')
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_reload():
+    loader = ConfigLoader(CONFIG_DIR, CONFIG_ENV)
+    loader.load_config('config')
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        loader.reload()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_pure_python_load():
+    c_loader = config_loader._yaml_loader()
+    config_loader._YAML_LOADER = yaml.SafeLoader
+    try:
+        return bench_load(cold=True)
+    finally:
+        config_loader._YAML_LOADER = c_loader
+
+
+def bench_process_startup(config_dir=None, use_snapshot=False):
+    # Full interpreter start, import and first load, as a service pod pays it;
+    # without a config_dir only the bare interpreter start is measured
+    script = "pass"
+    if config_dir is not None:
+        script = (f"import sys; sys.path.insert(0, {os.path.join(REPO_ROOT, 'utils', 'helpers')!r}); "
+                  f"from config_loader import ConfigLoader; "
+                  f"ConfigLoader({config_dir!r}, {CONFIG_ENV!r}, use_snapshot={use_snapshot}).load_config('config')")
+    timings = []
+    for _ in range(max(ITERATIONS // 20, 5)):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', script], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_lookup(lookup):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS * 1000):
+        lookup()
+    return (time.perf_counter() - start) / (ITERATIONS * 1000)
+
+
+def report(name, timings):
+    print(f"{name:<24} median {statistics.median(timings) * 1e6:>10.1f} us"
+          f"   p99 {sorted(timings)[int(len(timings) * 0.99) - 1] * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    print(f"ConfigLoader benchmark: {CONFIG_DIR} env={CONFIG_ENV}, {ITERATIONS} iterations")
+    report("cold load (SafeLoader)", bench_pure_python_load())
+    report(f"cold load ({config_loader._yaml_loader().__name__})", bench_load(cold=True))
+    report("warm load", bench_load(cold=False))
+    report("unchanged reload", bench_reload())
+
+    snapshot_dir = tempfile.mkdtemp()
+    try:
+        for name in os.listdir(CONFIG_DIR):
+            shutil.copy(os.path.join(CONFIG_DIR, name), snapshot_dir)
+        ConfigLoader(snapshot_dir, CONFIG_ENV).write_snapshot('config')
+        report("cold load (snapshot)", bench_load(cold=True, config_dir=snapshot_dir, use_snapshot=True))
+        report("process startup (bare)", bench_process_startup())
+        report("process startup (YAML)", bench_process_startup(snapshot_dir, use_snapshot=False))
+        report("process startup (snap)", bench_process_startup(snapshot_dir, use_snapshot=True))
+    finally:
+        shutil.rmtree(snapshot_dir)
+
+    loader = ConfigLoader(CONFIG_DIR, CONFIG_ENV)
+    loader.load_config('config')
+    pool_size = loader.accessor('database.pool.size', convert=int)
+    print(f"{'get(database.pool.size)':<24} {bench_lookup(lambda: loader.get('database.pool.size')) * 1e9:>10.0f} ns")
+    print(f"{'get_int(...)':<24} {bench_lookup(lambda: loader.get_int('database.pool.size')) * 1e9:>10.0f} ns")
+    print(f"{'accessor(...)()':<24} {bench_lookup(pool_size) * 1e9:>10.0f} ns")
+
+    validator = compile_schema(SCHEMA)
+    config = validator(loader.config)
+    print(f"{'compiled validation':<24} {bench_lookup(lambda: validator(config)) * 1e6:>10.2f} us")
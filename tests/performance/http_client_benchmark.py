@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Benchmark for utils/helpers/http_client.py against a local keep-alive HTTP
+# stand-in. Run directly: python tests/performance/http_client_benchmark.py
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'utils', 'helpers'))
+
+import requests  # noqa: E402
+from http_client import PooledHTTPClient  # noqa: E402
+
+REQUEST_COUNT = int(os.getenv('BENCH_REQUEST_COUNT', '2000'))
+THREADS = int(os.getenv('BENCH_THREADS', '8'))
+PAYLOAD_ITEMS = int(os.getenv('BENCH_PAYLOAD_ITEMS', '200'))
+# Loopback connects are nearly free; this stands in for the TCP/TLS handshake
+# round trips a new connection pays against a real upstream
+HANDSHAKE_MS = float(os.getenv('BENCH_HANDSHAKE_MS', '5'))
+
+PAYLOAD = json.dumps({"items": [{"id": i, "name": f"item{i}", "status": "active"}
+                                for i in range(PAYLOAD_ITEMS)]}).encode('utf-8')
+GZIPPED_PAYLOAD = gzip.compress(PAYLOAD)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # kept-alive response stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        time.sleep(HANDSHAKE_MS / 1000)
+        super().setup()
+
+    def do_GET(self):
+        body = PAYLOAD
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = GZIPPED_PAYLOAD
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/data"
+
+
+def run(get, count, threads):
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(count):
+            get().json()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for response in executor.map(lambda _: get(), range(count)):
+                response.json()
+    return time.perf_counter() - start
+
+
+def report(name, count, elapsed, connections=None):
+    extra = f"   {connections} connections" if connections is not None else ""
+    print(f"{name:<32} {count:>6} reqs {elapsed:>8.3f}s {count / elapsed:>10.0f} req/s{extra}")
+
+
+if __name__ == "__main__":
+    server, url = start_server()
+    print(f"HTTP client benchmark against {url}, {len(PAYLOAD)} byte payload "
+          f"({len(GZIPPED_PAYLOAD)} gzipped), {HANDSHAKE_MS} ms simulated handshake")
+
+    report("requests.get per call", REQUEST_COUNT, run(lambda: requests.get(url), REQUEST_COUNT, 1))
+    client = PooledHTTPClient("bench")
+    elapsed = run(lambda: client.get(url), REQUEST_COUNT, 1)
+    report("pooled client", REQUEST_COUNT, elapsed, client.status()["connections_opened"])
+
+    report(f"requests.get per call x{THREADS}", REQUEST_COUNT,
+           run(lambda: requests.get(url), REQUEST_COUNT, THREADS))
+    client = PooledHTTPClient("bench-threads")
+    elapsed = run(lambda: client.get(url), REQUEST_COUNT, THREADS)
+    report(f"pooled client x{THREADS}", REQUEST_COUNT, elapsed, client.status()["connections_opened"])
+    server.shutdown()
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+import threading
+import time
+
+# Benchmarks for databases/data-pipelines/kafka_pipeline.py against the
+# in-process broker stand-in. Run directly: python tests/performance/kafka_pipeline_benchmark.py
+PIPELINE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'data-pipelines')
+sys.path.insert(0, os.path.abspath(PIPELINE_DIR))
+
+import kafka_pipeline  # noqa: E402
+from local_broker import LocalBroker, LocalConsumer, LocalProducer  # noqa: E402
+
+MESSAGE_COUNT = int(os.getenv('BENCH_MESSAGE_COUNT', '2000'))
+ROUND_TRIP_MS = float(os.getenv('BENCH_ROUND_TRIP_MS', '0.5'))
+
+
+def make_producer(broker, **options):
+    return LocalProducer(
+        broker,
+        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        batch_size=kafka_pipeline.PRODUCER_MAX_BATCH_BYTES,
+        **options
+    )
+
+
+def report(name, count, elapsed):
+    print(f"{name:<28} {count:>8} msgs {elapsed:>8.3f}s {count / elapsed:>12.0f} msgs/s")
+
+
+def bench_per_message_flush():
+    broker = LocalBroker(round_trip_ms=ROUND_TRIP_MS)
+    producer = make_producer(broker)
+    start = time.perf_counter()
+    for i in range(MESSAGE_COUNT):
+        kafka_pipeline.produce_message(producer, 'output_topic', {"key": i, "value": i})
+    return time.perf_counter() - start
+
+
+def bench_batched():
+    broker = LocalBroker(round_trip_ms=ROUND_TRIP_MS)
+    producer = kafka_pipeline.BatchedProducer(make_producer(broker))
+    start = time.perf_counter()
+    for i in range(MESSAGE_COUNT):
+        kafka_pipeline.produce_message(producer, 'output_topic', {"key": i, "value": i})
+    producer.close()
+    elapsed = time.perf_counter() - start
+    assert len(broker.records('output_topic')) == MESSAGE_COUNT
+    return elapsed
+
+
+def run_consume_transform_produce(run_loop, **producer_options):
+    broker = LocalBroker(round_trip_ms=ROUND_TRIP_MS)
+    seed = make_producer(broker)
+    for i in range(MESSAGE_COUNT):
+        seed.send('input_topic', {"key": i, "value": i})
+    seed.flush()
+
+    consumer = LocalConsumer(broker, 'input_topic', group_id='bench', value_deserializer=json.loads,
+                             enable_auto_commit=False)
+    producer = make_producer(broker, **producer_options)
+    stop_event = threading.Event()
+    worker = threading.Thread(target=run_loop, args=(consumer, producer, stop_event))
+    start = time.perf_counter()
+    worker.start()
+    while len(broker.records(kafka_pipeline.KAFKA_PRODUCER_TOPIC)) < MESSAGE_COUNT:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    stop_event.set()
+    worker.join()
+    return elapsed
+
+
+def bench_at_least_once(batch_size):
+    return run_consume_transform_produce(
+        lambda consumer, producer, stop_event: kafka_pipeline.batch_consumer(
+            consumer, producer, batch_size=batch_size, stop_event=stop_event))
+
+
+def bench_exactly_once(max_records):
+    return run_consume_transform_produce(
+        lambda consumer, producer, stop_event: kafka_pipeline.transactional_consumer(
+            consumer, producer, max_records=max_records, stop_event=stop_event),
+        transactional_id='bench-tx')
+
+
+if __name__ == "__main__":
+    kafka_pipeline.logger.setLevel('WARNING')
+    print(f"Produce benchmark, round trip {ROUND_TRIP_MS} ms")
+    report("per-message flush", MESSAGE_COUNT, bench_per_message_flush())
+    report("batched", MESSAGE_COUNT, bench_batched())
+
+    print(f"Consume-transform-produce benchmark, round trip {ROUND_TRIP_MS} ms")
+    for size in (100, 1000):
+        report(f"at-least-once batch={size}", MESSAGE_COUNT, bench_at_least_once(size))
+        report(f"exactly-once txn={size}", MESSAGE_COUNT, bench_exactly_once(size))
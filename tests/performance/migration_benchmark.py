@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import time
+
+# Benchmark for databases/migrations/migration_script.py migrate_data against a
+# SQLite stand-in. Run directly: python tests/performance/migration_benchmark.py
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'migrations')
+sys.path.insert(0, os.path.abspath(MIGRATIONS_DIR))
+
+ROW_COUNT = int(os.getenv('BENCH_ROW_COUNT', '100000'))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'migration_bench.db')
+os.environ.setdefault('DATABASE_URI', f'sqlite:///{DB_PATH}')
+
+import migration_script  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+
+def reset_tables():
+    with migration_script.get_engine().begin() as connection:
+        # WAL lets the streaming reader and the bulk writer share the file
+        connection.execute(text("PRAGMA journal_mode=WAL"))
+        connection.execute(text("DROP TABLE IF EXISTS old_table"))
+        connection.execute(text("DROP TABLE IF EXISTS new_table"))
+        connection.execute(text("CREATE TABLE old_table (id INTEGER PRIMARY KEY, name TEXT, email TEXT)"))
+        connection.execute(text("CREATE TABLE new_table (id INTEGER PRIMARY KEY, name TEXT, email TEXT UNIQUE)"))
+        connection.execute(
+            text("INSERT INTO old_table (name, email) VALUES (:name, :email)"),
+            [{"name": f"user{i}", "email": f"user{i}@website.com"} for i in range(ROW_COUNT)],
+        )
+
+
+def row_by_row_copy():
+    # The original migrate_data: one INSERT statement per row
+    with migration_script.get_engine().begin() as connection:
+        result = connection.execute(text("SELECT * FROM old_table")).fetchall()
+        for row in result:
+            connection.execute(
+                text("INSERT INTO new_table (name, email) VALUES (:name, :email)"),
+                {"name": row.name, "email": row.email},
+            )
+
+
+def report(name, elapsed):
+    print(f"{name:<20} {ROW_COUNT:>8} rows {elapsed:>8.3f}s {ROW_COUNT / elapsed:>12.0f} rows/s")
+
+
+if __name__ == "__main__":
+    reset_tables()
+    start = time.perf_counter()
+    row_by_row_copy()
+    report("row-by-row", time.perf_counter() - start)
+
+    reset_tables()
+    start = time.perf_counter()
+    copied, _ = migration_script.copy_rows("SELECT name, email FROM old_table", "new_table", ["name", "email"])
+    report("chunked bulk copy", time.perf_counter() - start)
+    assert copied == ROW_COUNT
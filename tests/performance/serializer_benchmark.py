@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+
+# Encode/decode throughput and wire size for every codec registered in
+# databases/data-pipelines/serializers.py.
+# Run directly: python tests/performance/serializer_benchmark.py
+PIPELINE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'data-pipelines')
+sys.path.insert(0, os.path.abspath(PIPELINE_DIR))
+
+from serializers import available_codecs, get_codec  # noqa: E402
+
+RECORD_COUNT = int(os.getenv('BENCH_RECORD_COUNT', '100000'))
+
+
+def bench_codec(codec, records):
+    start = time.perf_counter()
+    encoded = [codec.encode(record) for record in records]
+    encode_elapsed = time.perf_counter() - start
+
+    views = [memoryview(payload) for payload in encoded]
+    start = time.perf_counter()
+    for view in views:
+        codec.decode(view)
+    decode_elapsed = time.perf_counter() - start
+
+    wire_bytes = sum(len(payload) for payload in encoded) / len(encoded)
+    return encode_elapsed, decode_elapsed, wire_bytes
+
+
+if __name__ == "__main__":
+    records = [{"key": i, "value": i * 2} for i in range(RECORD_COUNT)]
+    print(f"{'codec':<16} {'encode rec/s':>14} {'decode rec/s':>14} {'bytes/rec':>10}")
+    for name in available_codecs():
+        encode_elapsed, decode_elapsed, wire_bytes = bench_codec(get_codec(name), records)
+        print(f"{name:<16} {RECORD_COUNT / encode_elapsed:>14.0f} {RECORD_COUNT / decode_elapsed:>14.0f} {wire_bytes:>10.1f}")
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Benchmark for the service-a cache storage: the previous single JSON file
+# against the append-only mmap log in service_a_cache.LogStore.
+# Run directly: python tests/performance/service_a_cache_benchmark.py
+SERVICE_A_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'service-a', 'src')
+sys.path.insert(0, os.path.abspath(SERVICE_A_DIR))
+
+from service_a_cache import CacheStats, LogStore  # noqa: E402
+
+PAYLOAD_MB = float(os.getenv('BENCH_PAYLOAD_MB', '100'))
+SMALL_ENTRIES = int(os.getenv('BENCH_SMALL_ENTRIES', '100'))
+
+
+def make_payload(target_bytes):
+    item = {"id": 0, "name": "item-0", "description": "x" * 150, "price": 19.99, "tags": ["new", "sale"]}
+    count = int(target_bytes / len(json.dumps(item)))
+    # Distinct strings per item, so marshal cannot share them by reference
+    return {"items": [dict(item, id=i, name=f"item-{i}", description=f"{i:08d}" + "x" * 142)
+                      for i in range(count)]}
+
+
+def timed(operation):
+    start = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - start, result
+
+
+def bench_json(directory, payload, small):
+    # The previous CacheManager kept everything in one document
+    path = os.path.join(directory, 'data_cache.json')
+    document = {"large": payload, **small}
+
+    def save():
+        with open(path, 'w') as file:
+            json.dump(document, file)
+
+    def load():
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    save_s, _ = timed(save)
+    load_s, _ = timed(load)
+    small_s, _ = timed(lambda: load()["small-0"])
+    return save_s, load_s, small_s, os.path.getsize(path)
+
+
+def bench_log(directory, payload, small):
+    store = LogStore(CacheStats(), directory)
+    expires_at = time.time() + 3600
+    save_s, _ = timed(lambda: store.set("large", payload, expires_at))
+    for key, value in small.items():
+        store.set(key, value, expires_at)
+    load_s, _ = timed(lambda: store.get("large").value)
+    small_s, _ = timed(lambda: store.get("small-0").value)
+    size = store.size
+    store.close()
+    return save_s, load_s, small_s, size
+
+
+def report(name, save_s, load_s, small_s, size):
+    print(f"{name:<10} {size / 1e6:>8.1f} MB   save {save_s:>7.3f}s   load {load_s:>7.3f}s"
+          f"   one small entry {small_s * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    payload = make_payload(PAYLOAD_MB * 1e6)
+    small = {f"small-{i}": {"id": i, "status": "active"} for i in range(SMALL_ENTRIES)}
+    print(f"Cache storage benchmark: {len(payload['items'])} items (~{PAYLOAD_MB:.0f} MB as JSON) "
+          f"plus {SMALL_ENTRIES} small entries")
+    directory = tempfile.mkdtemp()
+    try:
+        report("json file", *bench_json(directory, payload, small))
+        report("mmap log", *bench_log(os.path.join(directory, 'log'), payload, small))
+    finally:
+        shutil.rmtree(directory)
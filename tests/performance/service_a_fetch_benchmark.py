@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Benchmark for ServiceAProcessor in services/service-a/src/service_a.py:
+# sequential vs concurrent fetching of paginated sources from a local stand-in
+# with a fixed per-request latency. Run directly:
+# python tests/performance/service_a_fetch_benchmark.py
+SERVICE_A_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'service-a', 'src')
+sys.path.insert(0, os.path.abspath(SERVICE_A_DIR))
+
+import service_a  # noqa: E402
+
+LATENCY_MS = float(os.getenv('BENCH_LATENCY_MS', '50'))
+ENDPOINTS = int(os.getenv('BENCH_ENDPOINTS', '4'))
+PAGES = int(os.getenv('BENCH_PAGES', '8'))
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(LATENCY_MS / 1000)
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get('page', ['1'])[0])
+        body = json.dumps({"items": [f"{url.path}:{page}:{i}" for i in range(10)]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_processor(base_url, cache_dir):
+    return service_a.ServiceAProcessor({"api": {
+        "key": "bench",
+        "endpoints": [f"{base_url}/source{i}" for i in range(ENDPOINTS)],
+        "pages": PAGES,
+    }}, cache_dir=cache_dir)
+
+
+def bench_sequential(processor):
+    start = time.perf_counter()
+    merged = {}
+    for url, params in processor.sources():
+        service_a.merge_payload(merged, processor.fetch_source(url, params))
+    return time.perf_counter() - start, merged
+
+
+def bench_concurrent(processor):
+    start = time.perf_counter()
+    merged = processor.fetch_all()
+    return time.perf_counter() - start, merged
+
+
+if __name__ == "__main__":
+    service_a.logger.setLevel('WARNING')
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp()
+    processor = make_processor(f"http://127.0.0.1:{server.server_address[1]}", cache_dir)
+    sources = len(processor.sources())
+    print(f"Fetch benchmark: {sources} sources, {LATENCY_MS} ms per request, "
+          f"concurrency {processor.fetch_concurrency}")
+
+    elapsed, expected = bench_sequential(processor)
+    print(f"{'sequential':<12} {elapsed:>8.3f}s  {len(expected['items'])} items")
+    elapsed, merged = bench_concurrent(processor)
+    print(f"{'concurrent':<12} {elapsed:>8.3f}s  {len(merged['items'])} items, "
+          f"{'same' if merged == expected else 'DIFFERENT'} order as sequential")
+    server.shutdown()
+    shutil.rmtree(cache_dir)
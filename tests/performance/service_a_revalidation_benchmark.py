@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Benchmark for ServiceAProcessor.execute in services/service-a/src/service_a.py:
+# refetching the whole payload once the cache expires against serving stale
+# entries while a conditional request revalidates them. The local stand-in
+# answers with an ETag and a new version of the data every BENCH_CHANGE_EVERY_S.
+# Run directly: python tests/performance/service_a_revalidation_benchmark.py
+SERVICE_A_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'service-a', 'src')
+sys.path.insert(0, os.path.abspath(SERVICE_A_DIR))
+
+import service_a  # noqa: E402
+
+LATENCY_MS = float(os.getenv('BENCH_LATENCY_MS', '50'))
+PAYLOAD_ITEMS = int(os.getenv('BENCH_PAYLOAD_ITEMS', '2000'))
+RUNS = int(os.getenv('BENCH_RUNS', '300'))
+INTERVAL_MS = float(os.getenv('BENCH_INTERVAL_MS', '10'))
+TTL_S = float(os.getenv('BENCH_TTL_S', '0.25'))
+CHANGE_EVERY_S = float(os.getenv('BENCH_CHANGE_EVERY_S', '1'))
+
+
+class Upstream:
+    def __init__(self):
+        self.started = time.time()
+        self.full = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def version(self):
+        return int((time.time() - self.started) / CHANGE_EVERY_S)
+
+    def reset(self):
+        with self.lock:
+            self.full = self.not_modified = self.bytes_sent = 0
+
+
+UPSTREAM = Upstream()
+
+
+class VersionedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(LATENCY_MS / 1000)
+        version = UPSTREAM.version()
+        etag = f'"v{version}"'
+        if self.headers.get("If-None-Match") == etag:
+            with UPSTREAM.lock:
+                UPSTREAM.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"version": version, "items": [{"id": i, "name": f"item{i}", "status": "active"}
+                                                         for i in range(PAYLOAD_ITEMS)]}).encode('utf-8')
+        with UPSTREAM.lock:
+            UPSTREAM.full += 1
+            UPSTREAM.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(base_url, stale_ttl):
+    cache_dir = tempfile.mkdtemp()
+    try:
+        processor = service_a.ServiceAProcessor({"api": {
+            "key": "bench", "endpoint": f"{base_url}/data", "cache_ttl": TTL_S, "cache_stale_ttl": stale_ttl,
+        }}, cache_dir=cache_dir)
+        UPSTREAM.reset()
+        latencies, behind = [], 0
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            result = processor.execute()
+            latencies.append(time.perf_counter() - start)
+            behind += result["version"] != UPSTREAM.version()
+            time.sleep(INTERVAL_MS / 1000)
+        latencies.sort()
+        return latencies, behind
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def report(name, latencies, behind):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:<24} p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   200s {UPSTREAM.full:>4}   "
+          f"304s {UPSTREAM.not_modified:>4}   {UPSTREAM.bytes_sent / 1e6:>6.2f} MB sent   "
+          f"{behind}/{len(latencies)} runs behind upstream")
+
+
+if __name__ == "__main__":
+    service_a.logger.setLevel('WARNING')
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VersionedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Revalidation benchmark: {RUNS} runs every {INTERVAL_MS} ms, ttl {TTL_S}s, "
+          f"{LATENCY_MS} ms upstream latency, data changes every {CHANGE_EVERY_S}s")
+
+    report("refetch on expiry", *run(base_url, stale_ttl=0))
+    report("stale-while-revalidate", *run(base_url, stale_ttl=3600))
+    server.shutdown()
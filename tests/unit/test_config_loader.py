@@ -0,0 +1,351 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import yaml
+
+HELPERS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'utils', 'helpers')
+sys.path.insert(0, os.path.abspath(HELPERS_DIR))
+
+import config_loader  # noqa: E402
+from config_loader import (ConfigLoader, ConfigValidationError, Field, ParsedFileCache,  # noqa: E402
+                           clear_config_cache, compile_schema)
+
+
+class ConfigDirTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        clear_config_cache()
+        self.addCleanup(clear_config_cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir, ignore_errors=True)
+
+    def write(self, name, content, mtime_ns=None):
+        path = os.path.join(self.config_dir, name)
+        with open(path, "w") as file:
+            file.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def loader(self, **options):
+        return ConfigLoader(self.config_dir, env="test", **options)
+
+
+class TestParsedFileCache(ConfigDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = ParsedFileCache()
+        self.parsed = []
+
+    def parse(self, path):
+        with open(path) as file:
+            content = file.read()
+        self.parsed.append(content)
+        return {"content": content}
+
+    def test_unchanged_file_is_parsed_once(self):
+        path = self.write("a.yaml", "a: 1\n")
+        first = self.cache.get(path, self.parse)
+        self.assertIs(self.cache.get(path, self.parse), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_mtime_change_invalidates(self):
+        path = self.write("a.yaml", "a: 1\n", mtime_ns=1_000_000_000)
+        self.cache.get(path, self.parse)
+        # Same size, so only the mtime tells the rewrite apart
+        self.write("a.yaml", "a: 2\n", mtime_ns=2_000_000_000)
+
+        self.assertEqual(self.cache.get(path, self.parse)[1], {"content": "a: 2\n"})
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_size_change_invalidates(self):
+        path = self.write("a.yaml", "a: 1\n", mtime_ns=1_000_000_000)
+        self.cache.get(path, self.parse)
+        # Same mtime, as after a coarse-grained clock or a copy that keeps timestamps
+        self.write("a.yaml", "a: 10\n", mtime_ns=1_000_000_000)
+
+        self.assertEqual(self.cache.get(path, self.parse)[1], {"content": "a: 10\n"})
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_parse_error_is_cached_until_the_file_changes(self):
+        path = self.write("a.yaml", "a: 1\n", mtime_ns=1_000_000_000)
+
+        def fail(path):
+            self.parsed.append(path)
+            raise ValueError("bad")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.cache.get(path, fail)
+        self.assertEqual(len(self.parsed), 1)
+
+        self.write("a.yaml", "a: 2\n", mtime_ns=2_000_000_000)
+        self.assertEqual(self.cache.get(path, self.parse)[1], {"content": "a: 2\n"})
+
+    def test_missing_file_returns_none(self):
+        self.assertIsNone(self.cache.get(os.path.join(self.config_dir, "missing.yaml"), self.parse))
+
+
+class TestReload(ConfigDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write("config.yaml", "db:\n  host: a\n", mtime_ns=1_000_000_000)
+        self.loader = self.loader()
+        self.loader.load_config("config")
+        self.calls = []
+
+    def test_reload_notifies_subscribers_with_new_and_old_config(self):
+        self.loader.subscribe(lambda new, old: self.calls.append((new, old)))
+        self.write("config.yaml", "db:\n  host: b\n", mtime_ns=2_000_000_000)
+
+        self.assertTrue(self.loader.reload())
+        self.assertEqual(self.calls, [({"db": {"host": "b"}}, {"db": {"host": "a"}})])
+        self.assertEqual(self.loader.get("db.host"), "b")
+
+    def test_unchanged_files_do_not_notify(self):
+        self.loader.subscribe(lambda new, old: self.calls.append((new, old)))
+        self.assertFalse(self.loader.reload())
+        self.assertEqual(self.calls, [])
+
+    def test_a_failing_subscriber_does_not_stop_the_others(self):
+        def fail(new, old):
+            raise RuntimeError("subscriber failed")
+
+        self.loader.subscribe(fail)
+        self.loader.subscribe(lambda new, old: self.calls.append(new))
+        self.write("config.yaml", "db:\n  host: b\n", mtime_ns=2_000_000_000)
+
+        with self.assertLogs(config_loader.logger, "ERROR"):
+            self.loader.reload()
+        self.assertEqual(self.calls, [{"db": {"host": "b"}}])
+
+    def test_unsubscribed_callback_is_not_called(self):
+        callback = self.loader.subscribe(lambda new, old: self.calls.append(new))
+        self.loader.unsubscribe(callback)
+        self.write("config.yaml", "db:\n  host: b\n", mtime_ns=2_000_000_000)
+
+        self.assertTrue(self.loader.reload())
+        self.assertEqual(self.calls, [])
+
+    def test_failed_parse_keeps_the_current_config(self):
+        self.write("config.yaml", "db: [unclosed\n", mtime_ns=2_000_000_000)
+        with self.assertRaises(yaml.YAMLError):
+            self.loader.reload()
+        self.assertEqual(self.loader.get("db.host"), "a")
+
+
+class TestDottedLookup(ConfigDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write("config.yaml", "db:\n  host: a\n  port: '5432'\n  pool:\n    size: 5\n"
+                                  "debug: 'yes'\nratio: 1\ntimeout: null\n")
+        self.write("config.test.yaml", "db:\n  host: b\n")
+        self.loader = self.loader()
+        self.loader.load_config("config")
+
+    def test_flatten_indexes_every_level(self):
+        index = config_loader._flatten({"a": {"b": {"c": 1}}, "d": 2})
+        self.assertEqual(index, {"a": {"b": {"c": 1}}, "a.b": {"c": 1}, "a.b.c": 1, "d": 2})
+
+    def test_nested_keys_and_sections(self):
+        self.assertEqual(self.loader.get("db.host"), "b")
+        self.assertEqual(self.loader.get("db.pool.size"), 5)
+        self.assertEqual(self.loader.get("db.pool"), {"size": 5})
+
+    def test_missing_keys_return_the_default(self):
+        self.assertIsNone(self.loader.get("db.user"))
+        self.assertEqual(self.loader.get("db.user", "admin"), "admin")
+        self.assertEqual(self.loader.get("db.pool.size.max", 10), 10)
+        self.assertEqual(self.loader.get_int("cache.size", 64), 64)
+
+    def test_null_values_return_the_default_from_typed_getters(self):
+        self.assertIsNone(self.loader.get("timeout", 30))
+        self.assertEqual(self.loader.get_float("timeout", 30.0), 30.0)
+
+    def test_typed_getters_convert(self):
+        self.assertEqual(self.loader.get_int("db.port"), 5432)
+        self.assertEqual(self.loader.get_str("db.pool.size"), "5")
+        self.assertEqual(self.loader.get_float("ratio"), 1.0)
+        self.assertIs(self.loader.get_bool("debug"), True)
+
+    def test_unconvertible_values_name_the_key(self):
+        with self.assertRaisesRegex(ValueError, "db.host"):
+            self.loader.get_int("db.host")
+        with self.assertRaisesRegex(ValueError, "db.host"):
+            self.loader.get_bool("db.host")
+
+    def test_accessor_follows_reloads(self):
+        host = self.loader.accessor("db.host")
+        size = self.loader.accessor("db.pool.size", default=1, convert=str)
+        missing = self.loader.accessor("db.user", default="admin")
+        self.assertEqual((host(), size(), missing()), ("b", "5", "admin"))
+
+        self.write("config.test.yaml", "db:\n  host: c\n  user: root\n  pool: null\n")
+        self.loader.reload()
+
+        self.assertEqual((host(), size(), missing()), ("c", 1, "root"))
+
+    def test_bool_accessor_accepts_string_spellings(self):
+        self.assertIs(self.loader.accessor("debug", convert=bool)(), True)
+
+
+class TestSnapshot(ConfigDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write("config.yaml", "db:\n  host: a\n", mtime_ns=1_000_000_000)
+        self.write("config.test.yaml", "db:\n  port: 5432\n", mtime_ns=1_000_000_000)
+        self.path = self.loader().write_snapshot("config")
+
+    def load(self):
+        # A fresh process: nothing parsed or merged yet
+        clear_config_cache()
+        return self.loader(use_snapshot=True).load_config("config")
+
+    def parsed_files(self):
+        return config_loader._parsed_files.misses
+
+    def rewrite_snapshot(self, start, data):
+        with open(self.path, "r+b") as file:
+            file.seek(start)
+            file.write(data)
+
+    def test_snapshot_is_used_without_parsing(self):
+        self.assertEqual(self.load(), {"db": {"host": "a", "port": 5432}})
+        self.assertEqual(self.parsed_files(), 0)
+
+    def test_changed_source_rejects_the_snapshot(self):
+        self.write("config.test.yaml", "db:\n  port: 6543\n", mtime_ns=2_000_000_000)
+
+        with self.assertLogs(config_loader.logger, "INFO") as logs:
+            self.assertEqual(self.load(), {"db": {"host": "a", "port": 6543}})
+        self.assertIn("stale snapshot", logs.output[0])
+        self.assertEqual(self.parsed_files(), 2)
+
+    def test_stamp_mismatch_falls_back_to_the_content_hash(self):
+        # Same content with a new mtime, as after a checkout: the sha256 still matches
+        self.write("config.yaml", "db:\n  host: a\n", mtime_ns=3_000_000_000)
+        self.assertEqual(self.load(), {"db": {"host": "a", "port": 5432}})
+        self.assertEqual(self.parsed_files(), 0)
+
+    def test_stamp_and_digest_mismatch_rejects_the_snapshot(self):
+        self.write("config.yaml", "db:\n  host: a\n", mtime_ns=3_000_000_000)
+        self.rewrite_snapshot(len(config_loader.SNAPSHOT_MAGIC) + 1, b"\0" * config_loader._SNAPSHOT_DIGEST_SIZE)
+
+        with self.assertLogs(config_loader.logger, "INFO"):
+            self.assertEqual(self.load(), {"db": {"host": "a", "port": 5432}})
+        self.assertEqual(self.parsed_files(), 2)
+
+    def test_other_format_version_is_ignored(self):
+        self.rewrite_snapshot(0, b"CFGSNAP1")
+        with self.assertLogs(config_loader.logger, "WARNING") as logs:
+            self.load()
+        self.assertIn("incompatible version", logs.output[0])
+        self.assertEqual(self.parsed_files(), 2)
+
+    def test_truncated_snapshot_is_ignored(self):
+        with open(self.path, "r+b") as file:
+            file.truncate(len(config_loader.SNAPSHOT_MAGIC) + 1 + config_loader._SNAPSHOT_DIGEST_SIZE + 2)
+        with self.assertLogs(config_loader.logger, "WARNING") as logs:
+            self.assertEqual(self.load(), {"db": {"host": "a", "port": 5432}})
+        self.assertIn("corrupt snapshot", logs.output[0])
+
+    def test_yaml_is_parsed_safely(self):
+        self.write("config.yaml", "db: !!python/object/apply:os.getcwd []\n", mtime_ns=2_000_000_000)
+        with self.assertRaises(yaml.YAMLError):
+            self.loader().load_config("config")
+
+
+class TestCompileSchema(unittest.TestCase):
+
+    def errors(self, schema, config):
+        with self.assertRaises(ConfigValidationError) as raised:
+            compile_schema(schema)(config)
+        return raised.exception.errors
+
+    def test_valid_config_is_returned_as_is(self):
+        config = {"name": "a", "db": {"port": 5432}}
+        self.assertIs(compile_schema({"name": str, "db": {"port": int}})(config), config)
+
+    def test_missing_key(self):
+        self.assertEqual(self.errors({"name": str}, {}), ["Missing configuration key: name"])
+
+    def test_missing_section_reports_its_keys(self):
+        self.assertEqual(self.errors({"db": {"host": str, "port": Field(int, default=5432)}}, {}),
+                         ["Missing configuration key: db.host"])
+
+    def test_optional_key_may_be_missing(self):
+        self.assertEqual(compile_schema({"name": Field(str, required=False)})({}), {})
+
+    def test_wrong_type(self):
+        self.assertEqual(self.errors({"db": {"port": int}}, {"db": {"port": "5432"}}),
+                         ["Invalid type for key db.port: expected int, got str"])
+
+    def test_bool_is_not_a_number(self):
+        self.assertEqual(self.errors({"port": int}, {"port": True}),
+                         ["Invalid type for key port: expected int, got bool"])
+
+    def test_float_accepts_int(self):
+        self.assertEqual(compile_schema({"ratio": float})({"ratio": 1}), {"ratio": 1})
+
+    def test_value_not_in_choices(self):
+        self.assertEqual(self.errors({"level": Field(str, choices=["info", "debug"])}, {"level": "trace"}),
+                         ["Invalid value for key level: 'trace' is not one of ['debug', 'info']"])
+
+    def test_unhashable_value_is_reported_not_raised(self):
+        self.assertEqual(self.errors({"level": Field(choices=["info"])}, {"level": ["info"]}),
+                         ["Invalid value for key level: ['info'] is not one of ['info']"])
+
+    def test_below_minimum_and_above_maximum(self):
+        schema = {"port": Field(int, min=1, max=65535)}
+        self.assertEqual(self.errors(schema, {"port": 0}),
+                         ["Invalid value for key port: 0 is below the minimum 1"])
+        self.assertEqual(self.errors(schema, {"port": 70000}),
+                         ["Invalid value for key port: 70000 is above the maximum 65535"])
+
+    def test_value_incomparable_with_its_range(self):
+        self.assertEqual(self.errors({"port": Field(min=1)}, {"port": "x"}),
+                         ["Invalid value for key port: 'x' cannot be compared with its range"])
+
+    def test_section_that_is_not_a_dict(self):
+        self.assertEqual(self.errors({"db": Field(schema={"host": str})}, {"db": "localhost"}),
+                         ["Invalid type for key db: expected a section, got str"])
+
+    def test_every_error_is_reported_at_once(self):
+        errors = self.errors({"name": str, "db": {"port": int}, "level": Field(choices=["info"])},
+                             {"db": {"port": "x"}, "level": "trace"})
+        self.assertEqual(len(errors), 3)
+
+    def test_defaults_are_applied_to_a_copy(self):
+        config = {"db": {"host": "a"}}
+        result = compile_schema({"db": {"host": str, "port": Field(int, default=5432)}})(config)
+        self.assertEqual(result, {"db": {"host": "a", "port": 5432}})
+        self.assertEqual(config, {"db": {"host": "a"}})
+
+
+class TestValidateOnReload(ConfigDirTestCase):
+
+    def test_invalid_reload_keeps_the_current_config(self):
+        self.write("config.yaml", "port: 80\n", mtime_ns=1_000_000_000)
+        loader = self.loader()
+        loader.load_config("config")
+        loader.validate({"port": Field(int, max=1024), "host": Field(str, default="localhost")})
+        self.assertEqual(loader.get("host"), "localhost")
+
+        self.write("config.yaml", "port: 8080\n", mtime_ns=2_000_000_000)
+        with self.assertRaises(ConfigValidationError):
+            loader.reload()
+
+        self.assertEqual(loader.config, {"port": 80, "host": "localhost"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import socket
+import sys
+import unittest
+from unittest import mock
+
+import requests
+
+HELPERS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'utils', 'helpers')
+sys.path.insert(0, os.path.abspath(HELPERS_DIR))
+
+import http_client  # noqa: E402
+from http_client import HTTP_DEFAULTS, PooledHTTPClient, get_client  # noqa: E402
+
+
+def ok_response(request):
+    response = requests.Response()
+    response.status_code = 200
+    response.request = request
+    response.url = request.url
+    return response
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestGetClient(unittest.TestCase):
+
+    def tearDown(self):
+        for name in ("test-a", "test-b"):
+            client = http_client._clients.pop(name, None)
+            if client is not None:
+                client.close()
+
+    def test_same_name_returns_the_same_client(self):
+        client = get_client("test-a", read_timeout=5)
+        self.assertIs(get_client("test-a"), client)
+        self.assertIsNot(get_client("test-b"), client)
+
+    def test_settings_apply_when_the_client_is_created(self):
+        client = get_client("test-a", read_timeout=5)
+        self.assertIs(get_client("test-a", read_timeout=60), client)
+        self.assertEqual(client.timeout, (HTTP_DEFAULTS["connect_timeout"], 5))
+
+
+class TestPooledHTTPClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = PooledHTTPClient("test")
+        self.addCleanup(self.client.close)
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request, kwargs))
+        return ok_response(request)
+
+    def get(self, *args, **kwargs):
+        with mock.patch.object(http_client.InstrumentedHTTPAdapter, "send", autospec=True,
+                               side_effect=lambda adapter, request, **options: self.send(request, **options)):
+            return self.client.get(*args, **kwargs)
+
+    def test_default_timeouts_and_compression(self):
+        self.get("http://example.test/data")
+
+        request, options = self.sent[0]
+        self.assertEqual(options["timeout"], (HTTP_DEFAULTS["connect_timeout"], HTTP_DEFAULTS["read_timeout"]))
+        self.assertEqual(request.headers["Accept-Encoding"], "gzip, deflate")
+
+    def test_explicit_timeout_wins(self):
+        self.get("http://example.test/data", timeout=1)
+        self.assertEqual(self.sent[0][1]["timeout"], 1)
+
+    def test_retries_are_mounted_for_both_schemes(self):
+        for prefix in ("http://", "https://"):
+            adapter = self.client.session.get_adapter(f"{prefix}example.test")
+            self.assertIsInstance(adapter, http_client.InstrumentedHTTPAdapter)
+            retries = adapter.max_retries
+            self.assertEqual((retries.total, retries.connect), (2, 2))
+            self.assertEqual((retries.read, retries.status), (0, 0))
+
+    def test_failed_connections_are_retried(self):
+        client = PooledHTTPClient("test-retry", connect_retries=2, retry_backoff=0, connect_timeout=1)
+        self.addCleanup(client.close)
+
+        with self.assertRaises(requests.ConnectionError):
+            client.get(f"http://127.0.0.1:{unused_port()}/")
+
+        status = client.status()
+        self.assertEqual((status["connections_opened"], status["requests"], status["errors"]), (3, 1, 1))
+        self.assertEqual(status["in_flight"], 0)
+
+    def test_counts_requests(self):
+        self.get("http://example.test/a")
+        self.get("http://example.test/b")
+        self.assertEqual(self.client.status()["requests"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,284 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Exercises the pipeline against the in-process broker stand-in, no cluster needed
+PIPELINE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'data-pipelines')
+sys.path.insert(0, os.path.abspath(PIPELINE_DIR))
+
+import kafka_pipeline  # noqa: E402
+from prometheus_client import REGISTRY  # noqa: E402
+from local_broker import LocalBroker, LocalConsumer, LocalProducer, TopicPartition  # noqa: E402
+
+
+def encode(value):
+    return json.dumps(value).encode('utf-8')
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = LocalBroker(partitions=2, round_trip_ms=0)
+
+    def publish(self, count, topic='input_topic'):
+        producer = LocalProducer(self.broker, value_serializer=encode)
+        for i in range(count):
+            producer.send(topic, {"key": i, "value": i})
+        producer.flush()
+
+    def consumer(self, **options):
+        options.setdefault('enable_auto_commit', False)
+        return LocalConsumer(self.broker, 'input_topic', group_id='test-group', value_deserializer=json.loads,
+                             **options)
+
+    def committed(self):
+        return sum(self.broker.committed('test-group', TopicPartition('input_topic', p)) or 0
+                   for p in range(self.broker.partitions))
+
+    def outputs(self):
+        return [json.loads(value) for value in self.broker.records('output_topic')]
+
+
+class FailingProducer(LocalProducer):
+    def _append(self, batch):
+        for *_, future in batch:
+            future.failure(RuntimeError("delivery failed"))
+
+
+def error_count():
+    return REGISTRY.get_sample_value('errors_total')
+
+
+def lag(partition, topic='lag_topic'):
+    return REGISTRY.get_sample_value('pipeline_consumer_lag', {'topic': topic, 'partition': str(partition)})
+
+
+class TestLagMonitor(PipelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.publish(10, topic='lag_topic')
+        self.lag_consumer = LocalConsumer(self.broker, 'lag_topic', group_id='lag-group')
+        self.monitor = kafka_pipeline.LagMonitor(interval=0)
+        self.addCleanup(self.monitor.remove, self.lag_consumer.assignment())
+
+    def test_reports_lag_per_partition(self):
+        self.monitor.update(self.lag_consumer)
+        self.assertEqual((lag(0), lag(1)), (5, 5))
+
+    def test_removes_partitions_that_are_no_longer_assigned(self):
+        self.monitor.update(self.lag_consumer)
+        self.lag_consumer.assign([TopicPartition('lag_topic', 1)])
+        self.monitor.update(self.lag_consumer)
+
+        self.assertIsNone(lag(0))
+        self.assertEqual(lag(1), 5)
+
+    def test_revoked_partitions_are_removed_at_once(self):
+        self.monitor.update(self.lag_consumer)
+        listener = kafka_pipeline.InFlightRebalanceListener(None, {}, self.monitor)
+        listener.on_partitions_revoked([TopicPartition('lag_topic', 0)])
+        listener.on_partitions_lost([TopicPartition('lag_topic', 1)])
+
+        self.assertEqual((lag(0), lag(1)), (None, None))
+
+
+class TestBatchedProducer(PipelineTestCase):
+
+    def producer(self, local_producer=LocalProducer, **options):
+        # A batch large enough that nothing is sent before a flush
+        return kafka_pipeline.BatchedProducer(
+            local_producer(self.broker, value_serializer=encode, batch_size=1 << 20), **options)
+
+    def test_batches_sends_until_flush(self):
+        producer = self.producer()
+        for i in range(3):
+            kafka_pipeline.produce_message(producer, 'output_topic', {"key": i, "value": i})
+
+        self.assertEqual((producer.in_flight, len(self.outputs())), (3, 0))
+        producer.flush()
+        self.assertEqual((producer.in_flight, len(self.outputs())), (0, 3))
+
+    def test_flushes_when_the_window_is_full(self):
+        producer = self.producer(max_in_flight=4)
+        for i in range(10):
+            producer.send('output_topic', {"key": i, "value": i})
+
+        self.assertEqual((producer.in_flight, len(self.outputs())), (2, 8))
+        producer.close()
+        self.assertEqual((producer.in_flight, len(self.outputs())), (0, 10))
+
+    def test_failed_deliveries_leave_the_window_and_count_once(self):
+        producer = self.producer(FailingProducer)
+        errors = error_count()
+        with self.assertLogs(kafka_pipeline.logger, 'ERROR'):
+            for i in range(3):
+                kafka_pipeline.produce_message(producer, 'output_topic', {"key": i, "value": i})
+            producer.flush()
+
+        self.assertEqual(producer.in_flight, 0)
+        self.assertEqual(error_count() - errors, 3)
+
+    def test_awaited_failures_are_counted_by_the_caller(self):
+        producer = self.producer(FailingProducer)
+        errors = error_count()
+        future = producer.send('output_topic', {"key": 1, "value": 1})
+        with self.assertLogs(kafka_pipeline.logger, 'ERROR'):
+            producer.flush()
+
+        with self.assertRaises(RuntimeError):
+            future.get()
+        self.assertEqual((producer.in_flight, error_count() - errors), (0, 0))
+
+    def test_a_send_that_raises_leaves_the_window(self):
+        class RejectingProducer(LocalProducer):
+            def send(self, *args, **kwargs):
+                raise kafka_pipeline.KafkaError("buffer full")
+
+        producer = self.producer(RejectingProducer)
+        errors = error_count()
+        with self.assertLogs(kafka_pipeline.logger, 'ERROR'):
+            kafka_pipeline.produce_message(producer, 'output_topic', {"key": 1, "value": 1})
+        self.assertEqual((producer.in_flight, error_count() - errors), (0, 1))
+
+
+class TestBatchConsumer(PipelineTestCase):
+
+    def run_batches(self, producer, until, timeout=5, **options):
+        stop_event = threading.Event()
+        thread = threading.Thread(target=kafka_pipeline.batch_consumer,
+                                  args=(self.consumer(), producer),
+                                  kwargs=dict(batch_size=20, batch_timeout_ms=50, stop_event=stop_event, **options))
+        thread.start()
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stop_event.set()
+        thread.join(timeout)
+
+    def test_commits_each_delivered_batch(self):
+        self.publish(50)
+        self.run_batches(LocalProducer(self.broker, value_serializer=encode), lambda: self.committed() == 50)
+
+        self.assertEqual(self.committed(), 50)
+        self.assertEqual(sorted(r["value"] for r in self.outputs()), [i * 2 for i in range(50)])
+
+    def test_failed_delivery_is_not_committed(self):
+        self.publish(50)
+        with self.assertLogs(kafka_pipeline.logger, 'ERROR'):
+            self.run_batches(FailingProducer(self.broker, value_serializer=encode), lambda: False, timeout=0.5)
+        self.assertEqual(self.committed(), 0)
+
+    def test_rejects_an_auto_committing_consumer(self):
+        with self.assertRaises(ValueError):
+            kafka_pipeline.batch_consumer(self.consumer(enable_auto_commit=True), LocalProducer(self.broker))
+
+
+def slow_first_batch(messages):
+    # The first micro-batch finishes after the ones submitted behind it
+    if messages[0]["value"] == 0:
+        time.sleep(0.2)
+    return process_micro_batch(messages)
+
+
+process_micro_batch = kafka_pipeline.process_micro_batch
+
+
+class TestProcessPoolStage(unittest.TestCase):
+
+    def stage(self, **options):
+        stage = kafka_pipeline.ProcessPoolStage(workers=2, batch_size=3, **options)
+        self.addCleanup(stage.close)
+        return stage
+
+    def test_results_keep_submission_order(self):
+        stage = self.stage()
+        stage.executor.shutdown()
+        stage.executor = ThreadPoolExecutor(max_workers=4)
+        messages = [{"key": i, "value": i} for i in range(10)]
+
+        with mock.patch.object(kafka_pipeline, 'process_micro_batch', slow_first_batch):
+            results = stage.map(messages)
+
+        self.assertEqual([r["value"] for r in results], [i * 2 for i in range(10)])
+
+    def test_worker_errors_are_counted_once(self):
+        stage = self.stage()
+        messages = [{"key": i, "value": i} for i in range(7)]
+        messages[4] = {"value": 4}
+        errors = error_count()
+
+        results = stage.map(messages)
+
+        self.assertIsNone(results[4])
+        self.assertEqual([r["value"] for r in results if r], [0, 2, 4, 6, 10, 12])
+        self.assertEqual(error_count() - errors, 1)
+
+
+class TestStagedPipeline(PipelineTestCase):
+
+    def run_pipeline(self, producer, until, timeout=5, **options):
+        pipeline = kafka_pipeline.StagedPipeline(self.consumer(), producer, queue_size=100, max_poll_records=10,
+                                                 **options)
+        error = []
+
+        def run():
+            try:
+                pipeline.run()
+            except Exception as e:
+                error.append(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline and thread.is_alive():
+            time.sleep(0.01)
+        reached = until()
+        pipeline.stop()
+        thread.join(timeout)
+        return reached, error
+
+    def test_processes_and_commits_every_record(self):
+        self.publish(50)
+        producer = LocalProducer(self.broker, value_serializer=encode)
+
+        reached, error = self.run_pipeline(producer, lambda: self.committed() == 50)
+
+        self.assertTrue(reached)
+        self.assertEqual(error, [])
+        self.assertEqual(sorted(r["value"] for r in self.outputs()), [i * 2 for i in range(50)])
+
+    def test_failed_delivery_commits_nothing(self):
+        self.publish(50)
+        reached, error = self.run_pipeline(FailingProducer(self.broker, value_serializer=encode),
+                                           lambda: False, timeout=1)
+
+        self.assertFalse(reached)
+        self.assertEqual(len(error), 1)
+        self.assertEqual(self.committed(), 0)
+
+    def test_commits_while_a_slow_producer_keeps_the_queue_full(self):
+        class SlowProducer(LocalProducer):
+            def send(self, *args, **kwargs):
+                time.sleep(0.002)
+                return super().send(*args, **kwargs)
+
+        self.publish(400)
+        reached, _ = self.run_pipeline(SlowProducer(self.broker, value_serializer=encode),
+                                       lambda: self.committed() > 0, commit_records=20)
+
+        self.assertTrue(reached)
+        self.assertLess(len(self.outputs()), 400)
+
+    def test_rejects_a_queue_no_larger_than_a_poll(self):
+        with self.assertRaises(ValueError):
+            kafka_pipeline.StagedPipeline(self.consumer(), None, queue_size=10, max_poll_records=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
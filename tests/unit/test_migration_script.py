@@ -0,0 +1,274 @@
+import contextlib
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'databases', 'migrations')
+sys.path.insert(0, os.path.abspath(MIGRATIONS_DIR))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'migration_test.db')
+os.environ.setdefault('DATABASE_URI', f'sqlite:///{DB_PATH}')
+
+import migration_script  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError  # noqa: E402
+
+
+class TestCopyCsv(unittest.TestCase):
+
+    def test_keeps_empty_strings_apart_from_null(self):
+        self.assertEqual(migration_script._copy_csv([("", None)]), '"",\\N\n')
+
+    def test_quotes_values_that_look_like_the_null_marker(self):
+        self.assertEqual(migration_script._copy_csv([("\\N", 'say "hi"', 3)]), '"\\N","say ""hi""","3"\n')
+
+    def test_encodes_values_by_column_type(self):
+        encoders = [migration_script._copy_encoder(column_type) for column_type in (
+            postgresql.BYTEA(), postgresql.JSONB(), postgresql.ARRAY(postgresql.TEXT()), postgresql.TIMESTAMP())]
+        row = (b"\x00\xff", {"a": [1, "x"]}, ["plain", 'say "hi"', None, "back\\slash"],
+               datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc))
+
+        self.assertEqual(migration_script._copy_csv([row], encoders),
+                         '"\\x00ff","{""a"": [1, ""x""]}",'
+                         '"{""plain"",""say \\""hi\\"""",NULL,""back\\\\slash""}",'
+                         '"2024-05-01T12:30:00+00:00"\n')
+
+    def test_nested_arrays(self):
+        encode = migration_script._copy_encoder(postgresql.ARRAY(postgresql.INTEGER(), dimensions=2))
+        self.assertEqual(encode([[1, 2], [3, None]]), '{{"1","2"},{"3",NULL}}')
+
+    def test_driver_errors_are_raised_as_sqlalchemy_errors(self):
+        # SQLAlchemy picks its exception class by the driver class's name, as with PEP 249 modules
+        DriverError = type("Error", (Exception,), {})
+        DriverIntegrityError = type("IntegrityError", (DriverError,), {})
+
+        cursor = mock.Mock()
+        cursor.copy_expert.side_effect = DriverIntegrityError("duplicate key")
+        connection = mock.Mock()
+        connection.dialect.driver = "psycopg2"
+        connection.dialect.loaded_dbapi = mock.Mock(Error=DriverError, IntegrityError=DriverIntegrityError)
+        connection.dialect.dbapi_exception_translation_map = {}
+        connection.connection.cursor.return_value = cursor
+
+        with self.assertRaises(SQLAlchemyError) as raised:
+            migration_script._copy_chunk(connection, "new_table", ["name"], [("a",)])
+        self.assertIsInstance(raised.exception, IntegrityError)
+        cursor.close.assert_called_once()
+
+
+class TestCopyRows(unittest.TestCase):
+
+    def setUp(self):
+        with migration_script.get_engine().begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS old_table"))
+            connection.execute(text("DROP TABLE IF EXISTS new_table"))
+            connection.execute(text("CREATE TABLE old_table (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT)"))
+            connection.execute(text("CREATE TABLE new_table (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT)"))
+            connection.execute(
+                text("INSERT INTO old_table (name, email) VALUES (:name, :email)"),
+                [{"name": "", "email": None}, {"name": "user1", "email": ""}, {"name": "user2", "email": "a@b.c"}],
+            )
+
+    def test_copies_empty_strings_and_nulls_unchanged(self):
+        copied, _ = migration_script.copy_rows(
+            "SELECT name, email FROM old_table ORDER BY id", "new_table", ["name", "email"], chunk_size=2)
+        self.assertEqual(copied, 3)
+        with migration_script.get_engine().connect() as connection:
+            rows = connection.execute(text("SELECT name, email FROM new_table ORDER BY id")).all()
+        self.assertEqual([tuple(row) for row in rows], [("", None), ("user1", ""), ("user2", "a@b.c")])
+
+
+class TestParallelCopy(unittest.TestCase):
+
+    def setUp(self):
+        with migration_script.get_engine().begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {migration_script.CHECKPOINT_TABLE}"))
+            connection.execute(text("DROP TABLE IF EXISTS source_rows"))
+            connection.execute(text("DROP TABLE IF EXISTS target_rows"))
+            connection.execute(text("CREATE TABLE source_rows (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("CREATE TABLE target_rows (id INTEGER PRIMARY KEY, name TEXT)"))
+        self.insert(1, 1051)
+
+    def insert(self, first, last):
+        with migration_script.get_engine().begin() as connection:
+            connection.execute(text("INSERT INTO source_rows (id, name) VALUES (:id, :name)"),
+                               [{"id": i, "name": f"row{i}"} for i in range(first, last)])
+
+    def count(self, table):
+        with migration_script.get_engine().connect() as connection:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+    def copy(self, **options):
+        return migration_script.parallel_copy("source->target", "source_rows", "target_rows", ["id", "name"],
+                                              workers=2, range_size=100, **options)
+
+    def test_resume_after_appends_copies_only_the_new_rows(self):
+        copied, _ = self.copy()
+        self.assertEqual(copied, 1050)
+        # The last range was partial, so its bounds change with the new rows
+        self.insert(1051, 1101)
+
+        copied, _ = self.copy()
+
+        self.assertEqual(copied, 50)
+        self.assertEqual(self.count("target_rows"), self.count("source_rows"))
+        self.assertEqual(self.copy()[0], 0)
+
+    def test_failed_ranges_are_reported_and_resumed(self):
+        copy_range = migration_script._copy_range
+
+        def fail_one_range(job, source_table, target_table, columns, pk, key_range, *args):
+            if key_range[0] == 501:
+                raise OSError("connection reset")
+            return copy_range(job, source_table, target_table, columns, pk, key_range, *args)
+
+        with mock.patch.object(migration_script, "_copy_range", fail_one_range):
+            with self.assertRaisesRegex(RuntimeError, "1 ranges failed, rerun to resume"):
+                self.copy()
+        self.assertEqual(self.count("target_rows"), 950)
+
+        self.assertEqual(self.copy()[0], 100)
+        self.assertEqual(self.count("target_rows"), 1050)
+
+    def test_pending_ranges_skip_checkpointed_keys(self):
+        self.assertEqual(migration_script.pending_ranges([(0, 100), (100, 150)], {(0, 40), (60, 100), (100, 120)}),
+                         [(40, 60), (120, 150)])
+
+
+class TestOnlineSchemaChange(unittest.TestCase):
+
+    def setUp(self):
+        with migration_script.get_engine().begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS osc_table"))
+            connection.execute(text("CREATE TABLE osc_table (id INTEGER PRIMARY KEY, old_column TEXT)"))
+        for name, value in (("ONLINE_SCHEMA_CHANGE", True), ("_lag_unreadable_reported", False)):
+            patcher = mock.patch.object(migration_script, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Route as if on PostgreSQL while the statements still run on SQLite
+        dialect = mock.patch.object(migration_script.get_engine().dialect, "name", "postgresql")
+        dialect.start()
+        self.addCleanup(dialect.stop)
+        online = mock.patch.object(migration_script, "online_schema_change")
+        self.online = online.start()
+        self.addCleanup(online.stop)
+
+    def columns(self):
+        with migration_script.get_engine().connect() as connection:
+            return [row[1] for row in connection.exec_driver_sql("PRAGMA table_info(osc_table)")]
+
+    def test_catalog_only_changes_stay_plain_alters(self):
+        for clause in ("RENAME COLUMN old_column TO new_column", "ADD COLUMN another_column VARCHAR(100)",
+                       "drop column another_column", "ALTER COLUMN new_column DROP DEFAULT",
+                       "ALTER COLUMN new_column DROP NOT NULL"):
+            self.assertFalse(migration_script._rewrites_table(clause), clause)
+
+    def test_rewriting_changes_go_online(self):
+        for clause in ("ALTER COLUMN column_name TYPE VARCHAR(500)", "ADD COLUMN flag BOOLEAN DEFAULT random() > 0.5",
+                       "ADD COLUMN total INTEGER GENERATED ALWAYS AS (id * 2) STORED",
+                       "ALTER COLUMN column_name SET NOT NULL"):
+            self.assertTrue(migration_script._rewrites_table(clause), clause)
+
+    def test_alter_table_routes_by_clause(self):
+        migration_script.alter_table("osc_table", ["RENAME COLUMN old_column TO new_column"])
+        migration_script.alter_table("osc_table", ["ADD COLUMN another_column VARCHAR(100)"])
+        self.online.assert_not_called()
+        self.assertEqual(self.columns(), ["id", "new_column", "another_column"])
+
+        migration_script.alter_table("osc_table", ["ALTER COLUMN new_column TYPE VARCHAR(500)"])
+        self.online.assert_called_once_with("osc_table", ["ALTER COLUMN new_column TYPE VARCHAR(500)"],
+                                            column_map=None)
+
+    def test_only_the_type_change_step_leaves_the_transaction(self):
+        steps = {step.name: step for step in migration_script.MIGRATION_PLAN.steps}
+        self.assertTrue(steps["004_rename_column"].in_transaction())
+        self.assertTrue(steps["007_run_custom_sql"].in_transaction())
+        self.assertFalse(steps["010_alter_column_type"].in_transaction())
+
+    def test_unreadable_replication_lag_is_reported_once(self):
+        connection = mock.Mock()
+        connection.exec_driver_sql.return_value.one.return_value = (None, 2, False)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(migration_script.replication_lag_seconds(connection), 0.0)
+            migration_script.replication_lag_seconds(connection)
+        self.assertEqual(out.getvalue().count("pg_monitor"), 1)
+
+    def test_readable_replication_lag(self):
+        connection = mock.Mock()
+        connection.exec_driver_sql.return_value.one.return_value = (1.5, 1, True)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(migration_script.replication_lag_seconds(connection), 1.5)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_shadow_indexes_take_the_original_names(self):
+        definitions = {
+            "existing_table": [("existing_table_pkey", "CREATE UNIQUE INDEX existing_table_pkey ON "
+                                "public.existing_table USING btree (id)"),
+                               ("ix_old_column", "CREATE INDEX ix_old_column ON public.existing_table "
+                                "USING btree (old_column)")],
+            "_existing_table_new": [("_existing_table_new_pkey", "CREATE UNIQUE INDEX _existing_table_new_pkey "
+                                     "ON public._existing_table_new USING btree (id)"),
+                                    ("_existing_table_new_new_column_idx", "CREATE INDEX "
+                                     "_existing_table_new_new_column_idx ON public._existing_table_new "
+                                     "USING btree (new_column)")],
+        }
+        connection = mock.Mock()
+        connection.execute.side_effect = lambda statement, params: [
+            SimpleNamespace(name=name, definition=definition) for name, definition in definitions[params["table"]]]
+
+        pairs = migration_script._osc_index_names(connection, "existing_table", "_existing_table_new",
+                                                  {"old_column": "new_column"})
+
+        self.assertEqual(pairs, [("_existing_table_new_pkey", "existing_table_pkey"),
+                                 ("_existing_table_new_new_column_idx", "ix_old_column")])
+
+
+class TestMigrationPlan(unittest.TestCase):
+
+    def setUp(self):
+        with migration_script.get_engine().begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {migration_script.VERSION_TABLE}"))
+            connection.execute(text("DROP TABLE IF EXISTS audit"))
+            connection.execute(text("CREATE TABLE audit (step TEXT)"))
+        # SQLite runs DML transactionally, which is enough to exercise the shared transaction
+        dialects = mock.patch.object(migration_script, 'TRANSACTIONAL_DDL_DIALECTS', ('sqlite',))
+        dialects.start()
+        self.addCleanup(dialects.stop)
+
+    def step(self, name, succeeds=True, **options):
+        def func(connection=None):
+            with migration_script.step_connection(connection) as conn:
+                conn.execute(text("INSERT INTO audit (step) VALUES (:step)"), {"step": name})
+            return succeeds
+        return migration_script.MigrationStep(name, func, tables=["audit"], **options)
+
+    def state(self):
+        with migration_script.get_engine().connect() as connection:
+            audit = [row.step for row in connection.execute(text("SELECT step FROM audit ORDER BY step"))]
+        return audit, sorted(migration_script._applied_versions())
+
+    def test_records_a_step_with_its_changes(self):
+        self.assertTrue(migration_script.MigrationPlan([self.step("001"), self.step("002")]).run(workers=1))
+        self.assertEqual(self.state(), (["001", "002"], ["001", "002"]))
+
+    def test_rolls_back_a_failed_step_and_skips_later_steps_on_its_tables(self):
+        plan = migration_script.MigrationPlan([self.step("001"), self.step("002", succeeds=False), self.step("003")])
+        self.assertFalse(plan.run(workers=1))
+        self.assertEqual(self.state(), (["001"], ["001"]))
+
+    def test_non_transactional_step_commits_on_its_own(self):
+        plan = migration_script.MigrationPlan([self.step("001", succeeds=False, transactional=False)])
+        self.assertFalse(plan.run(workers=1))
+        self.assertEqual(self.state(), (["001"], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
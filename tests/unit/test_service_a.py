@@ -0,0 +1,259 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from requests.exceptions import RequestException
+
+SERVICE_A_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'service-a', 'src')
+sys.path.insert(0, os.path.abspath(SERVICE_A_DIR))
+
+import service_a  # noqa: E402
+import service_a_cache  # noqa: E402
+from service_a import ConfigLoader, ServiceAProcessor, retry  # noqa: E402
+
+
+class FakeResponse:
+
+    def __init__(self, payload, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._payload = payload
+
+    def json(self):
+        if isinstance(self._payload, Exception):
+            raise self._payload
+        return self._payload
+
+
+class FakeClient:
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.requests.append((url, headers))
+        response = self.responses[url]
+        if isinstance(response, RequestException):
+            raise response
+        if isinstance(response, FakeResponse):
+            return response
+        return FakeResponse(response)
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_retries_with_backoff_then_gives_up(self):
+        calls = []
+
+        @retry(tries=3, delay=1, backoff=2)
+        def flaky():
+            calls.append(1)
+            raise RequestException("timed out")
+
+        with mock.patch.object(service_a.time, 'sleep') as sleep:
+            self.assertIsNone(flaky())
+            # The backoff starts over on every call
+            self.assertIsNone(flaky())
+        self.assertEqual(len(calls), 6)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1, 2, 4, 1, 2, 4])
+
+
+class TestConfigLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        self.path = os.path.join(self.config_dir, "config.yaml")
+        self.write("api:\n  key: a\n", mtime_ns=1_000_000_000)
+        self.now = 100.0
+        patcher = mock.patch.object(service_a.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ConfigLoader.invalidate)
+        self.parses = []
+        safe_load = service_a.yaml.safe_load
+        patcher = mock.patch.object(service_a.yaml, 'safe_load',
+                                    lambda file: self.parses.append(file.name) or safe_load(file))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, content, mtime_ns):
+        with open(self.path, "w") as file:
+            file.write(content)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def load(self):
+        return ConfigLoader(self.path, ttl=5).load_config()
+
+    def test_loaders_share_a_parsed_file(self):
+        self.assertEqual(self.load(), {"api": {"key": "a"}})
+        self.assertIs(self.load(), self.load())
+        self.assertEqual(len(self.parses), 1)
+
+    def test_changes_are_not_checked_within_the_ttl(self):
+        self.load()
+        self.write("api:\n  key: b\n", mtime_ns=2_000_000_000)
+        self.now += 4
+
+        self.assertEqual(self.load(), {"api": {"key": "a"}})
+        self.assertEqual(len(self.parses), 1)
+
+    def test_unchanged_file_is_not_parsed_again_after_the_ttl(self):
+        self.load()
+        self.now += 5
+        self.assertEqual(self.load(), {"api": {"key": "a"}})
+        self.assertEqual(len(self.parses), 1)
+
+    def test_mtime_change_is_picked_up_after_the_ttl(self):
+        self.load()
+        self.write("api:\n  key: b\n", mtime_ns=2_000_000_000)
+        self.now += 5
+        self.assertEqual(self.load(), {"api": {"key": "b"}})
+
+    def test_size_change_is_picked_up_after_the_ttl(self):
+        self.load()
+        self.write("api:\n  key: bb\n", mtime_ns=1_000_000_000)
+        self.now += 5
+        self.assertEqual(self.load(), {"api": {"key": "bb"}})
+
+    def test_invalidate_forces_a_parse(self):
+        self.load()
+        ConfigLoader.invalidate(self.path)
+        self.load()
+        self.assertEqual(len(self.parses), 2)
+
+    def test_broken_or_missing_file_keeps_the_last_known_config(self):
+        self.load()
+        self.write("api: [unclosed\n", mtime_ns=2_000_000_000)
+        self.now += 5
+        self.assertEqual(self.load(), {"api": {"key": "a"}})
+
+        os.unlink(self.path)
+        self.now += 5
+        self.assertEqual(self.load(), {"api": {"key": "a"}})
+
+
+class TestFetchAll(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        config = {"api": {"key": "k", "endpoints": ["http://a", "http://b", "http://c"]}}
+        self.processor = ServiceAProcessor(config, cache_dir=self.cache_dir)
+        sleep = mock.patch.object(service_a.time, 'sleep')
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def fetch_all(self, responses):
+        with mock.patch.object(service_a, 'get_client', return_value=FakeClient(responses)):
+            return self.processor.fetch_all()
+
+    def test_merges_sources_in_order(self):
+        data = self.fetch_all({"http://a": {"items": [1]}, "http://b": {"items": [2]}, "http://c": {"items": [3]}})
+        self.assertEqual(data, {"items": [1, 2, 3]})
+
+    def test_skips_a_failing_source(self):
+        data = self.fetch_all({"http://a": {"items": [1]}, "http://b": RequestException("timed out"),
+                               "http://c": {"items": [3]}})
+        self.assertEqual(data, {"items": [1, 3]})
+
+    def test_skips_a_source_that_raises(self):
+        data = self.fetch_all({"http://a": ValueError("not JSON"), "http://b": {"items": [2]},
+                               "http://c": {"items": [3]}})
+        self.assertEqual(data, {"items": [2, 3]})
+
+    def test_returns_none_when_every_source_fails(self):
+        error = RequestException("timed out")
+        client = FakeClient({"http://a": error, "http://b": error, "http://c": error})
+        with mock.patch.object(service_a, 'get_client', return_value=client):
+            self.assertIsNone(self.processor.fetch_all())
+            self.assertEqual(self.processor.fetch_latest(), (None, None, {}))
+
+
+class TestRevalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        config = {"api": {"key": "k", "endpoint": "http://a", "cache_ttl": 10, "cache_stale_ttl": 100}}
+        self.processor = ServiceAProcessor(config, cache_dir=self.cache_dir)
+        self.addCleanup(service_a_cache._caches.pop, os.path.abspath(self.cache_dir))
+        self.addCleanup(self.processor.cache_manager.cache.disk.close)
+        self.cache = self.processor.cache_manager
+        self.now = 1_000_000.0
+        for target, replacement in (("time", lambda: self.now), ("sleep", lambda seconds: None)):
+            patcher = mock.patch.object(service_a.time, target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stale_entry(self):
+        self.cache.save_cache({"items": [1]}, self.processor.cache_key, {"etag": '"v1"'})
+        self.now += 20
+        return self.cache.load_entry(self.processor.cache_key)
+
+    def client(self, response):
+        client = FakeClient({"http://a": response})
+        patcher = mock.patch.object(service_a, 'get_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client
+
+    def test_not_modified_refreshes_stored_at(self):
+        entry = self.stale_entry()
+        client = self.client(FakeResponse(None, status_code=304, headers={"ETag": '"v1"'}))
+
+        self.assertEqual(self.processor.refresh(entry), {"items": [1]})
+
+        self.assertEqual(client.requests[0][1]["If-None-Match"], '"v1"')
+        refreshed = self.cache.load_entry(self.processor.cache_key)
+        self.assertEqual(refreshed["stored_at"], self.now)
+        self.assertEqual((refreshed["data"], refreshed["etag"]), ({"items": [1]}, '"v1"'))
+        self.assertTrue(self.cache.is_fresh(refreshed))
+
+    def test_stale_entry_is_served_while_one_refresh_runs(self):
+        self.stale_entry()
+        release = threading.Event()
+        refreshes = []
+
+        def refresh(entry):
+            refreshes.append(entry)
+            release.wait(5)
+
+        with mock.patch.object(self.processor, 'refresh', refresh):
+            threads = [self.processor.refresh_in_background(self.cache.load_entry(self.processor.cache_key))]
+            results = [self.processor.execute() for _ in range(3)]
+            release.set()
+            threads[0].join(5)
+
+        self.assertEqual(results, [{"items": [1]}] * 3)
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(refreshes[0]["data"], {"items": [1]})
+        self.assertEqual(ServiceAProcessor._refreshing, set())
+
+    def test_failed_revalidation_keeps_the_stale_entry(self):
+        entry = self.stale_entry()
+        self.client(RequestException("timed out"))
+
+        thread = self.processor.refresh_in_background(entry)
+        thread.join(5)
+
+        self.assertEqual(self.cache.load_entry(self.processor.cache_key), entry)
+        self.assertEqual(ServiceAProcessor._refreshing, set())
+
+    def test_server_error_keeps_the_stale_entry(self):
+        entry = self.stale_entry()
+        self.client(FakeResponse(None, status_code=503))
+
+        self.assertIsNone(self.processor.refresh(entry))
+        self.assertEqual(self.cache.load_entry(self.processor.cache_key), entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,377 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+SERVICE_A_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'service-a', 'src')
+sys.path.insert(0, os.path.abspath(SERVICE_A_DIR))
+
+import service_a_cache  # noqa: E402
+from service_a import CacheManager  # noqa: E402
+from service_a_cache import CacheEntry, CacheStats, DiskCache, LogStore, MemoryCache, TieredCache  # noqa: E402
+
+
+class TestLogStore(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.stats = CacheStats()
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.cache_dir)
+
+    def open_store(self, **kwargs):
+        store = LogStore(self.stats, self.cache_dir, **kwargs)
+        self.stores.append(store)
+        return store
+
+    def reopen(self, store, **kwargs):
+        store.close()
+        self.stores.remove(store)
+        return self.open_store(**kwargs)
+
+    def test_reopen_truncates_torn_tail(self):
+        store = self.open_store()
+        expires_at = time.time() + 60
+        for i in range(10):
+            store.set(f"key{i}", {"value": i}, expires_at)
+        valid_size = store.size
+        store.set("torn", "x" * 100, expires_at)
+        store.close()
+        self.stores.remove(store)
+        with open(store.path, "r+b") as file:
+            file.truncate(valid_size + 30)
+
+        store = self.open_store()
+
+        self.assertEqual(store.size, valid_size)
+        self.assertEqual(os.path.getsize(store.path), valid_size)
+        self.assertIsNone(store.get("torn"))
+        self.assertEqual([store.get(f"key{i}").value for i in range(10)], [{"value": i} for i in range(10)])
+        store.set("after", "ok", expires_at)
+        store = self.reopen(store)
+        self.assertEqual(store.get("after").value, "ok")
+
+    def test_tombstone_survives_reopen(self):
+        store = self.open_store()
+        expires_at = time.time() + 60
+        store.set("kept", 1, expires_at)
+        store.set("deleted", 2, expires_at)
+        store.delete("deleted")
+
+        self.assertIsNone(store.get("deleted"))
+        self.assertGreater(store.dead_bytes, 0)
+        store = self.reopen(store)
+        self.assertIsNone(store.get("deleted"))
+        self.assertEqual(store.get("kept").value, 1)
+        self.assertEqual(len(store), 1)
+
+    def test_compaction_keeps_records_appended_during_the_copy(self):
+        store = self.open_store(compact_min_bytes=0, compact_ratio=2)
+        expires_at = time.time() + 60
+        for round_ in range(5):
+            for i in range(20):
+                store.set(f"key{i}", round_, expires_at)
+        size_before = store.size
+        copy_range = service_a_cache._copy_range
+        appended = []
+
+        def copy_and_append(*args, **kwargs):
+            # Runs on the compaction pass while the log is copied without the lock
+            if not appended:
+                appended.append(True)
+                store.set("key0", "updated", expires_at)
+                store.delete("key1")
+                store.set("new", "appended", expires_at)
+            return copy_range(*args, **kwargs)
+
+        with mock.patch.object(service_a_cache, "_copy_range", copy_and_append):
+            store.compact()
+
+        self.assertTrue(appended)
+        self.assertLess(store.size, size_before)
+        self.assertEqual(os.path.getsize(store.path), store.size)
+        for reopened in (False, True):
+            if reopened:
+                store = self.reopen(store)
+            self.assertEqual(store.get("key0").value, "updated")
+            self.assertIsNone(store.get("key1"))
+            self.assertEqual(store.get("new").value, "appended")
+            self.assertEqual([store.get(f"key{i}").value for i in range(2, 20)], [4] * 18)
+
+    def test_expired_records_count_toward_compaction(self):
+        store = self.open_store()
+        for i in range(50):
+            store.set(f"expired{i}", "x" * 100, time.time() - 1)
+        self.assertEqual(store.dead_bytes, 0)
+        store = self.reopen(store, compact_min_bytes=0, expiry_scan_interval=0)
+        size_before = store.size
+
+        store.set("live", 1, time.time() + 60)
+        deadline = time.time() + 5
+        while store._compacting and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertLess(store.size, size_before)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.get("live").value, 1)
+        self.assertEqual(self.stats.snapshot()["expirations"], 50)
+
+    def test_second_writer_is_refused(self):
+        store = self.open_store()
+        with self.assertRaises(BlockingIOError):
+            LogStore(self.stats, self.cache_dir)
+        store = self.reopen(store)
+        self.assertEqual(len(store), 0)
+
+    def test_tiered_cache_reads_the_log_while_another_process_writes_it(self):
+        store = self.open_store()
+        expires_at = time.time() + 60
+        store.set("shared", "from writer", expires_at)
+        cache = TieredCache(self.cache_dir, storage="log")
+        self.stores.append(cache.disk)
+
+        self.assertTrue(cache.disk.read_only)
+        self.assertEqual(cache.get("shared"), "from writer")
+        store.set("later", "appended", expires_at)
+        self.assertEqual(cache.get("later"), "appended")
+        size = store.size
+        cache.set("local", "memory only")
+        cache.delete("shared")
+        self.assertEqual(cache.get("local"), "memory only")
+        self.assertIsNone(cache.get("shared"))
+        self.assertEqual((store.size, os.path.getsize(store.path)), (size, size))
+
+    def test_reader_follows_compaction_and_waits_for_torn_records(self):
+        store = self.open_store(compact_min_bytes=0, compact_ratio=2)
+        reader = self.open_store(read_only=True)
+        expires_at = time.time() + 60
+        for round_ in range(3):
+            for i in range(10):
+                store.set(f"key{i}", round_, expires_at)
+        self.assertEqual(reader.get("key0").value, 2)
+        store.compact()
+        store.set("key1", "after compaction", expires_at)
+
+        self.assertEqual(reader.get("key0").value, 2)
+        self.assertEqual(reader.get("key1").value, "after compaction")
+        self.assertEqual(reader.size, store.size)
+        with open(store.path, "ab") as file:
+            file.write(b"SAC1\x00")
+        self.assertEqual(reader.get("key2").value, 2)
+        self.assertEqual(reader.size, store.size)
+        self.assertEqual(os.path.getsize(store.path), store.size + 5)
+
+    def test_values_are_unmarshalled_outside_the_lock(self):
+        store = self.open_store()
+        store.set("key", list(range(1000)), time.time() + 60)
+        loads = service_a_cache.marshal.loads
+        lock_free = []
+
+        def try_lock():
+            if store._lock.acquire(timeout=1):
+                store._lock.release()
+                lock_free.append(True)
+
+        def check_lock_and_load(data):
+            probe = threading.Thread(target=try_lock)
+            probe.start()
+            probe.join()
+            return loads(data)
+
+        with mock.patch.object(service_a_cache.marshal, "loads", check_lock_and_load):
+            self.assertEqual(store.get("key").value, list(range(1000)))
+        self.assertEqual(lock_free, [True])
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.stats = CacheStats()
+        self.clock = Clock()
+        patcher = mock.patch.object(service_a_cache.time, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def entry(self, value, size=1, ttl=60):
+        return CacheEntry(value, self.clock.now + ttl, size)
+
+
+class TestMemoryCache(ClockTestCase):
+
+    def test_evicts_the_least_recently_used_entry_by_count(self):
+        cache = MemoryCache(self.stats, max_entries=2)
+        cache.set("a", self.entry(1))
+        cache.set("b", self.entry(2))
+        cache.get("a")
+        cache.set("c", self.entry(3))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a").value, cache.get("c").value), (1, 3))
+        self.assertEqual(self.stats.evictions, 1)
+
+    def test_evicts_by_size(self):
+        cache = MemoryCache(self.stats, max_bytes=10)
+        for key in "abc":
+            cache.set(key, self.entry(key, size=4))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((len(cache), cache.bytes), (2, 8))
+        self.assertEqual(self.stats.evictions, 1)
+
+    def test_replacing_an_entry_updates_its_size(self):
+        cache = MemoryCache(self.stats, max_bytes=10)
+        cache.set("a", self.entry(1, size=4))
+        cache.set("a", self.entry(2, size=6))
+        self.assertEqual((len(cache), cache.bytes), (1, 6))
+        self.assertEqual(self.stats.evictions, 0)
+
+    def test_oversized_value_is_not_kept(self):
+        cache = MemoryCache(self.stats, max_bytes=10)
+        cache.set("a", self.entry(1, size=4))
+        cache.set("b", self.entry(2, size=4))
+        cache.set("a", self.entry(3, size=11))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b").value, 2)
+        self.assertEqual((cache.bytes, self.stats.evictions), (4, 0))
+
+    def test_expired_entry_is_dropped(self):
+        cache = MemoryCache(self.stats)
+        cache.set("a", self.entry(1, size=4, ttl=10))
+        self.clock.now += 10
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((len(cache), cache.bytes, self.stats.expirations), (0, 0, 1))
+
+
+class TestDiskCache(ClockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = DiskCache(self.stats, self.cache_dir)
+
+    def test_writes_through_a_temporary_file_and_a_rename(self):
+        with mock.patch.object(service_a_cache.os, "replace", wraps=os.replace) as replace:
+            self.cache.set("key", {"a": 1}, self.clock.now + 60)
+
+        (tmp_path, path), _ = replace.call_args
+        self.assertEqual(os.path.dirname(tmp_path), self.cache_dir)
+        self.assertEqual(path, self.cache._path("key"))
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(path)])
+        self.assertEqual(self.cache.get("key").value, {"a": 1})
+
+    def test_failed_write_keeps_the_previous_entry(self):
+        self.cache.set("key", "old", self.clock.now + 60)
+        with mock.patch.object(service_a_cache.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.cache.set("key", "new", self.clock.now + 60)
+
+        self.assertEqual(self.cache.get("key").value, "old")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_expired_entry_is_deleted(self):
+        self.cache.set("key", "value", self.clock.now + 10)
+        self.clock.now += 10
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertEqual(self.stats.expirations, 1)
+
+    def test_corrupted_entry_is_deleted(self):
+        with open(self.cache._path("key"), "w") as file:
+            file.write("{not json")
+        with self.assertLogs("service_a", "ERROR"):
+            self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class TestTieredCache(ClockTestCase):
+
+    def open_cache(self, storage, **limits):
+        cache = TieredCache(self.cache_dir, storage=storage, **limits)
+        if storage == "log":
+            self.addCleanup(cache.disk.close)
+        return cache
+
+    def test_promotes_disk_hits_to_memory(self):
+        for storage in ("files", "log"):
+            with self.subTest(storage=storage):
+                self.cache_dir = tempfile.mkdtemp()
+                self.addCleanup(shutil.rmtree, self.cache_dir)
+                cache = self.open_cache(storage)
+                cache.set("key", {"a": 1})
+                cache.memory.delete("key")
+
+                self.assertEqual(cache.get("key"), {"a": 1})
+                self.assertEqual(len(cache.memory), 1)
+                self.assertEqual(cache.get("key"), {"a": 1})
+                stats = cache.stats_snapshot()
+                self.assertEqual((stats["disk_hits"], stats["memory_hits"]), (1, 1))
+
+    def test_counts_hits_misses_and_evictions(self):
+        cache = self.open_cache("files", max_entries=2)
+        for key in "abc":
+            cache.set(key, key)
+        cache.get("c")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats_snapshot()
+        self.assertEqual({name: stats[name] for name in ("memory_hits", "disk_hits", "misses", "evictions")},
+                         {"memory_hits": 1, "disk_hits": 1, "misses": 1, "evictions": 2})
+        self.assertEqual(stats["memory_entries"], 2)
+
+    def test_entries_expire_in_every_tier(self):
+        cache = self.open_cache("files")
+        cache.set("key", "value", ttl=10)
+        self.clock.now += 10
+
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats_snapshot()["misses"], 1)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class TestCacheManagerExpiry(ClockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = CacheManager(self.cache_dir, ttl=10, stale_ttl=20)
+        cache_key = os.path.abspath(self.cache_dir)
+        self.addCleanup(service_a_cache._caches.pop, cache_key)
+        self.addCleanup(self.manager.cache.disk.close)
+
+    def test_entry_is_kept_stale_until_ttl_plus_stale_ttl(self):
+        self.manager.save_cache({"a": 1}, key="k")
+
+        self.clock.now += 9
+        self.assertTrue(self.manager.is_fresh(self.manager.load_entry("k")))
+        self.clock.now += 20
+        entry = self.manager.load_entry("k")
+        self.assertFalse(self.manager.is_fresh(entry))
+        self.assertIsNone(self.manager.load_cache("k"))
+        self.assertEqual(entry["data"], {"a": 1})
+        self.clock.now += 1
+        self.assertIsNone(self.manager.load_entry("k"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,60 +1,628 @@
 import os
-import yaml
+import logging
+import marshal
+import struct
+import threading
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (path, inode, mtime_ns, size) of a parsed file; a change to any of them means
+# the file was rewritten or replaced
+FileSignature = Tuple[str, int, int, int]
+
+# libyaml's C parser is several times faster than the pure-Python SafeLoader.
+# yaml is imported on the first parse, so loads served from a snapshot never pay for it
+_YAML_LOADER = None
+
+
+def _yaml_loader() -> Any:
+    global _YAML_LOADER
+    if _YAML_LOADER is None:
+        import yaml
+        _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _YAML_LOADER
+
+
+# Snapshot header: magic, marshal format version, a sha256 of the source files,
+# then the length-prefixed (name, size, mtime_ns) stamps of those files
+SNAPSHOT_MAGIC = b"CFGSNAP2"
+SNAPSHOT_EXTENSION = "snapshot"
+_SNAPSHOT_LENGTH = struct.Struct("<I")
+_SNAPSHOT_DIGEST_SIZE = 32
+
+
+class ParsedFileCache:
+    """
+    Process-wide cache of parsed configuration files keyed by path and file
+    identity, so a file is only parsed again after it changes on disk. A file
+    that fails to parse keeps raising the same error until it changes.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[FileSignature, Dict[str, Any]]] = {}
+        self._failures: Dict[str, Tuple[FileSignature, Exception]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, parser: Callable[[str], Dict[str, Any]]) -> Optional[Tuple[FileSignature, Dict[str, Any]]]:
+        """
+        Get a parsed file, parsing it only if it is new or has changed.
+
+        Args:
+            path (str): Path of the file.
+            parser (callable): Function that parses the file at a path.
+
+        Returns:
+            tuple: File signature and parsed content, or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry
+            failure = self._failures.get(path)
+        if failure is not None and failure[0] == signature:
+            raise failure[1]
+        try:
+            entry = (signature, parser(path))
+        except Exception as e:
+            with self._lock:
+                self._failures[path] = (signature, e)
+            raise
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = entry
+            self._failures.pop(path, None)
+        return entry
+
+    def clear(self) -> None:
+        """
+        Drop every cached file.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Parsed files and merged configurations are shared by every loader in the
+# process; callers must treat returned configurations as read-only
+_parsed_files = ParsedFileCache()
+_merged_configs: Dict[Tuple[str, str, str],
+                      Tuple[Tuple[Optional[FileSignature], ...], Dict[str, Any], Dict[str, Any]]] = {}
+_merged_lock = threading.Lock()
+
+_MISSING = object()
+_BOOL_STRINGS = {"true": True, "yes": True, "on": True, "1": True,
+                 "false": False, "no": False, "off": False, "0": False}
+
+
+def _flatten(config: Dict[str, Any], prefix: str = "", index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a map from every dotted key path to its value, including intermediate sections.
+
+    Args:
+        config (dict): Configuration to index.
+        prefix (str): Dotted path of the section being indexed.
+        index (dict): Index being filled.
+
+    Returns:
+        dict: Dotted key index.
+    """
+    if index is None:
+        index = {}
+    for key, value in config.items():
+        path = f"{prefix}{key}"
+        index[path] = value
+        if isinstance(value, dict):
+            _flatten(value, f"{path}.", index)
+    return index
+
+
+def _to_bool(value: Any) -> bool:
+    """
+    Convert a config value to bool, accepting the usual string spellings.
+
+    Args:
+        value (any): Value to convert.
+
+    Returns:
+        bool: Converted value.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in _BOOL_STRINGS:
+        return _BOOL_STRINGS[value.lower()]
+    if isinstance(value, int):
+        return bool(value)
+    raise ValueError(f"Cannot interpret {value!r} as a boolean")
+
+
+class ConfigAccessor:
+    """
+    Accessor bound to one dotted key. The value is resolved and converted once
+    per loaded configuration, so calling it in a hot path is a version check.
+    """
+
+    __slots__ = ("loader", "key", "default", "convert", "_version", "_value")
+
+    def __init__(self, loader: "ConfigLoader", key: str, default: Any = None,
+                 convert: Optional[Callable[[Any], Any]] = None):
+        self.loader = loader
+        self.key = key
+        self.default = default
+        self.convert = convert
+        self._version = -1
+        self._value = default
+
+    def __call__(self) -> Any:
+        """
+        Get the current value of the key.
+
+        Returns:
+            any: Configuration value, or the default if the key is not set.
+        """
+        if self._version != self.loader._version:
+            self._value = self.loader._get_converted(self.key, self.default, self.convert)
+            self._version = self.loader._version
+        return self._value
+
+    get = __call__
+
+    def __repr__(self) -> str:
+        return f"ConfigAccessor({self.key!r})"
+
+
+class ConfigValidationError(ValueError):
+    """
+    Raised when a configuration does not match its schema; lists every problem found.
+    """
+
+    def __init__(self, errors: List[str]):
+        super().__init__("Invalid configuration:\n  " + "\n  ".join(errors))
+        self.errors = errors
+
+
+class Field:
+    """
+    Schema entry for one configuration key with optional default, range and allowed values.
+    """
+
+    def __init__(self, type: Any = None, default: Any = _MISSING, required: bool = True,
+                 min: Optional[float] = None, max: Optional[float] = None,
+                 choices: Optional[Iterable[Any]] = None, schema: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            type (type or tuple): Accepted type(s); None accepts any type.
+            default (any): Value used when the key is missing; implies the key is optional.
+            required (bool): Report a missing key when there is no default.
+            min (number): Smallest allowed value.
+            max (number): Largest allowed value.
+            choices (iterable): Allowed values.
+            schema (dict): Nested schema for a section.
+        """
+        self.type = type
+        self.default = default
+        self.required = required and default is _MISSING
+        self.min = min
+        self.max = max
+        self.choices = frozenset(choices) if choices is not None else None
+        self.schema = schema
+
+
+def _compile_field(spec: Any, path: str) -> Callable[[Any, List[str]], Any]:
+    """
+    Compile one schema entry into a check(value, errors) function returning the value with defaults applied.
+
+    Args:
+        spec (type, tuple, dict or Field): Schema entry; a dict is a required nested section.
+        path (str): Dotted path of the key, for error messages.
+
+    Returns:
+        callable: Compiled check.
+    """
+    if isinstance(spec, dict):
+        spec = Field(dict, schema=spec)
+    elif not isinstance(spec, Field):
+        spec = Field(spec)
+
+    types = spec.type if isinstance(spec.type, tuple) or spec.type is None else (spec.type,)
+    if types is not None and float in types and int not in types:
+        types = types + (int,)
+    # bool is an int subclass, but True is not a valid port number
+    reject_bool = types is not None and bool not in types and any(t in (int, float) for t in types)
+    type_names = " or ".join(t.__name__ for t in types) if types is not None else ""
+    default, required, choices = spec.default, spec.required, spec.choices
+    low, high = spec.min, spec.max
+    section = _compile_section(spec.schema, f"{path}.") if spec.schema is not None else None
+    # A missing nested section is checked as empty so its own defaults and missing keys are reported
+    section_when_missing = section is not None and required
+
+    def check(value: Any, errors: List[str]) -> Any:
+        if value is _MISSING:
+            if default is not _MISSING:
+                return default
+            if section_when_missing:
+                return section({}, errors)
+            if required:
+                errors.append(f"Missing configuration key: {path}")
+            return value
+        if types is not None and (not isinstance(value, types) or (reject_bool and isinstance(value, bool))):
+            errors.append(f"Invalid type for key {path}: expected {type_names}, got {type(value).__name__}")
+            return value
+        # Unhashable or incomparable values are reported, not raised, so one
+        # pass still collects every error
+        if choices is not None:
+            try:
+                allowed = value in choices
+            except TypeError:
+                allowed = False
+            if not allowed:
+                errors.append(f"Invalid value for key {path}: {value!r} is not one of {sorted(choices, key=repr)}")
+        try:
+            if low is not None and value < low:
+                errors.append(f"Invalid value for key {path}: {value!r} is below the minimum {low!r}")
+            if high is not None and value > high:
+                errors.append(f"Invalid value for key {path}: {value!r} is above the maximum {high!r}")
+        except TypeError:
+            errors.append(f"Invalid value for key {path}: {value!r} cannot be compared with its range")
+        if section is not None:
+            if not isinstance(value, dict):
+                errors.append(f"Invalid type for key {path}: expected a section, got {type(value).__name__}")
+                return value
+            return section(value, errors)
+        return value
+
+    return check
+
+
+def _compile_section(schema: Dict[str, Any], prefix: str = "") -> Callable[[Dict[str, Any], List[str]], Dict[str, Any]]:
+    """
+    Compile a (nested) schema dict into a function that checks one section and fills in defaults.
+    The section is copied only when a default has to be added, so valid configs are returned as-is.
+
+    Args:
+        schema (dict): Schema of the section.
+        prefix (str): Dotted path of the section, for error messages.
+
+    Returns:
+        callable: Compiled section check.
+    """
+    checks = tuple((key, _compile_field(spec, f"{prefix}{key}")) for key, spec in schema.items())
+
+    def check_section(config: Dict[str, Any], errors: List[str]) -> Dict[str, Any]:
+        result = config
+        for key, check in checks:
+            value = result.get(key, _MISSING)
+            checked = check(value, errors)
+            if checked is not value and checked is not _MISSING:
+                if result is config:
+                    result = dict(config)
+                result[key] = checked
+        return result
+
+    return check_section
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile a schema once into a validator function.
+
+    Schema values are a type (or tuple of types), a nested schema dict, or a
+    Field for defaults, ranges and enums.
+
+    Args:
+        schema (dict): The validation schema.
+
+    Returns:
+        callable: validator(config) returning the config with defaults applied and
+        raising ConfigValidationError with every error found.
+    """
+    section = _compile_section(schema)
+
+    def validator(config: Dict[str, Any]) -> Dict[str, Any]:
+        errors: List[str] = []
+        result = section(config, errors)
+        if errors:
+            raise ConfigValidationError(errors)
+        return result
+
+    return validator
+
+
+def clear_config_cache() -> None:
+    """
+    Drop all cached parsed and merged configurations, forcing the next load to parse from disk.
+    """
+    _parsed_files.clear()
+    with _merged_lock:
+        _merged_configs.clear()
+
 
 class ConfigLoader:
     """
     Configuration loader that supports YAML and JSON configuration files with
-    environment-specific overrides.
+    environment-specific overrides. Parsed files are cached process-wide and
+    only re-parsed when they change; subscribers are notified on hot reload.
     """
 
-    def __init__(self, config_dir: str, env: str = "dev"):
+    def __init__(self, config_dir: str, env: str = "dev", use_snapshot: bool = False):
         """
         Initialize the ConfigLoader with the directory containing config files and the environment.
 
         Args:
             config_dir (str): Directory containing config files.
             env (str): Current environment (dev, prod).
+            use_snapshot (bool): Load from a pre-merged snapshot written by write_snapshot() when it is up to date.
         """
         self.config_dir = config_dir
         self.env = env
-        self.config = {}
+        self.use_snapshot = use_snapshot
+        self._config: Dict[str, Any] = {}
+        self._index: Dict[str, Any] = {}
+        self._version = 0
+        self._config_name: Optional[str] = None
+        self._signature: Optional[Tuple[Optional[FileSignature], ...]] = None
+        self._subscribers: List[Callable[[Dict[str, Any], Dict[str, Any]], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+        self._compiled_schema: Optional[Tuple[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]]]] = None
 
     def load_config(self, config_name: str) -> Dict[str, Any]:
         """
-        Load the configuration from the specified YAML or JSON file.
+        Load the configuration from the specified YAML or JSON file. Unchanged
+        files and merges are served from the process-wide cache; with
+        use_snapshot, an up-to-date snapshot replaces parsing altogether.
 
         Args:
             config_name (str): Base name of the config file (without extension).
 
         Returns:
             dict: Loaded configuration as a dictionary.
+
+        Raises:
+            FileNotFoundError: If neither the base nor the environment file exists.
         """
-        base_config = self._load_file(config_name)
-        env_config = self._load_file(f"{config_name}.{self.env}")
-        self.config = self._merge_configs(base_config, env_config)
+        signature, config, index = self._resolve_config(config_name)
+        self._set_config(config, index)
+        self._config_name = config_name
+        self._signature = signature
         return self.config
 
-    def _load_file(self, config_name: str) -> Dict[str, Any]:
+    def _resolve_config(self, config_name: str) -> Tuple[Tuple[Optional[FileSignature], ...], Dict[str, Any], Dict[str, Any]]:
         """
-        Load a configuration file from YAML or JSON.
+        Get the merged configuration and its key index from the cache, the snapshot or the files, without swapping it in.
 
         Args:
-            config_name (str): The name of the config file.
+            config_name (str): Base name of the config file (without extension).
 
         Returns:
-            dict: Parsed configuration as a dictionary.
+            tuple: Layer signatures, merged configuration and dotted key index.
+
+        Raises:
+            FileNotFoundError: If neither the base nor the environment file exists.
         """
-        yaml_file = os.path.join(self.config_dir, f"{config_name}.yaml")
-        json_file = os.path.join(self.config_dir, f"{config_name}.json")
+        signature = (self._stat_layer(config_name), self._stat_layer(f"{config_name}.{self.env}"))
+        if signature == (None, None):
+            raise FileNotFoundError(f"Configuration file {config_name} not found.")
 
-        if os.path.exists(yaml_file):
-            return self._load_yaml(yaml_file)
-        elif os.path.exists(json_file):
-            return self._load_json(json_file)
+        key = (os.path.abspath(self.config_dir), config_name, self.env)
+        with _merged_lock:
+            cached = _merged_configs.get(key)
+        if cached is not None and cached[0] == signature:
+            config, index = cached[1], cached[2]
         else:
+            config = self._load_snapshot(config_name, signature) if self.use_snapshot else None
+            if config is None:
+                signature, config = self._parse_layers(config_name)
+            index = _flatten(config)
+            with _merged_lock:
+                _merged_configs[key] = (signature, config, index)
+        return signature, config, index
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        The loaded configuration. It may be shared with other loaders and must not be mutated in place.
+        """
+        return self._config
+
+    @config.setter
+    def config(self, config: Dict[str, Any]) -> None:
+        self._set_config(config, _flatten(config))
+
+    def _set_config(self, config: Dict[str, Any], index: Dict[str, Any]) -> None:
+        """
+        Swap in a configuration and its key index, invalidating bound accessors if it changed.
+
+        Args:
+            config (dict): New configuration.
+            index (dict): Dotted key index of the configuration.
+        """
+        if config is not self._config:
+            self._config = config
+            self._index = index
+            self._version += 1
+
+    def _stat_layer(self, config_name: str) -> Optional[FileSignature]:
+        """
+        Get the signature of a configuration layer without parsing it.
+
+        Args:
+            config_name (str): The name of the config file (without extension).
+
+        Returns:
+            tuple: File signature, or None if no YAML or JSON file exists.
+        """
+        for extension in ("yaml", "json"):
+            path = self._get_config_path(config_name, extension)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def _parse_layers(self, config_name: str) -> Tuple[Tuple[Optional[FileSignature], ...], Dict[str, Any]]:
+        """
+        Parse the base and environment layers and merge them.
+
+        Args:
+            config_name (str): Base name of the config file (without extension).
+
+        Returns:
+            tuple: Signatures of the parsed layers and the merged configuration.
+        """
+        base_layer = self._load_layer(config_name)
+        env_layer = self._load_layer(f"{config_name}.{self.env}")
+        signature = (base_layer and base_layer[0], env_layer and env_layer[0])
+        return signature, self._merge_configs(base_layer[1] if base_layer else {}, env_layer and env_layer[1])
+
+    def _snapshot_path(self, config_name: str) -> str:
+        """
+        Get the path of the snapshot for a config name and the current environment.
+
+        Args:
+            config_name (str): Base name of the config file (without extension).
+
+        Returns:
+            str: Snapshot path, next to the environment config file.
+        """
+        return self._get_config_path(f"{config_name}.{self.env}", SNAPSHOT_EXTENSION)
+
+    @staticmethod
+    def _layers_digest(signature: Tuple[Optional[FileSignature], ...]) -> bytes:
+        """
+        Hash the contents of the source files a configuration was merged from.
+
+        Args:
+            signature (tuple): Layer signatures; missing layers are None.
+
+        Returns:
+            bytes: sha256 digest.
+        """
+        import hashlib
+        digest = hashlib.sha256()
+        for layer in signature:
+            if layer is None:
+                digest.update(b"\0")
+                continue
+            with open(layer[0], "rb") as file:
+                content = file.read()
+            digest.update(os.path.basename(layer[0]).encode() + b"\0" + content)
+        return digest.digest()
+
+    @staticmethod
+    def _layers_stamp(signature: Tuple[Optional[FileSignature], ...]) -> Tuple[Optional[Tuple[str, int, int]], ...]:
+        """
+        Get the name, size and mtime of each source file, which survive copies that keep timestamps.
+
+        Args:
+            signature (tuple): Layer signatures; missing layers are None.
+
+        Returns:
+            tuple: (name, size, mtime_ns) per layer, None for missing layers.
+        """
+        return tuple(None if layer is None else (os.path.basename(layer[0]), layer[3], layer[2])
+                     for layer in signature)
+
+    def write_snapshot(self, config_name: str) -> str:
+        """
+        Parse and merge the configuration and write it as a binary snapshot that
+        later loads can use instead of parsing YAML.
+
+        Args:
+            config_name (str): Base name of the config file (without extension).
+
+        Returns:
+            str: Path of the written snapshot.
+
+        Raises:
+            FileNotFoundError: If neither the base nor the environment file exists.
+            ValueError: If the configuration holds values marshal cannot store.
+        """
+        signature, config = self._parse_layers(config_name)
+        if signature == (None, None):
             raise FileNotFoundError(f"Configuration file {config_name} not found.")
+        try:
+            payload = marshal.dumps(config)
+        except ValueError as e:
+            raise ValueError(f"Configuration {config_name} cannot be snapshotted: {e}") from e
+
+        stamp = marshal.dumps(self._layers_stamp(signature))
+        path = self._snapshot_path(config_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(SNAPSHOT_MAGIC + bytes([marshal.version]) + self._layers_digest(signature)
+                       + _SNAPSHOT_LENGTH.pack(len(stamp)) + stamp + payload)
+        os.replace(tmp_path, path)
+        return path
+
+    def _load_snapshot(self, config_name: str,
+                       signature: Tuple[Optional[FileSignature], ...]) -> Optional[Dict[str, Any]]:
+        """
+        Load the snapshot if it was written from the current source files. Files
+        whose name, size and mtime still match are trusted without being read;
+        otherwise their content hash decides.
+
+        Args:
+            config_name (str): Base name of the config file (without extension).
+            signature (tuple): Current layer signatures.
+
+        Returns:
+            dict: Merged configuration, or None if there is no usable snapshot.
+        """
+        path = self._snapshot_path(config_name)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+
+        header = SNAPSHOT_MAGIC + bytes([marshal.version])
+        if not data.startswith(header):
+            logger.warning(f"Ignoring snapshot {path}: written by an incompatible version")
+            return None
+        digest_end = len(header) + _SNAPSHOT_DIGEST_SIZE
+        stamp_start = digest_end + _SNAPSHOT_LENGTH.size
+        try:
+            (stamp_len,) = _SNAPSHOT_LENGTH.unpack_from(data, digest_end)
+            stamp = marshal.loads(data[stamp_start:stamp_start + stamp_len])
+            if (stamp != self._layers_stamp(signature)
+                    and data[len(header):digest_end] != self._layers_digest(signature)):
+                logger.info(f"Ignoring stale snapshot {path}")
+                return None
+            return marshal.loads(data[stamp_start + stamp_len:])
+        except (struct.error, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring corrupt snapshot {path}: {e}")
+            return None
+
+    def _load_layer(self, config_name: str) -> Optional[Tuple[FileSignature, Dict[str, Any]]]:
+        """
+        Load one configuration layer through the process-wide file cache.
+
+        Args:
+            config_name (str): The name of the config file (without extension).
+
+        Returns:
+            tuple: File signature and parsed configuration, or None if no YAML or JSON file exists.
+        """
+        for extension, parser in (("yaml", self._load_yaml), ("json", self._load_json)):
+            entry = _parsed_files.get(self._get_config_path(config_name, extension), parser)
+            if entry is not None:
+                return entry
+        return None
 
     def _load_yaml(self, file_path: str) -> Dict[str, Any]:
         """
@@ -66,8 +634,9 @@ class ConfigLoader:
         Returns:
             dict: Parsed YAML file.
         """
+        import yaml
         with open(file_path, "r") as file:
-            return yaml.safe_load(file) or {}
+            return yaml.load(file, Loader=_yaml_loader()) or {}
 
     def _load_json(self, file_path: str) -> Dict[str, Any]:
         """
@@ -106,7 +675,7 @@ class ConfigLoader:
 
     def get(self, key: str, default: Any = None) -> Any:
         """
-        Get a configuration value.
+        Get a configuration value from the precomputed dotted key index.
 
         Args:
             key (str): The key of the configuration value.
@@ -115,51 +684,237 @@ class ConfigLoader:
         Returns:
             any: Configuration value.
         """
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        return self._index.get(key, default)
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Get a configuration value as a string.
+
+        Args:
+            key (str): The key of the configuration value.
+            default (str): Default value if the key is not found.
+
+        Returns:
+            str: Configuration value.
+        """
+        return self._get_converted(key, default, str)
 
-    def validate(self, schema: Dict[str, Any]) -> None:
+    def get_int(self, key: str, default: Optional[int] = None) -> Optional[int]:
         """
-        Validate the loaded configuration against a schema.
+        Get a configuration value as an integer.
 
         Args:
-            schema (dict): The validation schema.
+            key (str): The key of the configuration value.
+            default (int): Default value if the key is not found.
+
+        Returns:
+            int: Configuration value.
 
         Raises:
-            ValueError: If validation fails.
+            ValueError: If the value cannot be converted.
         """
-        self._validate_schema(self.config, schema)
+        return self._get_converted(key, default, int)
 
-    def _validate_schema(self, config: Dict[str, Any], schema: Dict[str, Any], path: str = "") -> None:
+    def get_float(self, key: str, default: Optional[float] = None) -> Optional[float]:
         """
-        Recursive schema validation.
+        Get a configuration value as a float.
 
         Args:
-            config (dict): The configuration to validate.
-            schema (dict): The schema to validate against.
-            path (str): Current path in the configuration (for error messages).
+            key (str): The key of the configuration value.
+            default (float): Default value if the key is not found.
+
+        Returns:
+            float: Configuration value.
 
         Raises:
-            ValueError: If validation fails.
+            ValueError: If the value cannot be converted.
         """
-        for key, key_type in schema.items():
-            full_path = f"{path}.{key}" if path else key
-            if key not in config:
-                raise ValueError(f"Missing configuration key: {full_path}")
-            if not isinstance(config[key], key_type):
-                raise ValueError(f"Invalid type for key {full_path}: expected {key_type}, got {type(config[key])}")
+        return self._get_converted(key, default, float)
 
-    def reload(self) -> None:
+    def get_bool(self, key: str, default: Optional[bool] = None) -> Optional[bool]:
         """
-        Reload the configuration.
+        Get a configuration value as a boolean; "true"/"false", "yes"/"no", "on"/"off" and 1/0 are accepted.
+
+        Args:
+            key (str): The key of the configuration value.
+            default (bool): Default value if the key is not found.
+
+        Returns:
+            bool: Configuration value.
+
+        Raises:
+            ValueError: If the value cannot be converted.
+        """
+        return self._get_converted(key, default, _to_bool)
+
+    def accessor(self, key: str, default: Any = None,
+                 convert: Optional[Callable[[Any], Any]] = None) -> ConfigAccessor:
+        """
+        Bind an accessor to a dotted key. It follows reloads and resolves in O(1).
+
+        Args:
+            key (str): The key of the configuration value.
+            default (any): Default value if the key is not found.
+            convert (callable): Optional conversion such as int, float or str.
+
+        Returns:
+            ConfigAccessor: Callable returning the current value.
+        """
+        if convert is bool:
+            convert = _to_bool
+        return ConfigAccessor(self, key, default, convert)
+
+    def _get_converted(self, key: str, default: Any, convert: Optional[Callable[[Any], Any]]) -> Any:
+        """
+        Look up a key and convert the value, leaving the default untouched.
+
+        Args:
+            key (str): The key of the configuration value.
+            default (any): Default value if the key is not found.
+            convert (callable): Conversion to apply, or None.
+
+        Returns:
+            any: Converted configuration value or the default.
+
+        Raises:
+            ValueError: If the value cannot be converted.
+        """
+        value = self._index.get(key, _MISSING)
+        if value is _MISSING or value is None:
+            return default
+        if convert is None:
+            return value
+        try:
+            return convert(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for key {key}: {e}") from e
+
+    def validate(self, schema: Any) -> None:
+        """
+        Validate the loaded configuration against a schema and apply its defaults.
+        The schema is compiled once and re-applied on every reload.
+
+        Args:
+            schema (dict or callable): The validation schema, or a validator from compile_schema().
+
+        Raises:
+            ConfigValidationError: If validation fails, listing every error.
+        """
+        if callable(schema):
+            validator = schema
+        elif self._compiled_schema is not None and self._compiled_schema[0] is schema:
+            validator = self._compiled_schema[1]
+        else:
+            validator = compile_schema(schema)
+            self._compiled_schema = (schema, validator)
+        self.config = validator(self.config)
+        self._validator = validator
+
+    def reload(self) -> bool:
+        """
+        Reload the last loaded configuration, re-parsing only the files that changed,
+        and notify subscribers if it changed. If parsing or validation against
+        the schema passed to validate() fails, the current configuration is kept
+        and the error is raised.
+
+        Returns:
+            bool: True if the configuration changed.
+
+        Raises:
+            RuntimeError: If no configuration has been loaded yet.
+        """
+        if self._config_name is None:
+            raise RuntimeError("load_config() must be called before reload().")
+        with self._reload_lock:
+            old_config = self.config
+            signature, config, index = self._resolve_config(self._config_name)
+            changed = signature != self._signature
+            if changed:
+                if self._validator is not None:
+                    validated = self._validator(config)
+                    if validated is not config:
+                        config, index = validated, _flatten(validated)
+                self._set_config(config, index)
+                self._signature = signature
+        if changed:
+            self._notify(self.config, old_config)
+        return changed
+
+    def subscribe(self, callback: Callable[[Dict[str, Any], Dict[str, Any]], None]) -> Callable:
+        """
+        Register a callback invoked as callback(new_config, old_config) after a reload changes the configuration.
+
+        Args:
+            callback (callable): Function to call on change.
+
+        Returns:
+            callable: The callback, so this can be used as a decorator.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any], Dict[str, Any]], None]) -> None:
+        """
+        Remove a previously registered callback.
+
+        Args:
+            callback (callable): Function passed to subscribe().
+        """
+        self._subscribers.remove(callback)
+
+    def _notify(self, new_config: Dict[str, Any], old_config: Dict[str, Any]) -> None:
+        """
+        Call every subscriber; a failing subscriber does not prevent the others from running.
+
+        Args:
+            new_config (dict): Configuration after the reload.
+            old_config (dict): Configuration before the reload.
+        """
+        for callback in list(self._subscribers):
+            try:
+                callback(new_config, old_config)
+            except Exception:
+                logger.exception(f"Config subscriber {callback!r} failed")
+
+    def watch(self, interval: float = 1.0) -> None:
+        """
+        Start a background thread that polls the config files and hot reloads them when they change.
+
+        Args:
+            interval (float): Seconds between checks.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(interval,), daemon=True,
+                                         name=f"config-watch-{self._config_name}")
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """
+        Stop the background reload thread.
+        """
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch_loop(self, interval: float) -> None:
+        """
+        Poll for changes until stop_watching() is called, keeping the last good configuration on errors.
+
+        Args:
+            interval (float): Seconds between checks.
         """
-        self.config = self.load_config()
+        last_error = None
+        while not self._stop_watching.wait(interval):
+            try:
+                self.reload()
+                last_error = None
+            except Exception as e:
+                if str(e) != last_error:
+                    logger.error(f"Failed to reload configuration {self._config_name}, keeping the current one: {e}")
+                last_error = str(e)
 
     def save_config(self, config_name: str, format: str = "yaml") -> None:
         """
@@ -187,6 +942,7 @@ class ConfigLoader:
             file_path (str): Path to the YAML file.
             config (dict): Configuration data to save.
         """
+        import yaml
         with open(file_path, "w") as file:
             yaml.safe_dump(config, file)
 
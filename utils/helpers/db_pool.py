@@ -0,0 +1,259 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+POOL_DEFAULTS = {
+    "size": 5,
+    "max_overflow": 10,
+    "timeout": 30,
+    "recycle": 1800,
+    "pre_ping": True,
+    "statement_timeout_ms": 30000,
+}
+
+DRIVERS = {"postgres": "postgresql", "postgresql": "postgresql", "mysql": "mysql+pymysql"}
+
+if Histogram is not None:
+    POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool", ["pool"])
+    POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+                          buckets=(.0001, .001, .005, .01, .05, .1, .5, 1, 5, 30))
+    POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"])
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def __init__(self, *args, stats: Optional["PoolStats"] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start)
+
+
+class PoolStats:
+    """
+    Checkout counters for one pool, mirrored to Prometheus when it is installed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checked_out = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+        if Histogram is not None:
+            self._checkouts = POOL_CHECKOUTS.labels(name)
+            self._wait = POOL_WAIT.labels(name)
+            self._checked_out = POOL_CHECKED_OUT.labels(name)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        if Histogram is not None:
+            self._wait.observe(seconds)
+
+    def on_checkout(self, *_args) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+        if Histogram is not None:
+            self._checkouts.inc()
+            self._checked_out.inc()
+
+    def on_checkin(self, *_args) -> None:
+        with self._lock:
+            self.checked_out -= 1
+        if Histogram is not None:
+            self._checked_out.dec()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "wait_seconds_total": self.wait_seconds_total,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class DatabasePool:
+    """
+    Lazily built SQLAlchemy engine with a tuned connection pool, configured from
+    the `database` section of the application config.
+
+    The migration runner is its only user so far: the services do not open
+    database connections yet (service-b's `connect_to_database` and
+    `cached_query` are simulated), so they should take their engine from
+    here once they do.
+    """
+
+    def __init__(self, settings: Dict[str, Any], name: str = "default",
+                 pool_overrides: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the pool settings. No connection is opened until the engine is first used.
+
+        Args:
+            settings (dict): Database settings (url or host/port/name/username/password, plus an optional `pool` section).
+            name (str): Pool name used in metrics.
+            pool_overrides (dict, optional): Pool settings that take precedence over the `pool` section,
+                for callers whose workload differs from the defaults (e.g. statement_timeout_ms=0).
+        """
+        self.settings = settings
+        self.name = name
+        self.pool_settings = {**POOL_DEFAULTS, **(settings.get("pool") or {}), **(pool_overrides or {})}
+        self.stats = PoolStats(name)
+        self._engine: Optional[Engine] = None
+        self._sessionmaker: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, loader, key: str = "database", name: str = "default",
+                    pool_overrides: Optional[Dict[str, Any]] = None) -> "DatabasePool":
+        """
+        Build a pool from a loaded ConfigLoader.
+
+        Args:
+            loader (ConfigLoader): Loader whose configuration has already been loaded.
+            key (str): Dotted key of the database section.
+            name (str): Pool name used in metrics.
+            pool_overrides (dict, optional): Pool settings that take precedence over the configured ones.
+
+        Returns:
+            DatabasePool: Pool for the configured database.
+        """
+        settings = loader.get(key)
+        if not isinstance(settings, dict):
+            raise ValueError(f"Missing configuration key: {key}")
+        return cls(settings, name=name, pool_overrides=pool_overrides)
+
+    def url(self) -> str:
+        """
+        Get the database URL, either given directly or built from its parts.
+
+        Returns:
+            str: SQLAlchemy database URL.
+        """
+        if self.settings.get("url"):
+            return self.settings["url"]
+        driver = DRIVERS.get(self.settings.get("type", "postgres"), self.settings.get("type"))
+        name = self.settings.get("name") or self.settings.get("database_name")
+        user = self.settings.get("username") or self.settings.get("user")
+        return (f"{driver}://{user}:{self.settings.get('password', '')}"
+                f"@{self.settings['host']}:{self.settings.get('port', 5432)}/{name}")
+
+    @property
+    def engine(self) -> Engine:
+        """
+        Get the engine, creating it on first use.
+
+        Returns:
+            Engine: Shared SQLAlchemy engine.
+        """
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._create_engine()
+        return self._engine
+
+    def _create_engine(self) -> Engine:
+        """
+        Create the engine with the configured pool and statement timeout.
+
+        Returns:
+            Engine: New SQLAlchemy engine.
+        """
+        url = self.url()
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # In-memory SQLite lives inside a single connection and cannot be pooled
+            return create_engine(url)
+
+        connect_args = {}
+        timeout_ms = self.pool_settings["statement_timeout_ms"]
+        if url.startswith("postgresql") and timeout_ms:
+            connect_args["options"] = f"-c statement_timeout={int(timeout_ms)}"
+        if url.startswith("postgresql") and self.settings.get("ssl_mode"):
+            connect_args["sslmode"] = self.settings["ssl_mode"]
+        if url.startswith("sqlite"):
+            # Pooled SQLite connections are handed between threads
+            connect_args["check_same_thread"] = False
+
+        engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=self.pool_settings["size"],
+            max_overflow=self.pool_settings["max_overflow"],
+            pool_timeout=self.pool_settings["timeout"],
+            pool_recycle=self.pool_settings["recycle"],
+            pool_pre_ping=self.pool_settings["pre_ping"],
+            connect_args=connect_args,
+        )
+        engine.pool.stats = self.stats
+        event.listen(engine, "checkout", self.stats.on_checkout)
+        event.listen(engine, "checkin", self.stats.on_checkin)
+        return engine
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """
+        Provide a transactional session that is committed on success and always closed.
+
+        Yields:
+            Session: ORM session bound to the pooled engine.
+        """
+        if self._sessionmaker is None:
+            self._sessionmaker = sessionmaker(bind=self.engine)
+        session = self._sessionmaker()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get pool usage counters.
+
+        Returns:
+            dict: Pool size, overflow in use and checkout/wait statistics.
+        """
+        status = self.stats.snapshot()
+        if self._engine is not None and isinstance(self._engine.pool, QueuePool):
+            status["size"] = self._engine.pool.size()
+            status["overflow"] = self._engine.pool.overflow()
+        return status
+
+    def dispose(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        if self._engine is not None:
+            self._engine.dispose()
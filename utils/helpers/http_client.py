@@ -0,0 +1,240 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+HTTP_DEFAULTS = {
+    "pool_connections": 10,
+    "pool_maxsize": 20,
+    "pool_block": False,
+    "connect_timeout": 3.05,
+    "read_timeout": 30,
+    # Retries of failed connection attempts only: nothing was sent yet, so any
+    # method is safe to retry. Read errors and error statuses are left to the caller
+    "connect_retries": 2,
+    "retry_backoff": 0.1,
+}
+
+if Histogram is not None:
+    HTTP_REQUESTS = Counter("http_client_requests_total", "Requests sent by the shared HTTP client",
+                            ["client", "status"])
+    HTTP_LATENCY = Histogram("http_client_request_seconds", "Request latency of the shared HTTP client", ["client"])
+    HTTP_IN_FLIGHT = Gauge("http_client_in_flight", "Requests currently in flight", ["client"])
+    HTTP_CONNECTIONS = Counter("http_client_connections_opened_total", "New TCP/TLS connections opened", ["client"])
+    HTTP_POOL_WAIT = Histogram("http_client_pool_wait_seconds", "Time spent waiting for a pooled connection",
+                               ["client"], buckets=(.0001, .001, .005, .01, .05, .1, .5, 1, 5, 30))
+
+
+class HTTPClientStats:
+    """
+    Request and connection counters for one client, mirrored to Prometheus when it is installed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self.pool_wait_seconds_total = 0.0
+        self._lock = threading.Lock()
+        if Histogram is not None:
+            self._latency = HTTP_LATENCY.labels(name)
+            self._in_flight = HTTP_IN_FLIGHT.labels(name)
+            self._connections = HTTP_CONNECTIONS.labels(name)
+            self._pool_wait = HTTP_POOL_WAIT.labels(name)
+
+    def on_start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+        if Histogram is not None:
+            self._in_flight.inc()
+
+    def on_finish(self, status: str, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            if status == "error":
+                self.errors += 1
+        if Histogram is not None:
+            self._in_flight.dec()
+            self._latency.observe(seconds)
+            HTTP_REQUESTS.labels(self.name, status).inc()
+
+    def on_new_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+        if Histogram is not None:
+            self._connections.inc()
+
+    def record_pool_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.pool_wait_seconds_total += seconds
+        if Histogram is not None:
+            self._pool_wait.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "connections_opened": self.connections_opened,
+                "requests_per_connection": self.requests / self.connections_opened if self.connections_opened else 0.0,
+                "pool_wait_seconds_total": self.pool_wait_seconds_total,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    urllib3 connection pool hooks that count new connections and checkout waits.
+    """
+
+    stats: Optional[HTTPClientStats] = None
+
+    def _new_conn(self):
+        if self.stats is not None:
+            self.stats.on_new_connection()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        finally:
+            if self.stats is not None:
+                self.stats.record_pool_wait(time.perf_counter() - start)
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose per-host connection pools report to an HTTPClientStats.
+    """
+
+    def __init__(self, stats: HTTPClientStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("InstrumentedHTTPConnectionPool", (_InstrumentedPoolMixin, HTTPConnectionPool),
+                         {"stats": stats}),
+            "https": type("InstrumentedHTTPSConnectionPool", (_InstrumentedPoolMixin, HTTPSConnectionPool),
+                          {"stats": stats}),
+        }
+
+
+class PooledHTTPClient:
+    """
+    Thread-safe HTTP client over one requests Session: keep-alive connection
+    pools per host, connect/read timeouts on every request and gzip responses.
+    """
+
+    def __init__(self, name: str = "default", **settings):
+        """
+        Initialize the session and its connection pools.
+
+        Args:
+            name (str): Client name used in metrics.
+            **settings: Overrides for HTTP_DEFAULTS (pool_connections, pool_maxsize,
+                pool_block, connect_timeout, read_timeout, connect_retries, retry_backoff).
+        """
+        self.name = name
+        self.settings = {**HTTP_DEFAULTS, **settings}
+        self.timeout = (self.settings["connect_timeout"], self.settings["read_timeout"])
+        self.stats = HTTPClientStats(name)
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        adapter = InstrumentedHTTPAdapter(
+            self.stats,
+            pool_connections=self.settings["pool_connections"],
+            pool_maxsize=self.settings["pool_maxsize"],
+            pool_block=self.settings["pool_block"],
+            max_retries=Retry(total=self.settings["connect_retries"], connect=self.settings["connect_retries"],
+                              read=0, status=0, other=0, backoff_factor=self.settings["retry_backoff"],
+                              raise_on_status=False),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request on a pooled connection.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            **kwargs: Passed to requests; timeout defaults to (connect_timeout, read_timeout).
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.RequestException: On connection errors and timeouts.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        self.stats.on_start()
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            self.stats.on_finish(status, time.perf_counter() - start)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get request and connection pool usage counters.
+
+        Returns:
+            dict: Request, error, in-flight and connection counts.
+        """
+        return self.stats.snapshot()
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+
+_clients: Dict[str, PooledHTTPClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str = "default", **settings) -> PooledHTTPClient:
+    """
+    Get the process-wide client with this name, creating it on first use.
+
+    Args:
+        name (str): Client name; callers sharing a name share connections.
+        **settings: Overrides for HTTP_DEFAULTS, applied when the client is created.
+
+    Returns:
+        PooledHTTPClient: Shared client.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = PooledHTTPClient(name, **settings)
+    return client